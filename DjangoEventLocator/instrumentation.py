@@ -0,0 +1,233 @@
+"""Opt-in per-view performance metrics, kept in process memory.
+
+With ``REQUEST_METRICS_ENABLED = True``, ``RequestMetricsMiddleware``
+records for every request, keyed by the view that handled it:
+
+* wall time of the whole request,
+* number of SQL queries and the time spent in them, measured with
+  ``connection.execute_wrapper``,
+* time spent rendering a ``TemplateResponse``,
+* the most often repeated SQL statement. The same parametrised statement
+  run many times in one request is how an N+1 query shows up; requests
+  repeating one ``DUPLICATE_QUERY_THRESHOLD`` times or more are logged.
+
+Each metric goes into a histogram with fixed buckets, so memory use does
+not grow with traffic, and at most ``MAX_VIEWS`` views are tracked. Staff
+users can read the aggregates of the current process as JSON from
+``/admin/metrics/`` (``?reset=1`` clears them afterwards). Each worker
+process keeps its own figures.
+
+Under ASGI the middleware runs in the sync thread, so async views are
+measured through ``async_to_sync``.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+MAX_VIEWS = 200
+DUPLICATE_QUERY_THRESHOLD = 5
+
+# Upper bucket bounds; values above the last bound go in an overflow bucket.
+MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Counts of observations per fixed bucket, plus their sum and maximum."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of values."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, observed in zip(self.bounds, self.buckets):
+            seen += observed
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 2) if self.count else None,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max': round(self.max, 2),
+            'buckets': {
+                **{f'<={bound}': n for bound, n in zip(self.bounds, self.buckets)},
+                f'>{self.bounds[-1]}': self.buckets[-1],
+            },
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.wall_ms = Histogram(MS_BUCKETS)
+        self.db_ms = Histogram(MS_BUCKETS)
+        self.render_ms = Histogram(MS_BUCKETS)
+        self.queries = Histogram(COUNT_BUCKETS)
+        self.duplicated_requests = 0
+        self.worst_duplicate = None
+
+    def add(self, sample):
+        self.requests += 1
+        self.wall_ms.add(sample.wall_ms)
+        self.db_ms.add(sample.db_ms)
+        self.queries.add(sample.queries)
+        if sample.render_ms is not None:
+            self.render_ms.add(sample.render_ms)
+        sql, repeats = sample.most_repeated()
+        if repeats >= DUPLICATE_QUERY_THRESHOLD:
+            self.duplicated_requests += 1
+            worst = self.worst_duplicate
+            if worst is None or repeats > worst['repeats']:
+                self.worst_duplicate = {'sql': sql, 'repeats': repeats}
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'wall_ms': self.wall_ms.as_dict(),
+            'db_ms': self.db_ms.as_dict(),
+            'render_ms': self.render_ms.as_dict(),
+            'queries': self.queries.as_dict(),
+            'duplicated_requests': self.duplicated_requests,
+            'worst_duplicate': self.worst_duplicate,
+        }
+
+
+class MetricsStore:
+    """Thread-safe ``ViewMetrics`` per view name, for at most ``MAX_VIEWS``."""
+
+    OVERFLOW = '<other>'
+
+    def __init__(self, max_views=MAX_VIEWS):
+        self.max_views = max_views
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def record(self, view_name, sample):
+        with self.lock:
+            if view_name not in self.views and len(self.views) >= self.max_views:
+                view_name = self.OVERFLOW
+            self.views.setdefault(view_name, ViewMetrics()).add(sample)
+
+    def snapshot(self, reset=False):
+        with self.lock:
+            data = {
+                name: metrics.as_dict() for name, metrics in sorted(self.views.items())
+            }
+            if reset:
+                self.views = {}
+        return data
+
+
+store = MetricsStore()
+
+
+class RequestSample:
+    """What one request did; also the ``execute_wrapper`` that counts SQL."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.statements = Counter()
+        self.render_started = None
+        self.render_ms = None
+        self.wall_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def most_repeated(self):
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+    def rendered(self, response):
+        self.render_ms = (time.perf_counter() - self.render_started) * 1000
+        return response
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    view = getattr(match.func, 'view_class', match.func)
+    return f'{view.__module__}.{view.__qualname__}'
+
+
+class RequestMetricsMiddleware:
+    """Record a ``RequestSample`` for every request into ``store``."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample = request._metrics_sample = RequestSample()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(sample))
+            response = self.get_response(request)
+        sample.wall_ms = (time.perf_counter() - started) * 1000
+
+        name = view_name(request)
+        store.record(name, sample)
+        sql, repeats = sample.most_repeated()
+        if repeats >= DUPLICATE_QUERY_THRESHOLD:
+            logger.warning(
+                '%s ran the same query %d times (possible N+1): %s', name, repeats, sql
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # The handler renders the response right after this hook.
+        sample = request._metrics_sample
+        sample.render_started = time.perf_counter()
+        response.add_post_render_callback(sample.rendered)
+        return response
+
+
+@staff_member_required
+def metrics_view(request):
+    """Dump the per-view aggregates of this process as JSON."""
+    reset = request.GET.get('reset') == '1'
+    return JsonResponse({
+        'enabled': getattr(settings, 'REQUEST_METRICS_ENABLED', False),
+        'views': store.snapshot(reset=reset),
+    })
@@ -18,13 +18,18 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from events.views import EventListView
+from events.urls import read_views
+
+from . import instrumentation
 
 urlpatterns = [
-    path('', EventListView.as_view(), name='home'),
+    path('', read_views.EventListView.as_view(), name='home'),
+    path('admin/metrics/', instrumentation.metrics_view, name='request-metrics'),
     path('admin/', admin.site.urls),
     path('users/', include('users.urls')),
     path('events/', include('events.urls')),
+    path('notifications/', include('notifications.urls')),
+    path('social/', include('social.urls')),
 ]
 
 if settings.DEBUG:
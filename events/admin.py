@@ -1,7 +1,10 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
 from .models import EventCategory, EventTag, Event, EventAttendee, Comment, Review
 from .forms import EventAttendeeForm
+from .stats import RATING_COUNT_FIELDS, set_reviews_approved
+from .trending import COMMENT, record_interactions
 
 
 @admin.register(EventCategory)
@@ -49,7 +52,9 @@ class EventAdmin(admin.ModelAdmin):
     prepopulated_fields = {}
     date_hierarchy = 'start_date'
     filter_horizontal = ('tags', 'favorites')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'registered_count',
+                       'favorites_count', 'review_count', 'rating_sum',
+                       'trending_score', *RATING_COUNT_FIELDS)
     inlines = [EventAttendeeInline, CommentInline, ReviewInline]
 
     fieldsets = (
@@ -72,6 +77,11 @@ class EventAdmin(admin.ModelAdmin):
         ('Media', {
             'fields': ('main_image',)
         }),
+        ('Statistics', {
+            'fields': ('registered_count', 'favorites_count', 'review_count',
+                      'rating_sum', *RATING_COUNT_FIELDS, 'trending_score'),
+            'classes': ('collapse',)
+        }),
         ('System Fields', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -100,6 +110,7 @@ class EventAttendeeAdmin(admin.ModelAdmin):
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('event', 'user', 'content_preview', 'created_at', 'is_approved')
+    list_select_related = ('event', 'user')
     list_filter = ('is_approved', 'created_at')
     search_fields = ('event__title', 'user__username', 'content')
     raw_id_fields = ('event', 'user')
@@ -111,17 +122,22 @@ class CommentAdmin(admin.ModelAdmin):
     content_preview.short_description = 'Content'
 
     def approve_comments(self, request, queryset):
-        queryset.update(is_approved=True)
+        changing = queryset.filter(is_approved=False)
+        event_ids = list(changing.values_list('event_id', flat=True))
+        changing.update(is_approved=True, updated_at=timezone.now())
+        # update() skips the signal that feeds the trending score.
+        record_interactions(COMMENT, event_ids)
     approve_comments.short_description = "Approve selected comments"
 
     def disapprove_comments(self, request, queryset):
-        queryset.update(is_approved=False)
+        queryset.update(is_approved=False, updated_at=timezone.now())
     disapprove_comments.short_description = "Disapprove selected comments"
 
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ('event', 'user', 'rating', 'content_preview', 'created_at', 'is_approved')
+    list_select_related = ('event', 'user')
     list_filter = ('rating', 'is_approved', 'created_at')
     search_fields = ('event__title', 'user__username', 'content')
     raw_id_fields = ('event', 'user')
@@ -133,9 +149,9 @@ class ReviewAdmin(admin.ModelAdmin):
     content_preview.short_description = 'Content'
 
     def approve_reviews(self, request, queryset):
-        queryset.update(is_approved=True)
+        set_reviews_approved(queryset, True)
     approve_reviews.short_description = "Approve selected reviews"
 
     def disapprove_reviews(self, request, queryset):
-        queryset.update(is_approved=False)
+        set_reviews_approved(queryset, False)
     disapprove_reviews.short_description = "Disapprove selected reviews"
@@ -0,0 +1,239 @@
+"""Read-only JSON API for events, categories and tags.
+
+Events accept the same filter parameters as the HTML list (see
+``events.filters``) plus:
+
+* ``fields`` -- comma-separated sparse fieldset; only the matching columns
+  are selected from the database.
+* ``limit`` -- page size, up to ``MAX_PAGE_SIZE``.
+* ``cursor`` -- opaque token from a previous page's ``next``/``previous``.
+
+``export/`` streams every matching event as NDJSON, reading the table in
+chunks so memory use does not grow with the result size.
+"""
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from . import filters
+from .models import Event, EventCategory, EventTag
+from .pagination import paginate_by_cursor
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+EXPORT_CHUNK_SIZE = 1000
+
+# API field name -> ORM lookup selected for it.
+EVENT_FIELDS = {
+    'id': 'pk',
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+    'start_date': 'start_date',
+    'end_date': 'end_date',
+    'location_name': 'location_name',
+    'address': 'address',
+    'city': 'city',
+    'country': 'country',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'capacity': 'capacity',
+    'registration_deadline': 'registration_deadline',
+    'is_free': 'is_free',
+    'price': 'price',
+    'is_featured': 'is_featured',
+    'category': 'category__slug',
+    'organizer': 'organizer__username',
+    'registered_count': 'registered_count',
+    'favorites_count': 'favorites_count',
+    'review_count': 'review_count',
+    'rating_sum': 'rating_sum',
+}
+# Many-to-many fields are loaded with one extra query per page or chunk.
+RELATED_FIELDS = ('tags',)
+DEFAULT_EVENT_FIELDS = (
+    'id', 'slug', 'title', 'start_date', 'end_date', 'location_name', 'city',
+    'country', 'latitude', 'longitude', 'is_free', 'price', 'category', 'tags',
+)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def error_response(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def parse_fields(request):
+    """Return the requested API field names, validated."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(DEFAULT_EVENT_FIELDS)
+    fields = list(
+        dict.fromkeys(name.strip() for name in raw.split(',') if name.strip())
+    )
+    known = {*EVENT_FIELDS, *RELATED_FIELDS}
+    unknown = [name for name in fields if name not in known]
+    if unknown:
+        raise BadRequest(f'Unknown fields: {", ".join(unknown)}')
+    return fields
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def event_values(queryset, fields):
+    """Select only the columns behind ``fields``, plus the cursor keys."""
+    lookups = {EVENT_FIELDS[name] for name in fields if name in EVENT_FIELDS}
+    lookups.update(('pk', 'start_date'))
+    return queryset.values(*lookups)
+
+
+def serialize_rows(rows, fields):
+    """Turn ``values()`` rows into API dicts, attaching tags in one query."""
+    tags = {}
+    if 'tags' in fields and rows:
+        through = Event.tags.through.objects.filter(
+            event_id__in=[row['pk'] for row in rows]
+        )
+        for event_id, slug in through.values_list('event_id', 'eventtag__slug'):
+            tags.setdefault(event_id, []).append(slug)
+    results = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            if name == 'tags':
+                item[name] = tags.get(row['pk'], [])
+            else:
+                item[name] = row[EVENT_FIELDS[name]]
+        results.append(item)
+    return results
+
+
+def filtered_events(request):
+    queryset = Event.objects.filter(is_published=True)
+    return filters.filter_events(queryset, request.GET)
+
+
+def page_url(request, **params):
+    query = request.GET.copy()
+    query.pop('cursor', None)
+    query.pop('offset', None)
+    query.update(params)
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+@require_GET
+def event_list(request):
+    try:
+        fields = parse_fields(request)
+        limit = parse_limit(request)
+    except BadRequest as exc:
+        return error_response(str(exc))
+    queryset = event_values(filtered_events(request), fields)
+
+    if filters.uses_default_ordering(request.GET):
+        try:
+            page = paginate_by_cursor(
+                queryset, limit, request.GET.get('cursor'),
+                key=lambda row: (row['start_date'], row['pk']),
+            )
+        except ValueError:
+            return error_response('Invalid cursor.')
+        rows = page.object_list
+        next_url = previous_url = None
+        if page.has_next():
+            next_url = page_url(request, cursor=page.next_cursor)
+        if page.has_previous():
+            previous_url = page_url(request, cursor=page.previous_cursor)
+    else:
+        # Relevance and popularity orderings have no stable key to seek on.
+        try:
+            offset = max(0, int(request.GET.get('offset', 0)))
+        except ValueError:
+            return error_response('offset must be an integer')
+        rows = list(queryset[offset:offset + limit + 1])
+        next_url = previous_url = None
+        if len(rows) > limit:
+            next_url = page_url(request, offset=offset + limit)
+        if offset:
+            previous_url = page_url(request, offset=max(0, offset - limit))
+        rows = rows[:limit]
+
+    return JsonResponse({
+        'results': serialize_rows(rows, fields),
+        'next': next_url,
+        'previous': previous_url,
+    })
+
+
+@require_GET
+def event_detail(request, slug):
+    try:
+        fields = parse_fields(request)
+    except BadRequest as exc:
+        return error_response(str(exc))
+    queryset = event_values(Event.objects.filter(is_published=True, slug=slug), fields)
+    row = queryset.first()
+    if row is None:
+        raise Http404('No event found.')
+    return JsonResponse(serialize_rows([row], fields)[0])
+
+
+@require_GET
+def event_export(request):
+    """Stream every matching event as newline-delimited JSON."""
+    try:
+        fields = parse_fields(request)
+    except BadRequest as exc:
+        return error_response(str(exc))
+    rows = event_values(filtered_events(request), fields).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+
+    def stream():
+        while True:
+            chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+            if not chunk:
+                return
+            yield ''.join(
+                json.dumps(item, cls=DjangoJSONEncoder) + '\n'
+                for item in serialize_rows(chunk, fields)
+            )
+
+    response = StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+    response['Content-Disposition'] = 'attachment; filename="events.ndjson"'
+    return response
+
+
+@require_GET
+def category_list(request):
+    categories = EventCategory.objects.order_by('name').values(
+        'name', 'slug', 'description'
+    )
+    return JsonResponse({'results': list(categories)})
+
+
+@require_GET
+def category_detail(request, slug):
+    category = get_object_or_404(
+        EventCategory.objects.values('name', 'slug', 'description'), slug=slug
+    )
+    return JsonResponse(category)
+
+
+@require_GET
+def tag_list(request):
+    return JsonResponse(
+        {'results': list(EventTag.objects.order_by('name').values('name', 'slug'))}
+    )
@@ -0,0 +1,217 @@
+"""Native async versions of the busiest event views.
+
+Under ASGI a sync view runs in a worker thread, reached through
+``sync_to_async`` once per request. These views stay on the event loop and
+use the async ORM (``aget``, ``acount``, ``async for``) instead; the
+queries behind a page that do not depend on each other are started
+together with ``asyncio.gather``. Django still runs each ORM call on the
+request's database thread, so they are issued back to back on one
+connection, but nothing waits on the loop while they run.
+
+Writes keep going through the sync services, because transactions are not
+available in async code. Cache lookups go through the async variants of the
+``caching`` helpers. Templates are rendered the way Django renders any
+``TemplateResponse`` from an async view, on the sync thread, so everything
+they need (including the facet counts) is loaded beforehand.
+
+``urls`` routes to these views when ``EVENTS_ASYNC_VIEWS`` is True.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.paginator import Paginator
+from django.http import Http404
+from django.shortcuts import aget_object_or_404, redirect
+
+from . import caching, conditional, facets, services, views
+from .models import Event, EventCategory, EventTag
+from .pagination import apaginate_by_cursor
+
+
+async def load_user(request):
+    """Resolve ``request.user`` without a blocking query.
+
+    The lazy ``request.user`` set by the authentication middleware would
+    query the database on first use, which async code must not do.
+    """
+    request.user = await request.auser()
+    return request.user
+
+
+async def _sidebar(facets_key):
+    """Categories and tags for the filter sidebar.
+
+    They are only loaded when the template's fragment cache is missing the
+    section; otherwise the lazy queryset is passed, which the template
+    never evaluates.
+    """
+    sections = {
+        'categories': (
+            EventCategory.objects.all(),
+            make_template_fragment_key('event_sidebar_categories', [facets_key]),
+        ),
+        'tags': (
+            EventTag.objects.all(),
+            make_template_fragment_key('event_sidebar_tags', [facets_key]),
+        ),
+    }
+    cached = await cache.aget_many([key for _, key in sections.values()])
+    return {
+        name: queryset if key in cached else [obj async for obj in queryset]
+        for name, (queryset, key) in sections.items()
+    }
+
+
+class EventListView(views.EventListView):
+    """Async ``views.EventListView``."""
+
+    async def get(self, request, *args, **kwargs):
+        await load_user(request)
+        if not caching.is_cacheable_request(request):
+            return await self.render_list()
+        etag = await conditional.alist_etag(request)
+        response = conditional.not_modified(request, etag)
+        if response is not None:
+            return response
+        key = await caching.alist_page_key(request)
+        response = await caching.aget_cached_response(key)
+        if response is None:
+            response = await self.render_list()
+            await sync_to_async(response.render)()
+            await caching.acache_response(key, response)
+        return conditional.set_validators(response, etag)
+
+    async def render_list(self):
+        self.object_list = self.get_queryset()
+        facets_key = await caching.afacets_key(self.request.GET)
+        self.page, self.sidebar, counts = await asyncio.gather(
+            self.apaginate_queryset(
+                self.object_list, self.get_paginate_by(self.object_list)
+            ),
+            _sidebar(facets_key),
+            facets.aget_facets(self.request.GET),
+        )
+        self.sidebar.update(facets=counts, facets_key=facets_key)
+        return self.render_to_response(self.get_context_data())
+
+    def paginate_queryset(self, queryset, page_size):
+        return self.page
+
+    def get_sidebar_context(self):
+        return self.sidebar
+
+
+class EventDetailView(views.EventDetailView):
+    """Async ``views.EventDetailView``."""
+
+    related = None
+
+    async def get(self, request, *args, **kwargs):
+        user = await load_user(request)
+        validators = None
+        if caching.is_cacheable_request(request):
+            validators = await conditional.adetail_validators(
+                kwargs['slug'], request.GET
+            )
+            if validators is None:
+                raise Http404('No event found.')
+            response = conditional.not_modified(request, *validators)
+            if response is not None:
+                return response
+
+        self.object = await aget_object_or_404(self.get_queryset(), slug=kwargs['slug'])
+        self.related = await self.aget_related_context(user)
+        response = self.render_to_response(self.get_context_data())
+        if validators is not None:
+            conditional.set_validators(response, *validators)
+        return response
+
+    async def post(self, request, *args, **kwargs):
+        # Comments are rare next to page views; reuse the sync handler.
+        return await sync_to_async(super().post)(request, *args, **kwargs)
+
+    def get_related_context(self):
+        # Loaded ahead by get(); a comment form with errors loads it here.
+        if self.related is None:
+            return super().get_related_context()
+        return self.related
+
+    async def apaginate_related(self, queryset, per_page, page_param, count=None):
+        paginator = Paginator(queryset, per_page)
+        paginator.count = await queryset.acount() if count is None else count
+        page = paginator.get_page(self.request.GET.get(page_param))
+        page.object_list = [obj async for obj in page.object_list]
+        return page
+
+    async def aget_related_context(self, user):
+        """Async ``get_related_context``, running its queries together."""
+        event = self.object
+        queries = [
+            apaginate_by_cursor(
+                views.approved_comments(event), views.COMMENTS_PAGE_SIZE,
+                field='created_at',
+            ),
+            self.apaginate_related(
+                views.approved_reviews(event), self.reviews_per_page, 'reviews_page',
+                count=event.review_count,
+            ),
+        ]
+        if user.is_authenticated:
+            queries += [
+                event.reviews.filter(user=user).afirst(),
+                user.favorite_events.filter(pk=event.pk).aexists(),
+                views.attendance_status(event, user).afirst(),
+            ]
+        comments, reviews, *personal = await asyncio.gather(*queries)
+        context = {
+            'comments': comments,
+            'comments_next_url': views.comments_page_url(event, comments),
+            'reviews': reviews,
+        }
+        if personal:
+            review, is_favorite, attendance_status = personal
+            context['user_review'] = review
+            context['is_favorite'] = is_favorite
+            context['attendance_status'] = attendance_status
+        return context
+
+
+async def toggle_favorite(request, slug):
+    """Async ``views.toggle_favorite``."""
+    user = await load_user(request)
+    if not user.is_authenticated:
+        return redirect('users:login')
+
+    event = await aget_object_or_404(Event, slug=slug)
+    if await sync_to_async(views.set_favorite)(event, user):
+        messages.success(request, 'Event added to favorites.')
+    else:
+        messages.success(request, 'Event removed from favorites.')
+
+    return redirect('events:event-detail', slug=slug)
+
+
+async def toggle_attendance(request, slug):
+    """Async ``views.toggle_attendance``."""
+    user = await load_user(request)
+    if not user.is_authenticated:
+        return redirect('users:login')
+
+    event = await aget_object_or_404(
+        Event.objects.select_related('organizer'), slug=slug
+    )
+    if await sync_to_async(services.cancel)(event, user):
+        messages.success(request, 'Your registration has been cancelled.')
+        return redirect('events:event-detail', slug=slug)
+
+    try:
+        attendance = await sync_to_async(services.register)(event, user)
+    except services.RegistrationClosed:
+        messages.error(request, 'Registration for this event is closed.')
+    else:
+        await sync_to_async(views.announce_registration)(request, event, attendance)
+
+    return redirect('events:event-detail', slug=slug)
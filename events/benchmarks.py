@@ -0,0 +1,177 @@
+"""Repeatable timings of the main pages, for comparing runs.
+
+``run_benchmarks`` requests each scenario through the test client against
+the configured database (fill it with ``seed_benchmark_data`` first) and
+reports, per scenario, the latency percentiles, queries per request and
+the peak Python memory allocated while handling one request. Peak memory
+is measured on a separate request, because ``tracemalloc`` slows down the
+ones being timed.
+"""
+import statistics
+import time
+import tracemalloc
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Event, EventCategory, EventTag
+from .pagination import encode_cursor
+from .views import EventListView
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Scenario:
+    """Requests to time, cycled through ``paths``.
+
+    ``toggle`` scenarios POST to each path twice per iteration, so the
+    data ends up as it started.
+    """
+
+    def __init__(self, name, paths, method='get', logged_in=False, toggle=False):
+        self.name = name
+        self.paths = list(paths)
+        self.method = method
+        self.logged_in = logged_in
+        self.toggle = toggle
+
+    def requests(self, iteration):
+        path = self.paths[iteration % len(self.paths)]
+        return [path, path] if self.toggle else [path]
+
+
+def build_scenarios(user, search='jazz', sample_size=10, deep_page=50):
+    """Scenarios over the data in the database, visited as ``user``.
+
+    Page ``deep_page`` of the list is timed both through ``?page=N`` and
+    through the cursor that following "Next" links would reach it with.
+    """
+    events = Event.objects.filter(is_published=True)
+    slugs = list(events.order_by('pk').values_list('slug', flat=True)[:sample_size])
+    if not slugs:
+        raise ValueError('No published events; run seed_benchmark_data first.')
+    category = (
+        EventCategory.objects.annotate(n=Count('events')).order_by('-n', 'pk')
+        .values_list('slug', flat=True).first()
+    )
+    tags = list(
+        EventTag.objects.annotate(n=Count('events')).order_by('-n', 'pk')
+        .values_list('slug', flat=True)[:2]
+    )
+    located = (
+        events.exclude(latitude=None).order_by('pk')
+        .values('latitude', 'longitude').first()
+    )
+    near = ''
+    if located:
+        near = f'near={located["latitude"]},{located["longitude"]}&radius_km=25'
+    upcoming = (
+        events.filter(start_date__gt=timezone.now(), capacity=None)
+        .order_by('pk')
+        .values_list('slug', flat=True)
+        .first()
+    ) or slugs[0]
+
+    list_url = reverse('events:event-list')
+    list_params = [
+        ('list', ''),
+        ('list_search', f'search={search}'),
+        ('list_category', f'category={category}'),
+        ('list_tag', f'tag={tags[0]}' if tags else ''),
+        ('list_tags', '&'.join(f'tag={slug}' for slug in tags)),
+        ('list_tags_all', '&'.join(f'tag={slug}' for slug in tags) + '&tag_mode=all'),
+        ('list_upcoming', 'date=upcoming'),
+        ('list_past', 'date=past'),
+        ('list_near', near),
+        ('list_popular', 'sort=popular'),
+        ('list_trending', 'sort=trending'),
+        ('list_deep_page_offset', f'page={deep_page}'),
+    ]
+    # The "Next" cursor of the previous page is the last row shown on it.
+    shown = (deep_page - 1) * EventListView.paginate_by
+    edges = events.order_by('-start_date', '-pk').values_list('start_date', 'pk')
+    edge = edges[shown - 1:].first()
+    if edge:
+        list_params.append(
+            ('list_deep_page_cursor', f'cursor={encode_cursor(*edge, "next")}')
+        )
+    scenarios = [Scenario(name, [f'{list_url}?{query}']) for name, query in list_params]
+    detail_urls = [reverse('events:event-detail', args=[slug]) for slug in slugs]
+    scenarios += [
+        Scenario('detail', detail_urls),
+        Scenario('detail_logged_in', detail_urls, logged_in=True),
+        Scenario('api_search', [f'{reverse("events:api-event-list")}?search={search}']),
+        Scenario(
+            'toggle_favorite', [reverse('events:event-favorite', args=[upcoming])],
+            method='post', logged_in=True, toggle=True,
+        ),
+        Scenario(
+            'toggle_attendance', [reverse('events:event-attend', args=[upcoming])],
+            method='post', logged_in=True, toggle=True,
+        ),
+        Scenario('profile', [reverse('users:profile')], logged_in=True),
+        Scenario(
+            'public_profile',
+            [reverse('users:profile', args=[user.username])],
+            logged_in=True,
+        ),
+        Scenario('my_favorites', [reverse('events:user-favorites')], logged_in=True),
+        Scenario('my_attending', [reverse('events:user-attending')], logged_in=True),
+    ]
+    return scenarios
+
+
+def _request(client, scenario, path, clear_cache):
+    if clear_cache:
+        cache.clear()
+    started = time.perf_counter()
+    response = getattr(client, scenario.method)(path)
+    return response, (time.perf_counter() - started) * 1000
+
+
+def run_scenario(client, scenario, iterations, warmup=2, clear_cache=True):
+    """Time ``scenario`` and return its summary as a dict.
+
+    ``clear_cache`` empties the cache before every request, so cached pages
+    are measured as they render on a miss.
+    """
+    for iteration in range(warmup):
+        for path in scenario.requests(iteration):
+            _request(client, scenario, path, clear_cache)
+
+    latencies, queries, statuses = [], [], set()
+    for iteration in range(iterations):
+        for path in scenario.requests(iteration):
+            with CaptureQueriesContext(connection) as captured:
+                response, latency = _request(client, scenario, path, clear_cache)
+            latencies.append(latency)
+            queries.append(len(captured.captured_queries))
+            statuses.add(response.status_code)
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for path in scenario.requests(0):
+            tracemalloc.reset_peak()
+            _request(client, scenario, path, clear_cache)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'requests': len(latencies),
+        'status_codes': sorted(statuses),
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'mean_ms': round(statistics.fmean(latencies), 2),
+        'queries_median': statistics.median(queries),
+        'queries_max': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
@@ -0,0 +1,148 @@
+"""Caching for the public event listing.
+
+Cached entries embed a namespace version in their keys. Saving or deleting
+an event, category or tag bumps the version (see ``events.signals``), which
+orphans every entry built from the old data instead of hunting them down
+one by one. Only ``get``/``set``/``incr`` are used, so this works with the
+local-memory and file-based cache backends alike. The ``a``-prefixed
+helpers are the same operations for async views, through the cache's
+``aget``/``aset`` methods.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+
+EVENTS = 'events'
+TAXONOMY = 'taxonomy'
+
+DEFAULT_TIMEOUTS = {
+    'list_page': 60,
+    'sidebar': 600,
+    'event_card': 600,
+    'facets': 300,
+}
+
+# Query parameters that change what the event list renders.
+LIST_PARAMS = (
+    'search', 'category', 'tag', 'tag_mode', 'city', 'date', 'near', 'radius_km',
+    'sort', 'page', 'cursor',
+)
+# The subset that changes which events match, and so the facet counts.
+FILTER_PARAMS = tuple(
+    name for name in LIST_PARAMS if name not in ('sort', 'page', 'cursor')
+)
+
+
+def get_timeout(name):
+    timeouts = getattr(settings, 'EVENTS_CACHE_TIMEOUTS', {})
+    return timeouts.get(name, DEFAULT_TIMEOUTS[name])
+
+
+def _version_key(namespace):
+    return f'events:version:{namespace}'
+
+
+def get_version(namespace):
+    """Return the current version of ``namespace``.
+
+    A missing version (first use, or evicted) starts from the current time
+    in milliseconds, so it is always newer than any version used before.
+    """
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+async def aget_version(namespace):
+    """Async version of ``get_version``."""
+    key = _version_key(namespace)
+    version = await cache.aget(key)
+    if version is None:
+        version = int(time.time() * 1000)
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def bump_version(namespace):
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        get_version(namespace)
+
+
+def normalize_params(query_dict, names=LIST_PARAMS):
+    """Return the list-affecting parameters as a canonical query string."""
+    items = []
+    for name in names:
+        values = sorted(value for value in query_dict.getlist(name) if value)
+        items.extend((name, value) for value in values)
+    return urlencode(items)
+
+
+def _versioned_key(kind, signature, events_version, taxonomy_version):
+    digest = hashlib.md5(signature.encode(), usedforsecurity=False).hexdigest()
+    return f'events:{kind}:{events_version}:{taxonomy_version}:{digest}'
+
+
+def list_page_key(request):
+    signature = f'{request.path}?{normalize_params(request.GET)}'
+    return _versioned_key('list', signature, get_version(EVENTS), get_version(TAXONOMY))
+
+
+async def alist_page_key(request):
+    """Async version of ``list_page_key``."""
+    signature = f'{request.path}?{normalize_params(request.GET)}'
+    return _versioned_key(
+        'list', signature, await aget_version(EVENTS), await aget_version(TAXONOMY)
+    )
+
+
+def facets_key(query_dict):
+    signature = normalize_params(query_dict, FILTER_PARAMS)
+    return _versioned_key(
+        'facets', signature, get_version(EVENTS), get_version(TAXONOMY)
+    )
+
+
+async def afacets_key(query_dict):
+    """Async version of ``facets_key``."""
+    signature = normalize_params(query_dict, FILTER_PARAMS)
+    return _versioned_key(
+        'facets', signature, await aget_version(EVENTS), await aget_version(TAXONOMY)
+    )
+
+
+def is_cacheable_request(request):
+    """Whether the response is the same for every visitor sending it."""
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        and not len(messages.get_messages(request))
+    )
+
+
+def get_cached_response(key):
+    return cache.get(key)
+
+
+def cache_response(key, response):
+    if response.status_code == 200:
+        cache.set(key, response, get_timeout('list_page'))
+
+
+async def aget_cached_response(key):
+    return await cache.aget(key)
+
+
+async def acache_response(key, response):
+    if response.status_code == 200:
+        await cache.aset(key, response, get_timeout('list_page'))
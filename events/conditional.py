@@ -0,0 +1,140 @@
+"""ETag / Last-Modified validators for the public event pages.
+
+Validators are computed without rendering anything, so a revalidation of
+an unchanged page is answered with 304 after a single query at most. They
+are only used for anonymous requests, whose pages are the same for every
+visitor (see ``caching.is_cacheable_request``).
+"""
+import hashlib
+import time
+
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from . import caching, filters
+from .models import Comment, Event, Review
+
+# Query parameters that change what the detail page renders.
+DETAIL_PARAMS = ('reviews_page',)
+
+
+def make_etag(*parts):
+    signature = '|'.join(str(part) for part in parts)
+    return quote_etag(
+        hashlib.md5(signature.encode(), usedforsecurity=False).hexdigest()
+    )
+
+
+def _latest(queryset, expression):
+    return Subquery(
+        queryset.filter(event=OuterRef('pk'), is_approved=True)
+        .order_by()
+        .values('event')
+        .annotate(value=expression)
+        .values('value')
+    )
+
+
+def _detail_state(slug):
+    return (
+        Event.objects.filter(slug=slug)
+        .annotate(
+            comments_modified=_latest(Comment.objects, Max('updated_at')),
+            comment_count=Coalesce(_latest(Comment.objects, Count('pk')), 0),
+            reviews_modified=_latest(Review.objects, Max('updated_at')),
+        )
+        .values(
+            'pk', 'updated_at', 'registered_count', 'review_count', 'rating_sum',
+            'comments_modified', 'comment_count', 'reviews_modified',
+        )
+    )
+
+
+def _detail_validators(state, taxonomy_version, params):
+    if state is None:
+        return None
+    last_modified = max(
+        value for value in (
+            state['updated_at'], state['comments_modified'], state['reviews_modified'],
+        )
+        if value is not None
+    )
+    etag = make_etag(
+        *(state[key] for key in sorted(state)),
+        taxonomy_version,
+        *(params.get(name, '') for name in DETAIL_PARAMS),
+    )
+    return etag, int(last_modified.timestamp())
+
+
+def detail_validators(slug, params):
+    """Return ``(etag, last_modified)`` for an event page, or None if missing.
+
+    One query reads the event's ``updated_at`` and counters along with the
+    newest approved comment and review and the number of comments; any
+    change to what the page shows moves at least one of them, or the
+    taxonomy cache version for renamed categories and tags.
+    """
+    return _detail_validators(
+        _detail_state(slug).first(), caching.get_version(caching.TAXONOMY), params
+    )
+
+
+async def adetail_validators(slug, params):
+    """Async version of ``detail_validators``."""
+    return _detail_validators(
+        await _detail_state(slug).afirst(),
+        await caching.aget_version(caching.TAXONOMY),
+        params,
+    )
+
+
+def _list_etag(request, events_version, taxonomy_version):
+    parts = [
+        events_version, taxonomy_version, request.path,
+        caching.normalize_params(request.GET),
+    ]
+    if request.GET.get('date') or request.GET.get('sort') in filters.COUNTER_SORTS:
+        parts.append(int(time.time() // caching.get_timeout('list_page')))
+    return make_etag(*parts)
+
+
+def list_etag(request):
+    """ETag of an event list page from the cache versions and its filters.
+
+    ``?date=upcoming``/``past`` results change as time passes without any
+    event changing, and counter-sorted results change with every
+    registration, favorite or review, none of which bumps a cache version.
+    Those pages also carry the current cache period.
+    """
+    return _list_etag(
+        request,
+        caching.get_version(caching.EVENTS),
+        caching.get_version(caching.TAXONOMY),
+    )
+
+
+async def alist_etag(request):
+    """Async version of ``list_etag``."""
+    return _list_etag(
+        request,
+        await caching.aget_version(caching.EVENTS),
+        await caching.aget_version(caching.TAXONOMY),
+    )
+
+
+def not_modified(request, etag, last_modified=None):
+    """Return a 304 response if the client's copy is current, else None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
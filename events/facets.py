@@ -0,0 +1,94 @@
+"""Facet counts for the event list sidebar.
+
+For the current search and filters, counts how many published events each
+category, tag, city and date option would list. Each facet ignores its own
+parameter, so the counts show what choosing another option gives rather
+than repeating the current selection; the exception is tags in ``all``
+mode, where another tag narrows the results and is counted that way.
+
+Every facet is one grouped aggregate query, four in all however many
+options there are. They still read every matching event, so results are
+cached per filter signature under the usual version scheme (see
+``events.caching``) for the ``facets`` timeout.
+"""
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import caching, filters
+from .models import Event
+
+# Cities are listed most events first; the rest are left out.
+MAX_CITIES = 20
+
+
+def _matching(params, *ignored):
+    """Published events matching ``params`` apart from ``ignored``, unordered."""
+    params = params.copy()
+    for name in ignored + ('sort',):
+        params.pop(name, None)
+    queryset = Event.objects.filter(is_published=True)
+    return filters.filter_events(queryset, params).order_by()
+
+
+def _grouped(queryset, field):
+    return dict(
+        queryset.values_list(field).annotate(n=Count('pk')).values_list(field, 'n')
+    )
+
+
+def compute_facets(params):
+    """Return the facet counts for the list filtered by ``params``.
+
+    ``{'category': {pk: n}, 'tag': {pk: n}, 'city': [(city, n), ...],
+    'date': {'upcoming': n, 'past': n}}``; options without events are left
+    out. Grouping by the foreign keys rather than the slugs spares a join.
+    """
+    categories = _grouped(_matching(params, 'category'), 'category_id')
+
+    if params.get('tag_mode') == 'all':
+        tagged = _matching(params)
+    else:
+        tagged = _matching(params, 'tag', 'tag_mode')
+    through = Event.tags.through.objects.filter(event_id__in=tagged.values('pk'))
+    tags = dict(
+        through.values_list('eventtag_id').annotate(n=Count('event_id'))
+        .values_list('eventtag_id', 'n')
+    )
+
+    cities = sorted(
+        (item for item in _grouped(_matching(params, 'city'), 'city').items()
+         if item[0]),
+        key=lambda item: (-item[1], item[0]),
+    )
+    selected = params.get('city')
+    top = cities[:MAX_CITIES]
+    top += [item for item in cities[MAX_CITIES:] if item[0] == selected]
+
+    now = timezone.now()
+    dates = _matching(params, 'date').aggregate(
+        upcoming=Count('pk', filter=Q(end_date__gte=now)),
+        past=Count('pk', filter=Q(end_date__lt=now)),
+    )
+    return {'category': categories, 'tag': tags, 'city': top, 'date': dates}
+
+
+def get_facets(params):
+    """``compute_facets(params)``, from the cache when possible."""
+    key = caching.facets_key(params)
+    counts = cache.get(key)
+    if counts is None:
+        counts = compute_facets(params)
+        cache.set(key, counts, caching.get_timeout('facets'))
+    return counts
+
+
+async def aget_facets(params):
+    """Async ``get_facets``; the counts are computed on the database thread."""
+    key = await caching.afacets_key(params)
+    counts = await cache.aget(key)
+    if counts is None:
+        counts = await sync_to_async(compute_facets)(params)
+        await cache.aset(key, counts, caching.get_timeout('facets'))
+    return counts
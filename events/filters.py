@@ -0,0 +1,108 @@
+"""Event list filtering shared by the HTML views and the JSON API."""
+from django.db.models import Case, Exists, F, FloatField, OuterRef, When
+from django.utils import timezone
+
+from . import geo, search
+from .models import Event
+
+SORT_CHOICES = [
+    ('', 'Date'),
+    ('distance', 'Distance'),
+    ('popular', 'Most popular'),
+    ('rating', 'Top rated'),
+    ('trending', 'Trending'),
+]
+# Sorts by counters that change through F() updates, without a cache bump.
+COUNTER_SORTS = ('popular', 'rating', 'trending')
+
+TAG_MODE_CHOICES = [
+    ('any', 'Any selected tag'),
+    ('all', 'All selected tags'),
+]
+# Each tag in "all" mode adds a subquery; more than this are ignored.
+MAX_TAGS = 10
+
+
+def uses_default_ordering(params):
+    """Whether results for ``params`` are ordered by ``-start_date``."""
+    return not params.get('search') and not params.get('sort')
+
+
+def filter_tags(queryset, slugs, match_all=False):
+    """Keep events tagged with any (or all) of the tag ``slugs``.
+
+    Uses ``EXISTS`` subqueries on the tag through table rather than a join,
+    so events matching several tags appear once without ``DISTINCT``, and
+    the list can still be read in index order, probing the through table's
+    (event, tag) index for each row until the page is full.
+    """
+    tagged = Event.tags.through.objects.filter(event_id=OuterRef('pk'))
+    if match_all:
+        for slug in slugs:
+            queryset = queryset.filter(Exists(tagged.filter(eventtag__slug=slug)))
+        return queryset
+    return queryset.filter(Exists(tagged.filter(eventtag__slug__in=slugs)))
+
+
+def filter_events(queryset, params):
+    """Apply the search, filter and sort parameters in ``params``.
+
+    ``params`` is a QueryDict such as ``request.GET``; unknown or malformed
+    values are ignored.
+    """
+    # Search functionality
+    search_query = params.get('search')
+    if search_query:
+        queryset = search.get_backend().search(queryset, search_query)
+        queryset = queryset.order_by('-search_rank', '-start_date')
+
+    # Category filter
+    category = params.get('category')
+    if category:
+        queryset = queryset.filter(category__slug=category)
+
+    # Tag filter
+    tags = list(dict.fromkeys(slug for slug in params.getlist('tag') if slug))
+    tags = tags[:MAX_TAGS]
+    if tags:
+        queryset = filter_tags(
+            queryset, tags, match_all=params.get('tag_mode') == 'all'
+        )
+
+    # City filter
+    city = params.get('city')
+    if city:
+        queryset = queryset.filter(city=city)
+
+    # Date filter
+    date_filter = params.get('date')
+    if date_filter == 'upcoming':
+        queryset = queryset.filter(end_date__gte=timezone.now())
+    elif date_filter == 'past':
+        queryset = queryset.filter(end_date__lt=timezone.now())
+
+    # Radius filter
+    point = geo.parse_point(params.get('near'))
+    if point:
+        radius = geo.parse_radius(params.get('radius_km'))
+        queryset = geo.filter_near(queryset, *point, radius)
+
+    # Sorting
+    sort = params.get('sort')
+    if sort == 'distance' and point:
+        queryset = queryset.order_by('distance_km', '-start_date')
+    elif sort == 'popular':
+        queryset = queryset.order_by('-registered_count', '-start_date')
+    elif sort == 'trending':
+        # Precomputed by the update_trending_scores command.
+        queryset = queryset.order_by('-trending_score', '-start_date')
+    elif sort == 'rating':
+        queryset = queryset.annotate(
+            rating_average=Case(
+                When(review_count=0, then=None),
+                default=F('rating_sum') * 1.0 / F('review_count'),
+                output_field=FloatField(),
+            )
+        ).order_by(F('rating_average').desc(nulls_last=True), '-start_date')
+
+    return queryset
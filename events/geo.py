@@ -0,0 +1,86 @@
+"""Radius search over Event coordinates without a spatial database.
+
+Candidates are first narrowed with a latitude/longitude bounding box that the
+``(latitude, longitude)`` index can serve, and only those rows get the exact
+haversine distance computed by the database.
+"""
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_RADIUS_KM = 500
+DEFAULT_RADIUS_KM = 25
+
+
+def parse_point(value):
+    """Parse a ``"lat,lng"`` string into a float pair, or return None."""
+    try:
+        lat, lng = (float(part) for part in value.split(','))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+def parse_radius(value, default=DEFAULT_RADIUS_KM):
+    """Parse a radius in kilometres, clamped to ``MAX_RADIUS_KM``."""
+    try:
+        radius = float(value)
+    except (TypeError, ValueError):
+        return default
+    if not math.isfinite(radius) or radius <= 0:
+        return default
+    return min(radius, MAX_RADIUS_KM)
+
+
+def bounding_box_q(lat, lng, radius_km):
+    """Return a Q object matching events inside the box around the circle."""
+    angular = radius_km / EARTH_RADIUS_KM
+    lat_delta = math.degrees(angular)
+    min_lat, max_lat = lat - lat_delta, lat + lat_delta
+    q = Q(latitude__gte=max(min_lat, -90), latitude__lte=min(max_lat, 90))
+
+    # Near a pole every longitude can be within reach.
+    if min_lat <= -90 or max_lat >= 90:
+        return q
+
+    lng_delta = math.degrees(
+        math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat))))
+    )
+    min_lng, max_lng = lng - lng_delta, lng + lng_delta
+    if min_lng < -180:
+        lng_q = Q(longitude__gte=min_lng + 360) | Q(longitude__lte=max_lng)
+    elif max_lng > 180:
+        lng_q = Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng - 360)
+    else:
+        lng_q = Q(longitude__gte=min_lng, longitude__lte=max_lng)
+    return q & lng_q
+
+
+def haversine_expression(lat, lng):
+    """Database expression for the great-circle distance in kilometres."""
+    event_lat = Radians(Cast(F('latitude'), FloatField()))
+    event_lng = Radians(Cast(F('longitude'), FloatField()))
+    origin_lat = math.radians(lat)
+    origin_lng = math.radians(lng)
+    a = (
+        Power(Sin((event_lat - Value(origin_lat)) / 2), 2)
+        + Value(math.cos(origin_lat)) * Cos(event_lat)
+        * Power(Sin((event_lng - Value(origin_lng)) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(Least(a, Value(1.0))))
+
+
+def filter_near(queryset, lat, lng, radius_km):
+    """Restrict ``queryset`` to events within ``radius_km`` of the point.
+
+    The result is annotated with ``distance_km``.
+    """
+    return (
+        queryset.filter(bounding_box_q(lat, lng, radius_km))
+        .annotate(distance_km=haversine_expression(lat, lng))
+        .filter(distance_km__lte=radius_km)
+    )
@@ -0,0 +1,212 @@
+"""iCalendar (.ics) feeds of a user's events and of a category.
+
+Calendar clients poll feeds every few minutes, so each request first runs
+one aggregate over the feed's events, ``(Max(updated_at), Count, Sum(id))``.
+``updated_at`` moves on every edit, and the count and id sum change when an
+event joins or leaves the feed. The aggregate gives a strong ETag. An
+unchanged feed is answered with 304 before any event row is read. Changed
+feeds are streamed from ``.iterator()`` so memory use does not grow with
+the feed.
+
+Calendar apps cannot log in, so personal feeds are addressed by a random
+per-user key (``CalendarFeedKey``) instead of the session. Users can
+replace the key, which revokes a leaked link.
+"""
+import hashlib
+from datetime import timedelta, timezone as dt_timezone
+
+from django.contrib import messages
+from django.db.models import Count, Max, Sum
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_GET, require_POST
+
+from .models import CalendarFeedKey, Event, EventCategory, new_feed_key
+
+# Ended events stay in feeds this long, so recent entries do not vanish.
+PAST_WINDOW = timedelta(days=90)
+CHUNK_SIZE = 500
+FEED_FIELDS = (
+    'pk', 'slug', 'title', 'description', 'start_date', 'end_date', 'updated_at',
+    'location_name', 'address', 'city', 'country', 'latitude', 'longitude',
+)
+
+
+def feed_token(user):
+    """Return ``user``'s feed key, creating it on first use."""
+    feed_key, _ = CalendarFeedKey.objects.get_or_create(user=user)
+    return feed_key.key
+
+
+def reset_feed_token(user):
+    """Replace ``user``'s feed key, so links made from the old one 404."""
+    feed_key, _ = CalendarFeedKey.objects.update_or_create(
+        user=user, defaults={'key': new_feed_key(), 'created_at': timezone.now()}
+    )
+    return feed_key.key
+
+
+def user_id_from_token(token):
+    keys = CalendarFeedKey.objects.filter(key=token)
+    user_id = keys.values_list('user_id', flat=True).first()
+    if user_id is None:
+        raise Http404('Unknown calendar feed.')
+    return user_id
+
+
+def escape(text):
+    return (
+        str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Split a content line into 75-octet pieces as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    pieces = []
+    while encoded:
+        limit = 75 if not pieces else 74
+        cut = min(limit, len(encoded))
+        # Do not split a multi-byte character.
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        pieces.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    return '\r\n '.join(pieces) + '\r\n'
+
+
+def format_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def event_component(row, request, stamp):
+    parts = (row['location_name'], row['address'], row['city'], row['country'])
+    location = ', '.join(part for part in parts if part)
+    url = request.build_absolute_uri(reverse('events:event-detail', args=[row['slug']]))
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:event-{row["pk"]}@{request.get_host()}',
+        f'DTSTAMP:{stamp}',
+        f'LAST-MODIFIED:{format_datetime(row["updated_at"])}',
+        f'DTSTART:{format_datetime(row["start_date"])}',
+        f'DTEND:{format_datetime(row["end_date"])}',
+        f'SUMMARY:{escape(row["title"])}',
+        f'DESCRIPTION:{escape(row["description"])}',
+        f'LOCATION:{escape(location)}',
+        f'URL:{url}',
+    ]
+    if row['latitude'] is not None and row['longitude'] is not None:
+        lines.append(f'GEO:{row["latitude"]};{row["longitude"]}')
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) for line in lines)
+
+
+def stream_calendar(queryset, name, request):
+    stamp = format_datetime(timezone.now())
+    yield ''.join(fold(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Event Locator//Events//EN',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{escape(name)}',
+    ))
+    chunk = []
+    for row in queryset.values(*FEED_FIELDS).iterator(chunk_size=CHUNK_SIZE):
+        chunk.append(event_component(row, request, stamp))
+        if len(chunk) == CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append(fold('END:VCALENDAR'))
+    yield ''.join(chunk)
+
+
+def feed_validators(queryset):
+    """Return ``(etag, last_modified)`` of a feed from one aggregate."""
+    state = queryset.order_by().aggregate(
+        last_modified=Max('updated_at'), count=Count('pk'), id_sum=Sum('pk')
+    )
+    last_modified = state['last_modified']
+    signature = (
+        f'{last_modified and last_modified.isoformat()}'
+        f'|{state["count"]}|{state["id_sum"]}'
+    )
+    etag = quote_etag(
+        hashlib.md5(signature.encode(), usedforsecurity=False).hexdigest()
+    )
+    return etag, last_modified
+
+
+def calendar_response(request, queryset, name, private=True):
+    """Return a 304 or the streamed feed.
+
+    ``name`` may be a callable; it is only called when the feed is sent.
+    """
+    etag, last_modified = feed_validators(queryset)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        if callable(name):
+            name = name()
+        response = StreamingHttpResponse(
+            stream_calendar(queryset.order_by('start_date', 'pk'), name, request),
+            content_type='text/calendar; charset=utf-8',
+        )
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(timestamp)
+    response['Cache-Control'] = f'{"private" if private else "public"}, max-age=300'
+    return response
+
+
+def feed_events(**filters):
+    return Event.objects.filter(
+        is_published=True, end_date__gte=timezone.now() - PAST_WINDOW, **filters
+    )
+
+
+@require_GET
+def attending_feed(request, token):
+    queryset = feed_events(
+        eventattendee__user_id=user_id_from_token(token),
+        eventattendee__status='registered',
+    )
+    return calendar_response(request, queryset, 'Events I\'m attending')
+
+
+@require_GET
+def favorites_feed(request, token):
+    queryset = feed_events(favorites__id=user_id_from_token(token))
+    return calendar_response(request, queryset, 'My favorite events')
+
+
+@require_GET
+def category_feed(request, slug):
+    def calendar_name():
+        category = get_object_or_404(EventCategory.objects.only('name'), slug=slug)
+        return f'{category.name} events'
+
+    queryset = feed_events(category__slug=slug)
+    return calendar_response(request, queryset, calendar_name, private=False)
+
+
+@require_POST
+def reset_feed(request):
+    """Replace the user's feed key and return to the page they came from."""
+    if not request.user.is_authenticated:
+        return redirect('users:login')
+    reset_feed_token(request.user)
+    messages.success(
+        request,
+        'Your calendar links have been replaced. Subscribe again with the new link.',
+    )
+    next_url = request.POST.get('next')
+    if not url_has_allowed_host_and_scheme(next_url, {request.get_host()}):
+        next_url = reverse('events:user-attending')
+    return redirect(next_url)
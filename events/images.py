@@ -0,0 +1,125 @@
+"""Resized WebP/JPEG variants of uploaded images.
+
+Uploads are stored as sent, and the model's ``*_variants`` field is reset
+to ``None`` ("pending") whenever the image changes. The
+``process_images`` command later renders each pending image at the widths
+in ``SIZES``, in both formats and without EXIF metadata, and records the
+paths in the variants field:
+
+    {'card': {'webp': [[320, 'event_images/variants/x-card-320.webp'], ...],
+              'jpeg': [...]}, ...}
+
+Templates render them with the ``responsive_image`` tag, which falls back
+to the original file while variants are pending.
+
+Variant files are deleted once they are no longer referenced: when a new
+upload replaces the image, when regenerating writes over the same paths,
+and when the image changed while ``process_images`` was rendering it.
+"""
+import os
+from functools import partial
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+# Size name -> (widths, square crop, default ``sizes`` attribute).
+SIZES = {
+    'card': (
+        (320, 640), False, '(min-width: 992px) 33vw, (min-width: 768px) 50vw, 100vw'
+    ),
+    'detail': ((800, 1200, 1600), False, '(min-width: 768px) 66vw, 100vw'),
+    'avatar': ((96, 192, 384), True, '192px'),
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+class ImageProcessingError(Exception):
+    """Raised when an upload cannot be read as an image."""
+
+
+def reset_variants_if_changed(instance, field_name, variants_field):
+    """Mark the variants pending if ``field_name`` holds a new upload.
+
+    Meant for ``pre_save``: a freshly assigned file is not committed to
+    storage until the field's own ``pre_save`` runs, after the signal.
+    """
+    field_file = getattr(instance, field_name)
+    if not field_file or not field_file._committed:
+        previous = getattr(instance, variants_field)
+        setattr(instance, variants_field, None)
+        if previous:
+            # Keep the files until the row no longer points at them.
+            transaction.on_commit(
+                partial(delete_variants, field_file.storage, previous)
+            )
+
+
+def delete_variants(storage, variants):
+    """Delete every file recorded in a variants mapping."""
+    for formats in (variants or {}).values():
+        for entries in formats.values():
+            for _, path in entries:
+                storage.delete(path)
+
+
+def _open(field_file):
+    try:
+        with field_file.open('rb'):
+            image = Image.open(field_file)
+            image.load()
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        raise ImageProcessingError(str(exc)) from exc
+    # Apply the EXIF orientation to the pixels; the metadata itself is not
+    # copied to the variants.
+    return ImageOps.exif_transpose(image)
+
+
+def _resize(image, width, square):
+    if square:
+        return ImageOps.fit(image, (width, width), Image.Resampling.LANCZOS)
+    resized = image.copy()
+    resized.thumbnail((width, width * 10), Image.Resampling.LANCZOS)
+    return resized
+
+
+def _encode(image, fmt):
+    pil_format, options = FORMATS[fmt]
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(field_file, size_names):
+    """Render and store every variant of ``field_file``; return the mapping."""
+    image = _open(field_file)
+    storage = field_file.storage
+    directory, filename = os.path.split(field_file.name)
+    stem = os.path.splitext(filename)[0]
+    variants = {}
+    for name in size_names:
+        widths, square, _ = SIZES[name]
+        # Never upscale; the smallest width is always produced.
+        limit = min(image.size) if square else image.width
+        usable = [width for width in widths if width <= limit]
+        usable = usable or [min(widths[0], limit)]
+        variants[name] = {fmt: [] for fmt in FORMATS}
+        for width in usable:
+            resized = _resize(image, width, square)
+            for fmt in FORMATS:
+                path = f'{directory}/variants/{stem}-{name}-{width}.{fmt}'
+                # Regenerating replaces the earlier file rather than adding
+                # a suffixed copy next to it.
+                storage.delete(path)
+                path = storage.save(path, ContentFile(_encode(resized, fmt)))
+                variants[name][fmt].append([width, path])
+    return variants
+
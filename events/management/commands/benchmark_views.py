@@ -0,0 +1,154 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test.utils import override_settings
+
+from events.benchmarks import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure request throughput of the event pages through the ASGI handler, '
+        'driven by concurrent coroutines as under uvicorn, and through the WSGI '
+        'handler, driven by a thread pool as under a threaded WSGI server. Run it '
+        'with EVENTS_ASYNC_VIEWS off and on to compare the sync and async views.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', default=['/events/'],
+            help='Paths to request in turn (default: /events/).',
+        )
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument(
+            '--cookie', default='',
+            help='Cookie header to send, e.g. a sessionid to benchmark logged-in '
+                 'pages.',
+        )
+        parser.add_argument(
+            '--handler', choices=('asgi', 'wsgi', 'both'), default='both'
+        )
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Host header to send; allowed for the duration of the run.',
+        )
+
+    def handle(self, *args, **options):
+        self.paths = options['paths']
+        self.cookie = options['cookie']
+        self.host = options['host']
+        total, concurrency = options['requests'], options['concurrency']
+        if total < 1 or concurrency < 1:
+            raise CommandError('--requests and --concurrency must be at least 1.')
+        mode = 'async' if getattr(settings, 'EVENTS_ASYNC_VIEWS', False) else 'sync'
+        self.stdout.write(
+            f'{total} requests, concurrency {concurrency}, {mode} views, '
+            f'paths: {", ".join(self.paths)}'
+        )
+        # Otherwise every request is a 400 unless DEBUG allows localhost.
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, self.host]):
+            if options['handler'] in ('asgi', 'both'):
+                self.report('ASGI', *asyncio.run(self.run_asgi(total, concurrency)))
+            if options['handler'] in ('wsgi', 'both'):
+                self.report('WSGI', *self.run_wsgi(total, concurrency))
+
+    def report(self, name, elapsed, latencies, errors):
+        self.stdout.write(
+            f'{name}: {len(latencies) / elapsed:.1f} req/s, '
+            f'p50 {statistics.median(latencies) * 1000:.1f} ms, '
+            f'p95 {percentile(latencies, 0.95) * 1000:.1f} ms, {errors} errors'
+        )
+
+    def request_path(self, number):
+        return urlsplit(self.paths[number % len(self.paths)])
+
+    async def run_asgi(self, total, concurrency):
+        application = get_asgi_application()
+        latencies, errors = [], 0
+        queue = iter(range(total))
+
+        async def call(number):
+            url = self.request_path(number)
+            headers = [(b'host', self.host.encode())]
+            if self.cookie:
+                headers.append((b'cookie', self.cookie.encode()))
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': url.path,
+                'raw_path': url.path.encode(), 'query_string': url.query.encode(),
+                'root_path': '', 'headers': headers,
+                'client': ('127.0.0.1', 0), 'server': (self.host, 80),
+            }
+            request_sent = False
+            disconnected = asyncio.Event()
+
+            async def receive():
+                nonlocal request_sent
+                if not request_sent:
+                    request_sent = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            status = None
+
+            async def send(message):
+                nonlocal status
+                if message['type'] == 'http.response.start':
+                    status = message['status']
+
+            await application(scope, receive, send)
+            disconnected.set()
+            return status
+
+        async def worker():
+            nonlocal errors
+            for number in queue:
+                started = time.perf_counter()
+                status = await call(number)
+                latencies.append(time.perf_counter() - started)
+                # None when the application never started a response.
+                errors += status is None or status >= 400
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started, latencies, errors
+
+    def run_wsgi(self, total, concurrency):
+        application = get_wsgi_application()
+
+        def call(number):
+            url = self.request_path(number)
+            environ = {
+                'PATH_INFO': url.path,
+                'QUERY_STRING': url.query,
+                'HTTP_HOST': self.host,
+            }
+            if self.cookie:
+                environ['HTTP_COOKIE'] = self.cookie
+            setup_testing_defaults(environ)
+            statuses = []
+            started = time.perf_counter()
+            body = application(environ, lambda status, headers: statuses.append(status))
+            try:
+                for _ in body:
+                    pass
+            finally:
+                body.close()
+            return time.perf_counter() - started, int(statuses[0].split()[0])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(call, range(total)))
+        elapsed = time.perf_counter() - started
+        latencies = [latency for latency, _ in results]
+        return elapsed, latencies, sum(status >= 400 for _, status in results)
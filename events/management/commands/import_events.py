@@ -0,0 +1,239 @@
+import csv
+import json
+import sys
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from events import caching
+from events.models import Event, EventCategory, EventTag
+from events.search import get_backend
+from events.slugs import SlugAllocator
+
+# Columns copied onto Event as-is, after conversion by the model field.
+EVENT_COLUMNS = (
+    'title', 'description', 'location_name', 'address', 'city', 'country',
+    'latitude', 'longitude', 'capacity', 'is_free', 'price', 'is_published',
+    'is_featured',
+)
+DATE_COLUMNS = ('start_date', 'end_date', 'registration_deadline')
+
+
+def read_csv(stream):
+    """Yield ``(line number, row)`` for each CSV record."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl(stream):
+    """Yield ``(line number, row)`` for each non-blank line.
+
+    A line that is not a JSON object yields a ``ValidationError`` in place
+    of the row, so it is rejected like any other invalid row.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            row = ValidationError(f'Invalid JSON: {exc.msg} (column {exc.colno})')
+        else:
+            if not isinstance(row, dict):
+                row = ValidationError('Expected a JSON object')
+        yield line_number, row
+
+
+def parse_date(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValidationError(f'Invalid date: {value!r}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    normalized = str(value).strip().lower()
+    if normalized in ('1', 'true', 't', 'yes', 'y'):
+        return True
+    if normalized in ('0', 'false', 'f', 'no', 'n'):
+        return False
+    raise ValidationError(f'Invalid boolean: {value!r}')
+
+
+def split_tags(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace('|', ',').split(',')
+    return [name.strip() for name in value if name.strip()]
+
+
+class LookupCache:
+    """get-or-create cache of slug -> pk for categories and tags."""
+
+    def __init__(self, model, dry_run):
+        self.model = model
+        self.dry_run = dry_run
+        self.ids = dict(model.objects.values_list('slug', 'pk'))
+        self.created = 0
+
+    def resolve(self, name):
+        slug = slugify(name)
+        if not slug:
+            return None
+        if slug not in self.ids:
+            self.created += 1
+            if self.dry_run:
+                self.ids[slug] = None
+            else:
+                obj, _ = self.model.objects.get_or_create(
+                    slug=slug, defaults={'name': name}
+                )
+                self.ids[slug] = obj.pk
+        return self.ids[slug]
+
+
+class Command(BaseCommand):
+    help = 'Import events from a CSV or JSON Lines file using batched inserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' to read from stdin.")
+        parser.add_argument(
+            '--format', choices=('csv', 'jsonl'),
+            help='Input format (default: guessed from the file extension).',
+        )
+        parser.add_argument(
+            '--organizer', required=True,
+            help='Username of the organizer for rows without an organizer column.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Validate the input and report what would be imported.',
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        batch_size = options['batch_size']
+        fmt = options['format']
+        if fmt is None:
+            fmt = 'jsonl' if options['path'].endswith(('.jsonl', '.ndjson')) else 'csv'
+        reader = read_jsonl if fmt == 'jsonl' else read_csv
+
+        User = get_user_model()
+        self.organizers = dict(User.objects.values_list('username', 'pk'))
+        if options['organizer'] not in self.organizers:
+            raise CommandError(f"Unknown organizer {options['organizer']!r}.")
+        self.default_organizer = options['organizer']
+        self.categories = LookupCache(EventCategory, self.dry_run)
+        self.tags = LookupCache(EventTag, self.dry_run)
+        self.slugs = SlugAllocator.for_queryset(Event.objects.all())
+
+        imported = errors = 0
+        if options['path'] == '-':
+            stream = sys.stdin
+        else:
+            stream = open(options['path'], newline='', encoding='utf-8')
+        try:
+            rows = reader(stream)
+            while True:
+                chunk = list(islice(rows, batch_size))
+                if not chunk:
+                    break
+                batch = []
+                for line_number, row in chunk:
+                    try:
+                        if isinstance(row, ValidationError):
+                            raise row
+                        batch.append(self.build_event(row))
+                    except (ValidationError, ValueError, TypeError) as exc:
+                        errors += 1
+                        self.stderr.write(f'Line {line_number}: {exc}')
+                if batch and not self.dry_run:
+                    self.write_batch(batch)
+                imported += len(batch)
+                self.stdout.write(f'{imported} events processed, {errors} rejected...')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if imported and not self.dry_run:
+            caching.bump_version(caching.EVENTS)
+        prefix = 'Dry run: would import' if self.dry_run else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix} {imported} events ({errors} rejected, '
+            f'{self.categories.created} new categories, {self.tags.created} new tags).'
+        ))
+
+    def build_event(self, row):
+        """Turn an input row into an unsaved Event and its tag ids.
+
+        Categories and tags are only looked up, and created, once the rest
+        of the row is valid, so rejected rows leave none behind.
+        """
+        event = Event()
+        for column in EVENT_COLUMNS:
+            value = row.get(column)
+            if value in (None, ''):
+                continue
+            field = Event._meta.get_field(column)
+            if field.get_internal_type() == 'BooleanField':
+                value = parse_bool(value)
+            setattr(event, column, field.to_python(value))
+        for column in DATE_COLUMNS:
+            setattr(event, column, parse_date(row.get(column)))
+
+        organizer = row.get('organizer') or self.default_organizer
+        if organizer not in self.organizers:
+            raise ValidationError(f'Unknown organizer {organizer!r}')
+        event.organizer_id = self.organizers[organizer]
+
+        event.full_clean(
+            exclude=['slug', 'organizer', 'category'],
+            validate_unique=False,
+            validate_constraints=False,
+        )
+        if event.end_date <= event.start_date:
+            raise ValidationError('end_date must be after start_date')
+
+        if row.get('category'):
+            event.category_id = self.categories.resolve(row['category'])
+        event.slug = self.slugs.allocate(event.title)
+        tag_ids = {self.tags.resolve(name) for name in split_tags(row.get('tags'))}
+        tag_ids.discard(None)
+        return event, tag_ids
+
+    def write_batch(self, batch):
+        events = [event for event, _ in batch]
+        with transaction.atomic():
+            Event.objects.bulk_create(events)
+            if any(event.pk is None for event in events):
+                # Backends without RETURNING (MySQL) leave pks unset.
+                ids = dict(
+                    Event.objects.filter(slug__in=[event.slug for event in events])
+                    .values_list('slug', 'pk')
+                )
+                for event in events:
+                    event.pk = ids[event.slug]
+
+            Through = Event.tags.through
+            Through.objects.bulk_create([
+                Through(event_id=event.pk, eventtag_id=tag_id)
+                for event, tag_ids in batch
+                for tag_id in tag_ids
+            ])
+            get_backend().index_events(events)
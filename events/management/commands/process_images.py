@@ -0,0 +1,77 @@
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from events import caching
+from events.images import ImageProcessingError, delete_variants, generate_variants
+from events.models import Event
+
+# (model, image field, variants field, sizes, timestamp columns to touch)
+TARGETS = (
+    (
+        'events.Event', 'main_image', 'main_image_variants', ('card', 'detail'),
+        ('updated_at',),
+    ),
+    (
+        settings.AUTH_USER_MODEL, 'profile_picture', 'profile_picture_variants',
+        ('avatar',), (),
+    ),
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG variants for newly uploaded images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling for new uploads instead of exiting when done.',
+        )
+        parser.add_argument('--interval', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        while True:
+            processed = sum(
+                self.process(*target, batch_size=options['batch_size'])
+                for target in TARGETS
+            )
+            if processed:
+                self.stdout.write(f'Processed {processed} images.')
+            elif options['loop']:
+                time.sleep(options['interval'])
+            else:
+                break
+        self.stdout.write(self.style.SUCCESS('No images pending.'))
+
+    def process(self, label, image_field, variants_field, sizes, touch, batch_size):
+        model = apps.get_model(label)
+        pending = (
+            model.objects.filter(**{f'{variants_field}__isnull': True})
+            .exclude(**{image_field: ''})
+            .exclude(**{f'{image_field}__isnull': True})
+            .only('pk', image_field)
+            .order_by('pk')[:batch_size]
+        )
+        processed = 0
+        for obj in pending:
+            field_file = getattr(obj, image_field)
+            try:
+                variants = generate_variants(field_file, sizes)
+            except ImageProcessingError as exc:
+                self.stderr.write(f'{model.__name__} {obj.pk}: {exc}')
+                # An empty mapping is "done": templates fall back to the original.
+                variants = {}
+            updates = {variants_field: variants}
+            updates.update((column, timezone.now()) for column in touch)
+            # Skip the write if the image was replaced while we worked on it.
+            current = model.objects.filter(pk=obj.pk, **{image_field: field_file.name})
+            if not current.update(**updates):
+                delete_variants(field_file.storage, variants)
+            processed += 1
+        if processed and model is Event:
+            caching.bump_version(caching.EVENTS)
+        return processed
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from events.models import Event
+from events.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the event full-text search index from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of events read and index rows written per batch.',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        count = backend.rebuild(
+            Event.objects.order_by('pk'), batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {count} events with {type(backend).__name__}.'
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from events.models import Event
+from events.stats import recount_event_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the denormalized attendee, favorite and review counters on '
+        'events.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'event_ids', nargs='*', type=int,
+            help='Only recount these events (default: all events).',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Event.objects.all()
+        if options['event_ids']:
+            queryset = queryset.filter(pk__in=options['event_ids'])
+        updated = recount_event_stats(queryset)
+        self.stdout.write(self.style.SUCCESS(f'Recounted stats for {updated} events.'))
@@ -0,0 +1,123 @@
+import json
+import platform
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from events.benchmarks import build_scenarios, run_scenario
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the event list (with each filter), detail, search, toggle and profile '
+        'pages through the test client and report latency, queries and peak memory '
+        'as JSON. Writes favorites and registrations: use a scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--username', default='bench_1',
+            help='User for the logged-in scenarios (default: bench_1).',
+        )
+        parser.add_argument(
+            '--search', default='jazz', help='Search term to benchmark.'
+        )
+        parser.add_argument(
+            '--only', action='append', default=[],
+            help='Run only scenarios whose name starts with this; repeatable.',
+        )
+        parser.add_argument(
+            '--warm-cache', action='store_true',
+            help='Keep the cache between requests instead of measuring cache misses.',
+        )
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Host header to send; allowed for the duration of the run.',
+        )
+        parser.add_argument('--output', help='Write the JSON report to this file.')
+        parser.add_argument('--compare', help='Earlier JSON report to compare against.')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f"No user {options['username']!r}; run seed_benchmark_data or "
+                f"pass --username."
+            )
+        try:
+            scenarios = build_scenarios(user, search=options['search'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        if options['only']:
+            scenarios = [
+                scenario for scenario in scenarios
+                if scenario.name.startswith(tuple(options['only']))
+            ]
+
+        anonymous = Client(HTTP_HOST=options['host'], raise_request_exception=False)
+        logged_in = Client(HTTP_HOST=options['host'], raise_request_exception=False)
+        logged_in.force_login(user)
+
+        results = {}
+        # Otherwise every request is a 400 unless DEBUG allows localhost.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, options['host']]
+        ):
+            for scenario in scenarios:
+                client = logged_in if scenario.logged_in else anonymous
+                results[scenario.name] = run_scenario(
+                    client, scenario, options['iterations'],
+                    warmup=options['warmup'], clear_cache=not options['warm_cache'],
+                )
+                self.stderr.write(
+                    f"{scenario.name}: p50 {results[scenario.name]['p50_ms']} ms, "
+                    f"{results[scenario.name]['queries_median']} queries"
+                )
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'events': Event.objects.count(),
+                'iterations': options['iterations'],
+                'warm_cache': options['warm_cache'],
+            },
+            'scenarios': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+        else:
+            self.stdout.write(output)
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def compare(self, path, results):
+        with open(path, encoding='utf-8') as handle:
+            baseline = json.load(handle)['scenarios']
+        self.stderr.write(f'\nCompared with {path}:')
+        for name, current in results.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            change = (current['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+            queries = current['queries_median'] - before['queries_median']
+            self.stderr.write(
+                f'{name}: p50 {before["p50_ms"]} -> {current["p50_ms"]} ms '
+                f'({change:+.0f}%), '
+                f'queries {queries:+g}'
+            )
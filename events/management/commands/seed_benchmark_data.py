@@ -0,0 +1,272 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from events import caching
+from events import trending
+from events.models import (
+    Comment, Event, EventAttendee, EventCategory, EventInteraction, EventTag, Review,
+)
+from events.search import get_backend
+from events.slugs import SlugAllocator
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+# (city, country, latitude, longitude)
+CITIES = (
+    ('Springfield', 'USA', 39.7817, -89.6501),
+    ('London', 'UK', 51.5074, -0.1278),
+    ('Berlin', 'Germany', 52.5200, 13.4050),
+    ('Kigali', 'Rwanda', -1.9441, 30.0619),
+    ('Nairobi', 'Kenya', -1.2921, 36.8219),
+    ('Tokyo', 'Japan', 35.6762, 139.6503),
+    ('Toronto', 'Canada', 43.6532, -79.3832),
+    ('Sydney', 'Australia', -33.8688, 151.2093),
+    ('Paris', 'France', 48.8566, 2.3522),
+    ('Sao Paulo', 'Brazil', -23.5505, -46.6333),
+)
+CATEGORIES = (
+    'Music', 'Technology', 'Sports', 'Food & Drink', 'Arts', 'Business',
+    'Health', 'Education', 'Community', 'Film', 'Outdoors', 'Charity',
+)
+WORDS = (
+    'annual', 'summer', 'winter', 'night', 'morning', 'open', 'live', 'local',
+    'global', 'youth', 'family', 'startup', 'jazz', 'rock', 'classical', 'python',
+    'django', 'data', 'design', 'photography', 'yoga', 'running', 'cycling',
+    'football', 'chess', 'wine', 'coffee', 'street', 'food', 'market', 'film',
+    'theatre', 'poetry', 'garden', 'science', 'robotics', 'health', 'career',
+    'charity', 'book', 'craft', 'dance', 'comedy', 'history', 'language', 'travel',
+)
+KINDS = (
+    'Meetup', 'Festival', 'Workshop', 'Conference', 'Concert', 'Fair', 'Tour', 'Class'
+)
+# Share of reviews giving 1 to 5 stars.
+RATING_WEIGHTS = (5, 10, 20, 35, 30)
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-generate a reproducible synthetic data set (users, taxonomy, events '
+        'with coordinates, attendees, favorites, comments and reviews) for benchmarks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='10k')
+        parser.add_argument(
+            '--events', type=int, help='Number of events; overrides --scale.'
+        )
+        parser.add_argument('--seed', type=int, default=1, help='Random seed.')
+        parser.add_argument(
+            '--prefix', default='bench',
+            help='Username prefix of the generated users; must not be in use.',
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = options['events'] or SCALES[options['scale']]
+        batch_size = options['batch_size']
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+
+        User = get_user_model()
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(
+                f'Users named {prefix}_* exist already; pick another --prefix.'
+            )
+
+        self.user_ids = self.create_users(
+            User, prefix, max(100, total // 10), batch_size
+        )
+        # One in ten users organizes events.
+        self.organizer_ids = self.user_ids[::10]
+        self.category_ids = self.create_taxonomy(EventCategory, CATEGORIES)
+        self.tag_ids = self.create_taxonomy(EventTag, WORDS)
+        self.slugs = SlugAllocator.for_queryset(Event.objects.all())
+
+        created = 0
+        while created < total:
+            count = min(batch_size, total - created)
+            self.create_events(count)
+            created += count
+            self.stdout.write(f'{created} events created...')
+
+        caching.bump_version(caching.EVENTS)
+        caching.bump_version(caching.TAXONOMY)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {total} events and {len(self.user_ids)} users. Run '
+            '`python manage.py update_trending_scores --rebuild` to score them.'
+        ))
+
+    def create_users(self, User, prefix, count, batch_size):
+        # Hashing is slow by design; every generated user shares one password.
+        password = make_password(prefix)
+        for start in range(0, count, batch_size):
+            User.objects.bulk_create([
+                User(
+                    username=f'{prefix}_{n}',
+                    email=f'{prefix}_{n}@example.com',
+                    first_name=self.rng.choice(WORDS).title(),
+                    location=self.rng.choice(CITIES)[0],
+                    password=password,
+                )
+                for n in range(start, min(start + batch_size, count))
+            ])
+        return list(
+            User.objects.filter(username__startswith=f'{prefix}_')
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+    def create_taxonomy(self, model, names):
+        for name in names:
+            model.objects.get_or_create(
+                slug=slugify(name), defaults={'name': name.title()}
+            )
+        return list(model.objects.values_list('pk', flat=True))
+
+    def create_events(self, count):
+        rng = self.rng
+        events, related = [], []
+        for _ in range(count):
+            city, country, latitude, longitude = rng.choice(CITIES)
+            start = self.now + timedelta(days=rng.uniform(-365, 180))
+            words = (rng.choice(WORDS).title(), rng.choice(WORDS).title())
+            title = f'{words[0]} {words[1]} {rng.choice(KINDS)}'
+            capacity = rng.choice((None, 20, 50, 100, 500))
+            is_free = rng.random() < 0.6
+            event = Event(
+                title=title,
+                slug=self.slugs.allocate(title),
+                description=self.sentence(20, 80),
+                start_date=start,
+                end_date=start + timedelta(hours=rng.choice((1, 2, 3, 8, 48))),
+                location_name=f'{rng.choice(WORDS).title()} Hall',
+                address=f'{rng.randint(1, 999)} {rng.choice(WORDS).title()} Street',
+                city=city,
+                country=country,
+                latitude=Decimal(f'{latitude + rng.uniform(-0.3, 0.3):.6f}'),
+                longitude=Decimal(f'{longitude + rng.uniform(-0.3, 0.3):.6f}'),
+                capacity=capacity,
+                is_free=is_free,
+                price=None if is_free else Decimal(rng.choice((5, 10, 25, 50, 120))),
+                is_published=rng.random() < 0.95,
+                is_featured=rng.random() < 0.02,
+                organizer_id=rng.choice(self.organizer_ids),
+                category_id=rng.choice(self.category_ids),
+            )
+            related.append(self.plan_related(event, capacity))
+            events.append(event)
+
+        with transaction.atomic():
+            Event.objects.bulk_create(events)
+            if any(event.pk is None for event in events):
+                # Backends without RETURNING (MySQL) leave pks unset.
+                ids = dict(
+                    Event.objects.filter(slug__in=[event.slug for event in events])
+                    .values_list('slug', 'pk')
+                )
+                for event in events:
+                    event.pk = ids[event.slug]
+            self.create_related(events, related)
+            get_backend().index_events(events)
+
+    def sentence(self, shortest, longest):
+        words = self.rng.choices(WORDS, k=self.rng.randint(shortest, longest))
+        return ' '.join(words).capitalize() + '.'
+
+    def sample_users(self, mean, limit=None):
+        count = int(self.rng.expovariate(1 / mean)) if mean else 0
+        if limit is not None:
+            count = min(count, limit)
+        return self.rng.sample(self.user_ids, min(count, len(self.user_ids)))
+
+    def plan_related(self, event, capacity):
+        """Pick the event's related rows and set its counters to match."""
+        rng = self.rng
+        attendees = self.sample_users(8, capacity)
+        favorites = self.sample_users(3)
+        commenters = [
+            rng.choice(self.user_ids) for _ in range(int(rng.expovariate(1 / 2)))
+        ]
+        reviews = []
+        if event.start_date < self.now:
+            for user_id in self.sample_users(2):
+                rating = rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0]
+                approved = rng.random() < 0.95
+                reviews.append((user_id, rating, approved))
+                if approved:
+                    event.review_count += 1
+                    event.rating_sum += rating
+                    field = f'rating_{rating}_count'
+                    setattr(event, field, getattr(event, field) + 1)
+        # Attendees of past events are marked as attended, which holds no seat.
+        event.registered_count = 0 if event.end_date < self.now else len(attendees)
+        event.favorites_count = len(favorites)
+        tags = rng.sample(self.tag_ids, rng.randint(0, 4))
+        return tags, attendees, favorites, commenters, reviews
+
+    def create_related(self, events, related):
+        rng = self.rng
+        tag_rows, attendee_rows, favorite_rows, comments, reviews = [], [], [], [], []
+        Tags = Event.tags.through
+        Favorites = Event.favorites.through
+        for event, (tags, attendees, favorites, commenters, event_reviews) in zip(
+            events, related
+        ):
+            tag_rows.extend(
+                Tags(event_id=event.pk, eventtag_id=tag_id) for tag_id in tags
+            )
+            status = 'attended' if event.end_date < self.now else 'registered'
+            attendee_rows.extend(
+                EventAttendee(event_id=event.pk, user_id=user_id, status=status)
+                for user_id in attendees
+            )
+            favorite_rows.extend(
+                Favorites(event_id=event.pk, user_id=user_id) for user_id in favorites
+            )
+            comments.extend(
+                Comment(
+                    event_id=event.pk, user_id=user_id,
+                    content=self.sentence(5, 30),
+                    is_approved=rng.random() < 0.97,
+                )
+                for user_id in commenters
+            )
+            reviews.extend(
+                Review(
+                    event_id=event.pk, user_id=user_id, rating=rating,
+                    is_approved=approved, content=self.sentence(5, 40),
+                )
+                for user_id, rating, approved in event_reviews
+            )
+        interactions = [
+            # Spread over the last two weeks so trending scores differ.
+            EventInteraction(
+                event_id=row.event_id, kind=kind,
+                created_at=self.now - timedelta(hours=rng.uniform(0, 14 * 24)),
+            )
+            for kind, rows in (
+                (trending.REGISTRATION, attendee_rows),
+                (trending.FAVORITE, favorite_rows),
+                (
+                    trending.COMMENT,
+                    [comment for comment in comments if comment.is_approved],
+                ),
+                (trending.REVIEW, [review for review in reviews if review.is_approved]),
+            )
+            for row in rows
+        ]
+        Tags.objects.bulk_create(tag_rows, batch_size=2000)
+        EventAttendee.objects.bulk_create(attendee_rows, batch_size=2000)
+        Favorites.objects.bulk_create(favorite_rows, batch_size=2000)
+        Comment.objects.bulk_create(comments, batch_size=2000)
+        Review.objects.bulk_create(reviews, batch_size=2000)
+        EventInteraction.objects.bulk_create(interactions, batch_size=2000)
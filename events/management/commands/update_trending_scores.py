@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from events import caching
+from events.trending import rebuild_trending_scores, update_trending_scores
+
+
+class Command(BaseCommand):
+    help = 'Decay trending scores and add interactions since the last run.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--half-life', type=float,
+            help='Hours for a score to halve '
+                 '(default: EVENTS_TRENDING_HALF_LIFE_HOURS or 24).',
+        )
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Recompute every score from the interaction history.',
+        )
+
+    def handle(self, *args, **options):
+        half_life = None
+        if options['half_life']:
+            half_life = timedelta(hours=options['half_life'])
+        if options['rebuild']:
+            updated = rebuild_trending_scores(half_life=half_life)
+        else:
+            updated = update_trending_scores(half_life=half_life)
+        # Score updates bypass Event.save(), so refresh the cached listings here.
+        caching.bump_version(caching.EVENTS)
+        self.stdout.write(
+            self.style.SUCCESS(f'Updated trending scores of {updated} events.')
+        )
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_alter_event_slug'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                fields=['latitude', 'longitude'], name='event_lat_lng_idx'
+            ),
+        ),
+    ]
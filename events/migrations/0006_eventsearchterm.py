@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_lat_lng_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSearchTerm',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField()),
+                (
+                    'event',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='search_terms', to='events.event',
+                    ),
+                ),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['term', 'event'], name='event_search_term_idx')
+                ],
+                'unique_together': {('event', 'term')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:39
+
+from django.db import migrations, models
+
+from events.stats import recount_event_stats
+
+
+def populate_event_counters(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    recount_event_stats(Event.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_eventsearchterm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='registered_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_event_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='eventattendee',
+            name='status',
+            field=models.CharField(
+                choices=[
+                    ('registered', 'Registered'), ('waitlisted', 'Waitlisted'),
+                    ('attended', 'Attended'), ('cancelled', 'Cancelled'),
+                ],
+                default='registered', max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_eventattendee_waitlisted'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                fields=['is_published', 'start_date'], name='event_published_start_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='eventattendee',
+            index=models.Index(
+                fields=['event', 'status', 'user'], name='attendee_event_status_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+from events.stats import recount_event_stats
+
+
+def populate_rating_histogram(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    recount_event_stats(Event.objects.filter(review_count__gt=0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_trending_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(
+                fields=['event', 'is_approved', '-created_at'],
+                name='review_event_approved_idx',
+            ),
+        ),
+        migrations.RunPython(populate_rating_histogram, migrations.RunPython.noop),
+    ]
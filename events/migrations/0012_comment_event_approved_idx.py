@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_rating_histogram'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(
+                fields=['event', 'is_approved', '-created_at'],
+                name='comment_event_approved_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 04:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_comment_event_approved_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='main_image_variants',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
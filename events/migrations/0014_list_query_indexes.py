@@ -0,0 +1,76 @@
+# Generated by Django 5.1.6 on 2026-10-17 04:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='event',
+            name='events_even_start_d_280b51_idx',
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                fields=['category', 'is_published', 'start_date'],
+                name='event_category_start_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                fields=['is_published', '-registered_count', '-start_date'],
+                name='event_popular_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                condition=models.Q(('is_published', True)),
+                fields=['start_date', 'id', 'end_date'], name='event_public_start_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                condition=models.Q(('is_published', True)),
+                fields=['category', 'start_date', 'id'],
+                name='event_public_category_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                condition=models.Q(('is_published', True)),
+                fields=['-registered_count', '-start_date'],
+                name='event_public_popular_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                condition=models.Q(('is_published', True)),
+                fields=['-trending_score', '-start_date'],
+                name='event_public_trending_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                fields=['organizer', 'start_date'], name='event_organizer_start_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='eventattendee',
+            index=models.Index(
+                fields=['user', 'status', 'event'], name='attendee_user_status_idx'
+            ),
+        ),
+    ]
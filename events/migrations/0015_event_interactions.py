@@ -0,0 +1,84 @@
+# Generated by Django 5.1.6 on 2026-10-17 04:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from itertools import islice
+
+from django.db import migrations, models
+
+
+def backfill_interactions(apps, schema_editor):
+    """Log the existing registrations, reviews and comments.
+
+    Favorites have no timestamp to backfill from. The trending checkpoint
+    is dropped so the next update rebuilds every score from the log.
+    """
+    EventInteraction = apps.get_model('events', 'EventInteraction')
+    EventAttendee = apps.get_model('events', 'EventAttendee')
+    Review = apps.get_model('events', 'Review')
+    Comment = apps.get_model('events', 'Comment')
+    sources = [
+        (
+            'registration',
+            EventAttendee.objects.filter(status__in=('registered', 'waitlisted')),
+            'registration_date',
+        ),
+        ('review', Review.objects.filter(is_approved=True), 'created_at'),
+        ('comment', Comment.objects.filter(is_approved=True), 'created_at'),
+    ]
+    for kind, queryset, timestamp in sources:
+        rows = queryset.order_by('pk').values_list('event_id', timestamp).iterator(
+            chunk_size=2000
+        )
+        while chunk := list(islice(rows, 2000)):
+            EventInteraction.objects.bulk_create([
+                EventInteraction(event_id=event_id, kind=kind, created_at=created_at)
+                for event_id, created_at in chunk
+            ])
+    apps.get_model('events', 'ScoreCheckpoint').objects.filter(name='trending').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0014_list_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventInteraction',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'kind',
+                    models.CharField(
+                        choices=[
+                            ('registration', 'Registration'), ('favorite', 'Favorite'),
+                            ('review', 'Review'), ('comment', 'Comment'),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    'created_at',
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                (
+                    'event',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='interactions', to='events.event',
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_interactions, migrations.RunPython.noop),
+    ]
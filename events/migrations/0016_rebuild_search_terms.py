@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def rebuild_search_terms(apps, schema_editor):
+    """Re-index every event, since the stemmer now maps words differently."""
+    from events.search import InvertedIndexBackend
+
+    backend = InvertedIndexBackend()
+    backend.term_model = apps.get_model('events', 'EventSearchTerm')
+    backend.rebuild(apps.get_model('events', 'Event').objects.order_by('pk'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0015_event_interactions'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_search_terms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.6 on 2026-10-17 05:10
+
+import django.db.models.deletion
+import django.utils.timezone
+import events.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0016_rebuild_search_terms'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeedKey',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'key',
+                    models.CharField(
+                        default=events.models.new_feed_key, max_length=64, unique=True
+                    ),
+                ),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    'user',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='calendar_feed_key', to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
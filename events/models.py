@@ -1,10 +1,17 @@
-from django.db import models
+import secrets
+
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
-from django.utils.text import slugify
+
+from .slugs import allocate_unique_slug
+
+SLUG_ATTEMPTS = 3
+# Condition of the partial indexes on published events.
+PUBLISHED = models.Q(is_published=True)
 
 
 class EventCategory(models.Model):
@@ -63,6 +70,21 @@ class Event(models.Model):
 
     # Media
     main_image = models.ImageField(upload_to='event_images/', null=True, blank=True)
+    # Resized copies of main_image made by events.images; None while pending.
+    main_image_variants = models.JSONField(null=True, blank=True, editable=False)
+
+    # Denormalized counters, maintained by events.stats
+    registered_count = models.PositiveIntegerField(default=0, editable=False)
+    favorites_count = models.PositiveIntegerField(default=0, editable=False)
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
+    # Time-decayed interaction score, maintained by events.trending
+    trending_score = models.FloatField(default=0, editable=False)
 
     # Relationships
     organizer = models.ForeignKey(
@@ -94,23 +116,76 @@ class Event(models.Model):
 
     class Meta:
         ordering = ['-start_date']
+        # Each index serves a query shape of the event list and profile
+        # pages; events.tests.IndexUsageTests checks the plans on SQLite.
+        # Django writes is_published=True as a bare "WHERE is_published" on
+        # SQLite and PostgreSQL, which SQLite can only match against a
+        # partial index with that same condition; MySQL compares the column
+        # and uses the composite indexes leading with is_published instead,
+        # so its models.W037 warning is silenced in settings. Only Event and
+        # social.FeedItem may raise it; IndexUsageTests checks the list.
         indexes = [
-            models.Index(fields=['start_date', 'city', 'is_published']),
+            models.Index(fields=['latitude', 'longitude'], name='event_lat_lng_idx'),
+            # Default order and cursor pages, also used by reminders.
+            models.Index(
+                fields=['is_published', 'start_date'], name='event_published_start_idx'
+            ),
+            models.Index(
+                fields=['category', 'is_published', 'start_date'],
+                name='event_category_start_idx',
+            ),
+            models.Index(
+                fields=['is_published', '-registered_count', '-start_date'],
+                name='event_popular_idx',
+            ),
+            models.Index(
+                fields=['is_published', '-trending_score'], name='event_trending_idx'
+            ),
+            # Partial versions of the above. end_date lets upcoming/past
+            # filters be checked without reading the row.
+            models.Index(
+                fields=['start_date', 'id', 'end_date'],
+                condition=PUBLISHED,
+                name='event_public_start_idx',
+            ),
+            models.Index(
+                fields=['category', 'start_date', 'id'],
+                condition=PUBLISHED,
+                name='event_public_category_idx',
+            ),
+            models.Index(
+                fields=['-registered_count', '-start_date'],
+                condition=PUBLISHED,
+                name='event_public_popular_idx',
+            ),
+            models.Index(
+                fields=['-trending_score', '-start_date'],
+                condition=PUBLISHED,
+                name='event_public_trending_idx',
+            ),
+            # A user's own events, newest first.
+            models.Index(
+                fields=['organizer', 'start_date'], name='event_organizer_start_idx'
+            ),
         ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            # Generate the initial slug
-            self.slug = slugify(self.title)
-            # Check if the slug exists
-            counter = 1
-            while Event.objects.filter(slug=self.slug).exists():
-                self.slug = f"{slugify(self.title)}-{counter}"
-                counter += 1
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        for attempt in range(SLUG_ATTEMPTS):
+            self.slug = allocate_unique_slug(Event.objects.all(), self.title)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # Another insert took the slug between allocation and save.
+                taken = Event.objects.filter(slug=self.slug).exists()
+                if attempt == SLUG_ATTEMPTS - 1 or not taken:
+                    self.slug = ''
+                    raise
 
     def get_absolute_url(self):
         return reverse('events:event-detail', kwargs={'slug': self.slug})
@@ -124,11 +199,40 @@ class Event(models.Model):
         now = timezone.now()
         return self.start_date <= now <= self.end_date
 
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return None
+        return self.rating_sum / self.review_count
+
+    @property
+    def rounded_rating(self):
+        """Average rating rounded to whole stars, or 0 without reviews."""
+        average = self.average_rating
+        return 0 if average is None else int(average + 0.5)
+
+    @property
+    def rating_histogram(self):
+        """``(stars, count, percent)`` for 5 stars down to 1."""
+        total = self.review_count
+        rows = []
+        for stars in range(5, 0, -1):
+            count = getattr(self, f'rating_{stars}_count')
+            rows.append((stars, count, round(100 * count / total) if total else 0))
+        return rows
+
+    @property
+    def spots_remaining(self):
+        if self.capacity is None:
+            return None
+        return max(self.capacity - self.registered_count, 0)
+
 
 class EventAttendee(models.Model):
     """Model for event attendance tracking."""
     STATUS_CHOICES = [
         ('registered', _('Registered')),
+        ('waitlisted', _('Waitlisted')),
         ('attended', _('Attended')),
         ('cancelled', _('Cancelled')),
     ]
@@ -140,6 +244,16 @@ class EventAttendee(models.Model):
 
     class Meta:
         unique_together = ['event', 'user']
+        indexes = [
+            # Covers "user ids of this event's registered attendees".
+            models.Index(
+                fields=['event', 'status', 'user'], name='attendee_event_status_idx'
+            ),
+            # A user's registered or attended events.
+            models.Index(
+                fields=['user', 'status', 'event'], name='attendee_user_status_idx'
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -153,6 +267,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['event', 'is_approved', '-created_at'],
+                name='comment_event_approved_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'Comment by {self.user.username} on {self.event.title}'
@@ -173,6 +293,87 @@ class Review(models.Model):
     class Meta:
         unique_together = ['event', 'user']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['event', 'is_approved', '-created_at'],
+                name='review_event_approved_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'Review by {self.user.username} on {self.event.title}'
+
+
+class EventSearchTerm(models.Model):
+    """Inverted index entry: a stemmed term and its weight in an event."""
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name='search_terms'
+    )
+    term = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = ['event', 'term']
+        indexes = [
+            models.Index(fields=['term', 'event'], name='event_search_term_idx'),
+        ]
+
+    def __str__(self):
+        return self.term
+
+
+class EventInteraction(models.Model):
+    """Append-only record of interest in an event, read by the trending score.
+
+    Written when a registration becomes active (including re-registrations
+    and waitlist promotions), an event is favorited, or a review or comment
+    is approved, so rows are only ever added, never updated.
+    """
+    KIND_CHOICES = [
+        ('registration', _('Registration')),
+        ('favorite', _('Favorite')),
+        ('review', _('Review')),
+        ('comment', _('Comment')),
+    ]
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name='interactions'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f'{self.kind} of event {self.event_id}'
+
+
+def new_feed_key():
+    return secrets.token_urlsafe(32)
+
+
+class CalendarFeedKey(models.Model):
+    """Secret in the URLs of a user's personal calendar feeds.
+
+    Calendar apps cannot log in, so the key alone grants access; replacing
+    it revokes every link handed out before.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='calendar_feed_key'
+    )
+    key = models.CharField(max_length=64, unique=True, default=new_feed_key)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'Calendar feed key of {self.user_id}'
+
+
+class ScoreCheckpoint(models.Model):
+    """Where a periodically recomputed score last left off."""
+    name = models.CharField(max_length=50, unique=True)
+    computed_at = models.DateTimeField()
+    # Highest primary key already counted, per source.
+    positions = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f'{self.name} at {self.computed_at}'
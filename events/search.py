@@ -0,0 +1,245 @@
+"""Full-text search for events.
+
+The default backend keeps an inverted index of stemmed terms in
+``EventSearchTerm`` and ranks matches by the summed term weights. Backends
+share one small interface so a database-native engine (SQLite FTS5, MySQL
+FULLTEXT) can be swapped in with the ``EVENTS_SEARCH_BACKEND`` setting.
+"""
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Case, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = 'events.search.InvertedIndexBackend'
+
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+MAX_TERM_WEIGHT = 100
+
+# Weight of a single occurrence of a term in each indexed field.
+FIELD_WEIGHTS = {
+    'title': 5,
+    'location_name': 3,
+    'city': 3,
+    'description': 1,
+}
+
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has in is it of on or that the this '
+    'to was were will with'.split()
+)
+
+_WORD_RE = re.compile(r'\w+')
+
+# Ordered longest first; the first matching suffix is stripped, and
+# stripping repeats so stacked suffixes ("meetings") reduce fully.
+_SUFFIXES = (
+    ('ational', 'ate'),
+    ('ization', 'ize'),
+    ('fulness', 'ful'),
+    ('iveness', 'ive'),
+    ('ingly', ''),
+    ('edly', ''),
+    ('sses', 'ss'),
+    ('ies', 'y'),
+    ('ing', ''),
+    ('ed', ''),
+    ('ly', ''),
+    ('s', ''),
+)
+MIN_ROOT_LENGTH = 3
+
+
+def _strip_suffix(word):
+    """Return ``word`` with its first matching suffix replaced, or unchanged."""
+    for suffix, replacement in _SUFFIXES:
+        if not word.endswith(suffix):
+            continue
+        root = word[:-len(suffix)]
+        if len(root) < MIN_ROOT_LENGTH or (suffix == 's' and root[-1] in 'su'):
+            return word
+        if (suffix in ('ing', 'ed') and root[-1] == root[-2]
+                and root[-1] not in 'aeioulsz'):
+            root = root[:-1]
+        return root + replacement
+    return word
+
+
+def stem(word):
+    """Strip common English suffixes so inflected forms share a term.
+
+    A final silent "e" is dropped as well, so "dance", "dances", "danced"
+    and "dancing" all become "danc".
+    """
+    if len(word) <= 3 or word.isdigit():
+        return word
+    stripped = _strip_suffix(word)
+    while stripped != word:
+        word, stripped = stripped, _strip_suffix(stripped)
+    if word.endswith('e') and len(word) > MIN_ROOT_LENGTH:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Split text into stemmed, lower-cased search terms."""
+    terms = []
+    for word in _WORD_RE.findall(text.lower()):
+        if word in STOPWORDS or len(word) > MAX_TERM_LENGTH:
+            continue
+        terms.append(stem(word))
+    return terms
+
+
+def prefix_range(term):
+    """Return ``(low, high)`` bounds matching every string starting with term.
+
+    A range comparison uses the term index on every database, unlike
+    ``LIKE 'term%'`` which SQLite only optimises for NOCASE columns.
+    """
+    return term, term[:-1] + chr(ord(term[-1]) + 1)
+
+
+class BaseSearchBackend:
+    """Interface shared by event search backends."""
+
+    def index_event(self, event):
+        raise NotImplementedError
+
+    def index_events(self, events):
+        """Index several events, e.g. after ``bulk_create``."""
+        for event in events:
+            self.index_event(event)
+
+    def remove_event(self, event_id):
+        raise NotImplementedError
+
+    def rebuild(self, queryset, batch_size=500):
+        """Re-index every event in ``queryset`` and return the count."""
+        raise NotImplementedError
+
+    def search(self, queryset, query):
+        """Filter ``queryset`` to matches, annotated with ``search_rank``."""
+        raise NotImplementedError
+
+
+class InvertedIndexBackend(BaseSearchBackend):
+    """Portable backend storing weighted terms in ``EventSearchTerm``."""
+
+    @cached_property
+    def term_model(self):
+        from .models import EventSearchTerm
+        return EventSearchTerm
+
+    def build_terms(self, event):
+        weights = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(getattr(event, field) or ''):
+                weights[term] += weight
+        return [
+            self.term_model(
+                event_id=event.pk, term=term, weight=min(weight, MAX_TERM_WEIGHT)
+            )
+            for term, weight in weights.items()
+        ]
+
+    def index_event(self, event):
+        with transaction.atomic():
+            self.remove_event(event.pk)
+            self.term_model.objects.bulk_create(self.build_terms(event))
+
+    def index_events(self, events):
+        rows = [row for event in events for row in self.build_terms(event)]
+        with transaction.atomic():
+            event_ids = [event.pk for event in events]
+            self.term_model.objects.filter(event_id__in=event_ids).delete()
+            self.term_model.objects.bulk_create(rows, batch_size=500)
+
+    def remove_event(self, event_id):
+        self.term_model.objects.filter(event_id=event_id).delete()
+
+    def rebuild(self, queryset, batch_size=500):
+        count = 0
+        with transaction.atomic():
+            self.term_model.objects.all().delete()
+            rows = []
+            for event in queryset.only(*FIELD_WEIGHTS).iterator(chunk_size=batch_size):
+                rows.extend(self.build_terms(event))
+                count += 1
+                if len(rows) >= batch_size:
+                    self.term_model.objects.bulk_create(rows, batch_size=batch_size)
+                    rows = []
+            self.term_model.objects.bulk_create(rows, batch_size=batch_size)
+        return count
+
+    def search(self, queryset, query):
+        terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+        if not terms:
+            return queryset.none().annotate(
+                search_rank=Value(0, output_field=IntegerField())
+            )
+
+        any_term = Q()
+        for term in terms:
+            low, high = prefix_range(term)
+            matches = self.term_model.objects.filter(term__gte=low, term__lt=high)
+            queryset = queryset.filter(pk__in=matches.values('event_id'))
+            any_term |= Q(term__gte=low, term__lt=high)
+
+        # Exact (non-prefix) matches count double.
+        rank = (
+            self.term_model.objects.filter(any_term, event=OuterRef('pk'))
+            .order_by()
+            .values('event')
+            .annotate(total=Sum(Case(
+                When(term__in=terms, then=F('weight') * 2),
+                default=F('weight'),
+                output_field=IntegerField(),
+            )))
+            .values('total')
+        )
+        return queryset.annotate(
+            search_rank=Subquery(rank, output_field=IntegerField())
+        )
+
+
+class IContainsBackend(BaseSearchBackend):
+    """Unindexed substring matching; useful when no index has been built."""
+
+    fields = ('title', 'description', 'location_name', 'city')
+
+    def index_event(self, event):
+        pass
+
+    def remove_event(self, event_id):
+        pass
+
+    def rebuild(self, queryset, batch_size=500):
+        return 0
+
+    def search(self, queryset, query):
+        q = Q()
+        for field in self.fields:
+            q |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(q).annotate(
+            search_rank=Value(0, output_field=IntegerField())
+        )
+
+
+_backend = None
+
+
+def get_backend():
+    """Return the configured search backend instance."""
+    global _backend
+    path = getattr(settings, 'EVENTS_SEARCH_BACKEND', DEFAULT_BACKEND)
+    if _backend is None or _backend.path != path:
+        _backend = import_string(path)()
+        _backend.path = path
+    return _backend
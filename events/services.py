@@ -0,0 +1,132 @@
+"""Event registration with capacity and deadline enforcement.
+
+Seats are claimed with a conditional ``UPDATE`` on ``Event.registered_count``
+that only succeeds while the counter is below ``capacity``, so concurrent
+requests can never oversell an event: the database serialises the updates
+and at most ``capacity`` of them match. Status transitions on
+``EventAttendee`` are conditional updates too, which makes double submits
+from the same user harmless.
+
+Each transaction starts with its write, before reading anything. That
+locks the event (or attendee) row up front, so concurrent requests queue
+behind each other. On SQLite, a transaction that read first could not
+take the write lock later and failed with "database is locked".
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Event, EventAttendee
+from .stats import adjust_event_counters
+from .trending import REGISTRATION, record_interactions
+
+REGISTERED = 'registered'
+WAITLISTED = 'waitlisted'
+CANCELLED = 'cancelled'
+
+# Statuses that hold, or queue for, a place at the event.
+ACTIVE_STATUSES = (REGISTERED, WAITLISTED)
+
+
+class RegistrationClosed(Exception):
+    """Raised when an event no longer accepts registrations."""
+
+
+def registration_is_open(event, now=None):
+    now = now or timezone.now()
+    if event.registration_deadline and now > event.registration_deadline:
+        return False
+    return event.end_date > now
+
+
+def claim_seat(event_id):
+    """Take one seat if the event has room; return whether it succeeded."""
+    has_room = Q(capacity__isnull=True) | Q(registered_count__lt=F('capacity'))
+    return bool(
+        Event.objects.filter(has_room, pk=event_id)
+        .update(registered_count=F('registered_count') + 1)
+    )
+
+
+def release_seat(event_id):
+    adjust_event_counters(event_id, registered_count=-1)
+
+
+def register(event, user):
+    """Register ``user`` for ``event``, or waitlist them if it is full.
+
+    Returns the ``EventAttendee`` row. Registering twice is a no-op.
+    """
+    if not registration_is_open(event):
+        raise RegistrationClosed
+    try:
+        with transaction.atomic():
+            return _register(event, user)
+    except IntegrityError:
+        # A concurrent request from the same user inserted the row first;
+        # our seat claim was rolled back with the transaction.
+        return EventAttendee.objects.get(event=event, user=user)
+
+
+def _register(event, user):
+    # Claimed before looking at the user's row, as the transaction's first
+    # statement; handed back if they turn out to be registered already.
+    status = REGISTERED if claim_seat(event.pk) else WAITLISTED
+    attendance = EventAttendee.objects.filter(event=event, user=user).first()
+    if attendance is not None and attendance.status != CANCELLED:
+        if status == REGISTERED:
+            release_seat(event.pk)
+        return attendance
+
+    if attendance is None:
+        attendance = EventAttendee.objects.create(event=event, user=user, status=status)
+        record_interactions(REGISTRATION, [event.pk])
+        return attendance
+
+    # Waitlist position is taken from the time of the latest registration.
+    now = timezone.now()
+    reopened = EventAttendee.objects.filter(pk=attendance.pk, status=CANCELLED).update(
+        status=status, registration_date=now
+    )
+    if not reopened:
+        if status == REGISTERED:
+            release_seat(event.pk)
+        attendance.refresh_from_db()
+        return attendance
+    attendance.status = status
+    attendance.registration_date = now
+    record_interactions(REGISTRATION, [event.pk])
+    return attendance
+
+
+def cancel(event, user):
+    """Cancel the user's registration or waitlist entry.
+
+    A freed seat goes to the longest-waiting waitlisted attendee. Returns
+    whether anything was cancelled.
+    """
+    attendance = EventAttendee.objects.filter(event=event, user=user)
+    with transaction.atomic():
+        if attendance.filter(status=REGISTERED).update(status=CANCELLED):
+            release_seat(event.pk)
+            promote_waitlisted(event.pk)
+            return True
+        return bool(attendance.filter(status=WAITLISTED).update(status=CANCELLED))
+
+
+def promote_waitlisted(event_id, candidates=5):
+    """Move the next waitlisted attendee into a free seat, if there is one."""
+    if not claim_seat(event_id):
+        return None
+    waitlist = EventAttendee.objects.filter(
+        event_id=event_id, status=WAITLISTED
+    ).order_by('registration_date', 'pk')
+    for attendance in waitlist[:candidates]:
+        if EventAttendee.objects.filter(pk=attendance.pk, status=WAITLISTED).update(
+            status=REGISTERED
+        ):
+            attendance.status = REGISTERED
+            record_interactions(REGISTRATION, [event_id])
+            return attendance
+    release_seat(event_id)
+    return None
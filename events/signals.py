@@ -0,0 +1,85 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import caching, images
+from .models import Comment, Event, EventCategory, EventTag, Review
+from .search import get_backend
+from .stats import adjust_event_counters, counter_difference, review_contribution
+from .trending import COMMENT, REVIEW, record_interactions
+
+
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, raw=False, **kwargs):
+    """Keep the search index in step with event edits."""
+    if not raw:
+        get_backend().index_event(instance)
+
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, **kwargs):
+    get_backend().remove_event(instance.pk)
+
+
+@receiver(pre_save, sender=Event)
+def reset_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        images.reset_variants_if_changed(instance, 'main_image', 'main_image_variants')
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_state(sender, instance, raw=False, **kwargs):
+    """Stash the stored review so post_save can apply only the difference."""
+    if raw or instance._state.adding or instance.pk is None:
+        instance._stored_review = None
+    else:
+        instance._stored_review = sender.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Review)
+def update_review_counters(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    stored = getattr(instance, '_stored_review', None)
+    old = review_contribution(stored)
+    new = review_contribution(instance)
+    if stored is not None and stored.event_id != instance.event_id:
+        adjust_event_counters(stored.event_id, **counter_difference({}, old))
+        old = {}
+    adjust_event_counters(instance.event_id, **counter_difference(new, old))
+    if instance.is_approved and not (stored is not None and stored.is_approved):
+        record_interactions(REVIEW, [instance.event_id])
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_approval(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or instance.pk is None:
+        instance._was_approved = False
+    else:
+        stored = sender.objects.filter(pk=instance.pk, is_approved=True)
+        instance._was_approved = stored.exists()
+
+
+@receiver(post_save, sender=Comment)
+def log_approved_comment(sender, instance, raw=False, **kwargs):
+    """Count a comment towards the trending score once it is approved."""
+    if not raw and instance.is_approved and not instance._was_approved:
+        record_interactions(COMMENT, [instance.event_id])
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_counters(sender, instance, **kwargs):
+    adjust_event_counters(
+        instance.event_id, **counter_difference({}, review_contribution(instance))
+    )
+
+
+@receiver([post_save, post_delete], sender=Event)
+@receiver(m2m_changed, sender=Event.tags.through)
+def invalidate_event_listings(sender, **kwargs):
+    caching.bump_version(caching.EVENTS)
+
+
+@receiver([post_save, post_delete], sender=EventCategory)
+@receiver([post_save, post_delete], sender=EventTag)
+def invalidate_taxonomy(sender, **kwargs):
+    caching.bump_version(caching.TAXONOMY)
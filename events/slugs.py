@@ -0,0 +1,94 @@
+"""Unique slug allocation for events.
+
+Both allocation paths read the taken slugs once instead of probing
+``exists()`` for every ``-N`` candidate: ``allocate_unique_slug`` fetches
+the slugs sharing the new slug's prefix in a single query, and
+``SlugAllocator`` works in memory from a snapshot for bulk writes.
+"""
+from django.db.models import Q
+from django.utils.text import slugify
+
+from .search import prefix_range
+
+DEFAULT_BASE = 'event'
+# Leaves room for a "-N" suffix when a long base has to be trimmed.
+SUFFIX_ROOM = 8
+
+
+def slug_base(title, max_length):
+    return slugify(title)[:max_length].strip('-') or DEFAULT_BASE
+
+
+def with_suffix(base, counter, max_length):
+    """Return ``base-counter``, trimming ``base`` so the result fits."""
+    suffix = f'-{counter}'
+    return f'{base[:max_length - len(suffix)].rstrip("-")}{suffix}'
+
+
+class SlugAllocator:
+    """Hand out unique slugs in memory against a snapshot of taken ones.
+
+    Meant for bulk writes: load the existing slugs once, then allocate for
+    any number of new rows without touching the database.
+    """
+
+    def __init__(self, taken=(), max_length=50):
+        self.taken = set(taken)
+        self.max_length = max_length
+        self._next_counter = {}
+
+    @classmethod
+    def for_queryset(cls, queryset, field='slug'):
+        max_length = queryset.model._meta.get_field(field).max_length
+        return cls(
+            queryset.values_list(field, flat=True).iterator(), max_length=max_length
+        )
+
+    def allocate(self, title):
+        base = slug_base(title, self.max_length)
+        slug = base
+        counter = self._next_counter.get(base, 1)
+        while slug in self.taken:
+            slug = with_suffix(base, counter, self.max_length)
+            counter += 1
+        self._next_counter[base] = counter
+        self.taken.add(slug)
+        return slug
+
+
+def allocate_unique_slug(queryset, title, field='slug'):
+    """Return a slug for ``title`` that is not taken in ``queryset``.
+
+    Uses one range query over the slug index. The result can still race
+    with a concurrent insert, so callers should retry on IntegrityError.
+    """
+    max_length = queryset.model._meta.get_field(field).max_length
+    prefix = slug_base(title, max_length)[:max_length - SUFFIX_ROOM] or DEFAULT_BASE
+    low, high = prefix_range(prefix)
+    taken = queryset.filter(
+        **{f'{field}__gte': low, f'{field}__lt': high}
+    ).order_by().values_list(field, flat=True)
+    return SlugAllocator(taken, max_length=max_length).allocate(title)
+
+
+def backfill_slugs(queryset, batch_size=1000):
+    """Give every row in ``queryset`` without a slug a unique one.
+
+    Reads all taken slugs once and writes with ``bulk_update``, so it runs
+    in linear time. Returns the number of rows updated.
+    """
+    model = queryset.model
+    missing = Q(slug__isnull=True) | Q(slug='')
+    allocator = SlugAllocator.for_queryset(model._default_manager.exclude(missing))
+    updated = 0
+    batch = []
+    rows = queryset.filter(missing).only('pk', 'title')
+    for row in rows.iterator(chunk_size=batch_size):
+        row.slug = allocator.allocate(row.title)
+        batch.append(row)
+        if len(batch) >= batch_size:
+            updated += model._default_manager.bulk_update(batch, ['slug'])
+            batch = []
+    if batch:
+        updated += model._default_manager.bulk_update(batch, ['slug'])
+    return updated
@@ -0,0 +1,123 @@
+"""Denormalized per-event counters.
+
+``Event`` carries running totals of registrations, favorites and approved
+reviews, plus a histogram of approved ratings, so pages can read a column
+instead of aggregating related rows on every render. Writers adjust them
+with ``F()`` expressions inside the same transaction as the row they
+change; ``recount_event_stats`` rebuilds them from the source tables to
+repair drift.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+RATINGS = range(1, 6)
+RATING_COUNT_FIELDS = tuple(f'rating_{stars}_count' for stars in RATINGS)
+COUNTER_FIELDS = (
+    'registered_count', 'favorites_count', 'review_count', 'rating_sum',
+) + RATING_COUNT_FIELDS
+
+
+def adjust_event_counters(event_id, **deltas):
+    """Atomically add ``deltas`` to the named counter columns of one event."""
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if updates:
+        from .models import Event
+        Event.objects.filter(pk=event_id).update(**updates)
+
+
+def review_contribution(review):
+    """Return the counter values a review adds to its event, by field name."""
+    if review is None or not review.is_approved:
+        return {}
+    return {
+        'review_count': 1, 'rating_sum': review.rating,
+        f'rating_{review.rating}_count': 1,
+    }
+
+
+def counter_difference(new, old):
+    """Return the deltas turning contribution ``old`` into ``new``."""
+    return {field: new.get(field, 0) - old.get(field, 0) for field in {*new, *old}}
+
+
+def set_reviews_approved(queryset, approved):
+    """Bulk approve or disapprove reviews, keeping the counters in step.
+
+    ``queryset.update()`` skips the signals that maintain the counters, so
+    the rows that actually change are counted per event and rating first
+    and applied as one adjustment per event. Returns the number changed.
+    """
+    from .models import Review
+    with transaction.atomic():
+        ids = list(
+            queryset.filter(is_approved=not approved)
+            .select_for_update()
+            .values_list('pk', flat=True)
+        )
+        changing = Review.objects.filter(pk__in=ids)
+        groups = list(
+            changing.order_by().values('event_id', 'rating').annotate(count=Count('pk'))
+        )
+        # update() skips auto_now; page validators rely on updated_at moving.
+        updated = changing.update(is_approved=approved, updated_at=timezone.now())
+        sign = 1 if approved else -1
+        deltas = defaultdict(lambda: defaultdict(int))
+        for group in groups:
+            event_deltas = deltas[group['event_id']]
+            event_deltas['review_count'] += sign * group['count']
+            event_deltas['rating_sum'] += sign * group['count'] * group['rating']
+            event_deltas[f'rating_{group["rating"]}_count'] += sign * group['count']
+        for event_id, event_deltas in deltas.items():
+            adjust_event_counters(event_id, **event_deltas)
+        if approved:
+            from .trending import REVIEW, record_interactions
+            record_interactions(REVIEW, [
+                group['event_id'] for group in groups for _ in range(group['count'])
+            ])
+    return updated
+
+
+def _aggregate(queryset, expression):
+    subquery = (
+        queryset.filter(event=OuterRef('pk'))
+        .order_by()
+        .values('event')
+        .annotate(value=expression)
+        .values('value')
+    )
+    return Coalesce(Subquery(subquery, output_field=IntegerField()), 0)
+
+
+def recount_event_stats(queryset):
+    """Recompute every counter for the events in ``queryset``.
+
+    Related models are looked up through ``queryset.model`` so this also
+    works with the historical models passed to data migrations; counters
+    the historical model does not have yet are skipped.
+    """
+    event_model = queryset.model
+    attendee_model = event_model._meta.get_field('attendees').remote_field.through
+    favorite_model = event_model._meta.get_field('favorites').remote_field.through
+    review_model = event_model._meta.get_field('reviews').related_model
+    approved_reviews = review_model.objects.filter(is_approved=True)
+
+    counters = {
+        'registered_count': _aggregate(
+            attendee_model.objects.filter(status='registered'), Count('pk')
+        ),
+        'favorites_count': _aggregate(favorite_model.objects.all(), Count('pk')),
+        'review_count': _aggregate(approved_reviews, Count('pk')),
+        'rating_sum': _aggregate(approved_reviews, Sum('rating')),
+    }
+    for stars in RATINGS:
+        counters[f'rating_{stars}_count'] = _aggregate(
+            approved_reviews.filter(rating=stars), Count('pk')
+        )
+    existing = {field.name for field in event_model._meta.concrete_fields}
+    return queryset.update(
+        **{field: value for field, value in counters.items() if field in existing}
+    )
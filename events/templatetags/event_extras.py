@@ -1,4 +1,7 @@
 from django import template
+from django.utils.html import format_html, format_html_join
+
+from events.images import SIZES
 
 register = template.Library()
 
@@ -16,4 +19,67 @@ def times(number):
     try:
         return range(int(number))
     except (ValueError, TypeError):
-        return range(0)
\ No newline at end of file
+        return range(0)
+
+@register.filter
+def lookup(mapping, key):
+    """Return ``mapping[key]``, or 0 when it is missing."""
+    try:
+        return mapping[key]
+    except (KeyError, TypeError):
+        return 0
+
+@register.simple_tag(takes_context=True)
+def query_with(context, **kwargs):
+    """Return the current query string with the given parameters replaced.
+
+    Parameters set to None or '' are dropped. Page and cursor parameters
+    exclude each other, so setting one removes the other.
+    """
+    query = context['request'].GET.copy()
+    if 'page' in kwargs:
+        query.pop('cursor', None)
+    if 'cursor' in kwargs:
+        query.pop('page', None)
+    for key, value in kwargs.items():
+        if value in (None, ''):
+            query.pop(key, None)
+        else:
+            query[key] = value
+    return query.urlencode()
+
+
+@register.simple_tag
+def responsive_image(image, variants, size, **attrs):
+    """Render ``image`` as a <picture> with WebP and JPEG ``srcset``s.
+
+    ``variants`` is the image's variants field (see events.images). Until
+    they are generated the original file is used. Extra keyword arguments
+    become attributes of the <img> tag.
+    """
+    if not image:
+        return ''
+    entries = (variants or {}).get(size)
+    attrs.setdefault('sizes', SIZES[size][2])
+    if not entries:
+        attrs.pop('sizes')
+        return format_html('<img src="{}"{}>', image.url, _attributes(attrs))
+
+    storage = image.storage
+
+    def srcset(fmt):
+        return ', '.join(
+            f'{storage.url(path)} {width}w' for width, path in entries[fmt]
+        )
+
+    jpeg = entries['jpeg']
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}"{}></picture>',
+        srcset('webp'), attrs['sizes'],
+        storage.url(jpeg[0][1]), srcset('jpeg'), _attributes(attrs),
+    )
+
+
+def _attributes(attrs):
+    return format_html_join('', ' {}="{}"', attrs.items())
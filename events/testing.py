@@ -0,0 +1,24 @@
+"""Test helpers shared by the project's test suites."""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """TestCase mixin asserting that a block stays within a query budget."""
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using=connection):
+        with CaptureQueriesContext(using) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                f'{i}. {query["sql"]}'
+                for i, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(
+                f'{executed} queries executed, budget is {budget}.\n'
+                f'Captured queries were:\n{queries}'
+            )
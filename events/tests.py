@@ -1,3 +1,1521 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import json
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.db import SessionStore
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import Http404, QueryDict
+from django.template import Context, Template
+from django.test import (
+    AsyncRequestFactory, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from DjangoEventLocator import instrumentation
+
+from .models import (
+    Comment, Event, EventAttendee, EventCategory, EventInteraction, EventTag, Review,
+)
+from . import (
+    async_views, benchmarks, caching, facets, filters, geo, ical, images, search,
+    services, trending,
+)
+from .pagination import _cursor_queryset, encode_cursor
+from .slugs import backfill_slugs
+from .stats import recount_event_stats, set_reviews_approved
+from .testing import QueryBudgetMixin
+
+User = get_user_model()
+
+
+def make_event(organizer, **kwargs):
+    start = timezone.now() + timedelta(days=7)
+    defaults = {
+        'title': 'Community Meetup',
+        'description': 'A friendly get-together.',
+        'start_date': start,
+        'end_date': start + timedelta(hours=2),
+        'location_name': 'Town Hall',
+        'address': '1 Main Street',
+        'city': 'Springfield',
+        'country': 'USA',
+        'is_published': True,
+        'organizer': organizer,
+    }
+    defaults.update(kwargs)
+    return Event.objects.create(**defaults)
+
+
+class GeoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create_user('organizer', 'organizer@example.com', 'pw')
+
+        def place(title, lat, lng, days=7):
+            start = timezone.now() + timedelta(days=days)
+            return make_event(
+                organizer, title=title, latitude=lat, longitude=lng,
+                start_date=start, end_date=start + timedelta(hours=2),
+            )
+
+        # Suva and Taveuni sit either side of the antimeridian, ~223 km apart.
+        cls.suva = place('Suva', '-18.141600', '178.441900')
+        cls.taveuni = place('Taveuni', '-16.850000', '-179.950000')
+        cls.auckland = place('Auckland', '-36.848500', '174.763300')
+        # At 78N one degree of longitude is only ~23 km.
+        cls.longyearbyen = place('Longyearbyen', '78.223200', '15.626700')
+        cls.barentsburg = place('Barentsburg', '78.064800', '14.233000')
+        # Across the pole from each other, ~22 km apart.
+        cls.pole_a = place('Pole A', '89.900000', '0.000000')
+        cls.pole_b = place('Pole B', '89.900000', '180.000000')
+        cls.nowhere = place('No Coordinates', None, None)
+
+    def near(self, lat, lng, radius_km):
+        queryset = geo.filter_near(Event.objects.all(), lat, lng, radius_km)
+        return {event.title: event.distance_km for event in queryset}
+
+    def test_parse_point(self):
+        self.assertEqual(geo.parse_point('51.5,-0.12'), (51.5, -0.12))
+        self.assertEqual(geo.parse_point(' -90 , 180 '), (-90.0, 180.0))
+        for value in (
+            None, '', 'london', '51.5', '1,2,3', '90.1,0', '0,-180.5', 'nan,0', '0,inf'
+        ):
+            with self.subTest(value=value):
+                self.assertIsNone(geo.parse_point(value))
+
+    def test_parse_radius(self):
+        self.assertEqual(geo.parse_radius('2.5'), 2.5)
+        self.assertEqual(geo.parse_radius('10000'), geo.MAX_RADIUS_KM)
+        for value in (None, '', 'far', '0', '-5', 'nan', 'inf'):
+            with self.subTest(value=value):
+                self.assertEqual(geo.parse_radius(value), geo.DEFAULT_RADIUS_KM)
+        self.assertEqual(geo.parse_radius('far', default=5), 5)
+
+    def test_bounding_box_wraps_the_antimeridian(self):
+        for origin, other in ((self.suva, 'Taveuni'), (self.taveuni, 'Suva')):
+            with self.subTest(origin=origin.title):
+                found = self.near(float(origin.latitude), float(origin.longitude), 250)
+                self.assertEqual(set(found), {origin.title, other})
+                self.assertAlmostEqual(found[other], 223, delta=1)
+        self.assertEqual(set(self.near(-18.1416, 178.4419, 150)), {'Suva'})
+
+    def test_bounding_box_widens_at_high_latitudes(self):
+        # The two towns are 1.4 degrees of longitude apart but ~35 km away.
+        found = self.near(78.2232, 15.6267, 40)
+        self.assertEqual(set(found), {'Longyearbyen', 'Barentsburg'})
+        self.assertEqual(set(self.near(78.2232, 15.6267, 30)), {'Longyearbyen'})
+
+    def test_bounding_box_covers_every_longitude_near_the_pole(self):
+        self.assertEqual(set(self.near(89.9, 0, 25)), {'Pole A', 'Pole B'})
+        q = geo.bounding_box_q(89.9, 0, 25)
+        self.assertNotIn('longitude', str(q))
+
+    def test_sort_by_distance(self):
+        url = reverse('events:event-list')
+        response = self.client.get(
+            url, {'near': '-18.1416,178.4419', 'radius_km': '500', 'sort': 'distance'}
+        )
+        self.assertEqual(
+            [event.title for event in response.context['page_obj']], ['Suva', 'Taveuni']
+        )
+        # Without a point there is no distance; the default order applies.
+        response = self.client.get(url, {'sort': 'distance'})
+        self.assertEqual(len(response.context['page_obj']), 8)
+
+
+class EventQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Pages must cost a fixed number of queries regardless of their size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.user = User.objects.create_user('visitor', 'visitor@example.com', 'pw')
+        category = EventCategory.objects.create(name='Music', slug='music')
+        tags = [
+            EventTag.objects.create(name=f'Tag {i}', slug=f'tag-{i}') for i in range(3)
+        ]
+        cls.events = []
+        for i in range(15):
+            event = make_event(
+                cls.organizer, title=f'Event {i}', category=category, capacity=50
+            )
+            event.tags.set(tags)
+            cls.events.append(event)
+        cls.event = cls.events[0]
+        for i in range(5):
+            commenter = User.objects.create_user(
+                f'user{i}', f'user{i}@example.com', 'pw'
+            )
+            Comment.objects.create(
+                event=cls.event, user=commenter, content='Looking forward to it!'
+            )
+            Review.objects.create(
+                event=cls.event, user=commenter, rating=4,
+                content='Great event overall.',
+            )
+            EventAttendee.objects.create(event=cls.event, user=commenter)
+        recount_event_stats(Event.objects.all())
+
+    def setUp(self):
+        cache.clear()
+
+    def test_event_list(self):
+        # Includes the four sidebar facet counts.
+        with self.assertMaxQueries(9):
+            response = self.client.get(reverse('events:event-list'))
+        self.assertEqual(len(response.context['events']), 12)
+
+    def test_event_detail_anonymous(self):
+        with self.assertMaxQueries(5):
+            response = self.client.get(self.event.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['event'].registered_count, 5)
+
+    def test_event_detail_authenticated(self):
+        self.client.force_login(self.user)
+        with self.assertMaxQueries(10):
+            response = self.client.get(self.event.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+
+
+class EventCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.user = User.objects.create_user('visitor', 'visitor@example.com', 'pw')
+        cls.event = make_event(cls.organizer, capacity=10)
+
+    def test_toggles_keep_counters_in_sync(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse('events:event-attend', args=[self.event.slug]))
+        self.client.post(reverse('events:event-favorite', args=[self.event.slug]))
+        self.event.refresh_from_db()
+        self.assertEqual(
+            (self.event.registered_count, self.event.favorites_count), (1, 1)
+        )
+
+        self.client.post(reverse('events:event-attend', args=[self.event.slug]))
+        self.client.post(reverse('events:event-favorite', args=[self.event.slug]))
+        self.event.refresh_from_db()
+        self.assertEqual(
+            (self.event.registered_count, self.event.favorites_count), (0, 0)
+        )
+
+    def test_review_counters(self):
+        review = Review.objects.create(
+            event=self.event, user=self.user, rating=4, content='x' * 20
+        )
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.review_count, self.event.rating_sum), (1, 4))
+
+        review.rating = 2
+        review.save()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.average_rating, 2)
+        self.assertEqual((self.event.rating_4_count, self.event.rating_2_count), (0, 1))
+
+        review.is_approved = False
+        review.save()
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.review_count, self.event.rating_sum), (0, 0))
+
+    def test_admin_approval_actions_keep_histogram(self):
+        others = [
+            User.objects.create_user(f'reviewer{i}', f'reviewer{i}@example.com', 'pw')
+            for i in range(3)
+        ]
+        for user, rating in zip(others, (5, 5, 3)):
+            Review.objects.create(
+                event=self.event, user=user, rating=rating, is_approved=False
+            )
+
+        review_admin = admin.site._registry[Review]
+        review_admin.approve_reviews(None, Review.objects.all())
+        review_admin.approve_reviews(None, Review.objects.all())
+        self.event.refresh_from_db()
+        self.assertEqual(
+            self.event.rating_histogram,
+            [(5, 2, 67), (4, 0, 0), (3, 1, 33), (2, 0, 0), (1, 0, 0)],
+        )
+        self.assertEqual((self.event.review_count, self.event.rating_sum), (3, 13))
+
+        review_admin.disapprove_reviews(None, Review.objects.filter(rating=5))
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.review_count, self.event.rating_5_count), (1, 0))
+
+    def test_detail_page_paginates_reviews(self):
+        users = [
+            User.objects.create_user(f'reviewer{i}', f'reviewer{i}@example.com', 'pw')
+            for i in range(12)
+        ]
+        for user in users:
+            Review.objects.create(event=self.event, user=user, rating=4)
+        url = reverse('events:event-detail', args=[self.event.slug])
+        response = self.client.get(url, {'reviews_page': 2})
+        self.assertEqual(len(response.context['reviews']), 2)
+        self.assertContains(response, '12 reviews')
+
+    def test_recount_repairs_drift(self):
+        EventAttendee.objects.create(event=self.event, user=self.user)
+        Event.objects.filter(pk=self.event.pk).update(favorites_count=7)
+        recount_event_stats(Event.objects.all())
+        self.event.refresh_from_db()
+        self.assertEqual(
+            (self.event.registered_count, self.event.favorites_count), (1, 0)
+        )
+
+
+class RegistrationServiceTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.users = [
+            User.objects.create_user(f'user{i}', f'user{i}@example.com', 'pw')
+            for i in range(3)
+        ]
+        cls.event = make_event(cls.organizer, capacity=2)
+
+    def test_full_event_waitlists_and_promotes(self):
+        first, second, third = (
+            services.register(self.event, user) for user in self.users
+        )
+        self.assertEqual(
+            [first.status, second.status, third.status],
+            [services.REGISTERED, services.REGISTERED, services.WAITLISTED],
+        )
+
+        services.cancel(self.event, self.users[0])
+        third.refresh_from_db()
+        self.event.refresh_from_db()
+        self.assertEqual(third.status, services.REGISTERED)
+        self.assertEqual(self.event.registered_count, 2)
+
+    def test_detail_page_forms_post_to_the_event_routes(self):
+        self.client.force_login(self.users[0])
+        page = self.client.get(self.event.get_absolute_url()).content.decode()
+        for name in ('event-attend', 'event-favorite'):
+            url = reverse(f'events:{name}', args=[self.event.slug])
+            self.assertIn(f'action="{url}"', page)
+            self.assertEqual(self.client.post(url).status_code, 302)
+        self.assertTrue(
+            EventAttendee.objects.filter(event=self.event, user=self.users[0]).exists()
+        )
+        self.assertTrue(self.event.favorites.filter(pk=self.users[0].pk).exists())
+
+    def test_register_twice_is_idempotent(self):
+        services.register(self.event, self.users[0])
+        services.register(self.event, self.users[0])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registered_count, 1)
+
+    def test_deadline_closes_registration(self):
+        Event.objects.filter(pk=self.event.pk).update(
+            registration_deadline=timezone.now() - timedelta(minutes=1)
+        )
+        self.event.refresh_from_db()
+        with self.assertRaises(services.RegistrationClosed):
+            services.register(self.event, self.users[0])
+
+
+class ConcurrentRegistrationTests(TransactionTestCase):
+    """Hammer one event from many threads and check nothing is oversold."""
+
+    capacity = 10
+    workers = 40
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # Point DATABASES['default']['TEST']['NAME'] at a file to run it.
+            self.skipTest('In-memory SQLite cannot serve concurrent writers.')
+        organizer = User.objects.create_user('organizer', 'organizer@example.com', 'pw')
+        self.event = make_event(organizer, capacity=self.capacity)
+        self.users = [
+            User.objects.create_user(f'user{i}', f'user{i}@example.com', 'pw')
+            for i in range(self.workers)
+        ]
+
+    def run_concurrently(self, func, args_list):
+        barrier = threading.Barrier(len(args_list))
+        errors = []
+
+        def worker(*args):
+            try:
+                barrier.wait()
+                func(*args)
+            except Exception as exc:  # noqa: BLE001 - collected for the assertion below
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=args) for args in args_list]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_no_oversell(self):
+        # Every user submits twice to exercise the duplicate-insert path too.
+        args = [(self.event, user) for user in self.users] * 2
+        errors = self.run_concurrently(services.register, args)
+        self.assertEqual(errors, [])
+
+        self.event.refresh_from_db()
+        statuses = EventAttendee.objects.filter(event=self.event)
+        self.assertEqual(statuses.count(), self.workers)
+        self.assertEqual(
+            statuses.filter(status=services.REGISTERED).count(), self.capacity
+        )
+        self.assertEqual(self.event.registered_count, self.capacity)
+
+        errors = self.run_concurrently(
+            services.cancel, [(self.event, user) for user in self.users]
+        )
+        self.assertEqual(errors, [])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registered_count, 0)
+        self.assertFalse(statuses.exclude(status=services.CANCELLED).exists())
+
+
+class EventListCacheTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.event = make_event(cls.organizer, title='Cached Meetup')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_pages_are_cached_per_filter(self):
+        url = reverse('events:event-list')
+        self.client.get(url, {'date': 'upcoming', 'search': 'meetup'})
+        with self.assertMaxQueries(0):
+            response = self.client.get(url, {'search': 'meetup', 'date': 'upcoming'})
+        self.assertContains(response, 'Cached Meetup')
+
+    def test_event_save_invalidates(self):
+        url = reverse('events:event-list')
+        self.client.get(url)
+        self.event.title = 'Renamed Meetup'
+        self.event.save()
+        self.assertContains(self.client.get(url), 'Renamed Meetup')
+
+    def test_authenticated_users_bypass_page_cache(self):
+        self.client.force_login(self.organizer)
+        url = reverse('events:event-list')
+        self.client.get(url)
+        self.assertIsNotNone(self.client.get(url).context)
+
+
+class CursorPaginationTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        start = timezone.now() + timedelta(days=1)
+        # Pairs share a start date so the id tie-breaker is exercised.
+        for i in range(30):
+            make_event(
+                cls.organizer, title=f'Event {i}',
+                start_date=start + timedelta(days=i // 2),
+                end_date=start + timedelta(days=i // 2, hours=1),
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_walks_every_event_once_in_both_directions(self):
+        url = reverse('events:event-list')
+        expected = list(
+            Event.objects.order_by('-start_date', '-pk').values_list('pk', flat=True)
+        )
+        seen, pages, cursor = [], [], None
+        while True:
+            params = {'cursor': cursor} if cursor else {}
+            page = self.client.get(url, params).context['page_obj']
+            pages.append([event.pk for event in page])
+            seen.extend(pages[-1])
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+
+        response = self.client.get(url, {'cursor': page.previous_cursor})
+        previous = response.context['page_obj']
+        self.assertEqual([event.pk for event in previous], pages[-2])
+
+    def test_deep_pages_skip_the_count_query(self):
+        url = reverse('events:event-list')
+        cursor = self.client.get(url).context['page_obj'].next_cursor
+        with self.assertMaxQueries(4):
+            self.client.get(url, {'cursor': cursor})
+
+    def test_offset_pages_still_work(self):
+        response = self.client.get(reverse('events:event-list'), {'page': 3})
+        self.assertEqual(response.context['page_obj'].number, 3)
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse('events:event-list'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create_user('organizer', 'organizer@example.com', 'pw')
+        cls.dance = make_event(
+            organizer, title='Salsa Dancing', description='Weekly meetings.'
+        )
+        cls.dancer = make_event(
+            organizer, title='Garden Party', description='Music for every dancer.'
+        )
+        cls.other = make_event(
+            organizer, title='Book Club', description='Novels and tea.'
+        )
+
+    def search_titles(self, query):
+        results = search.get_backend().search(Event.objects.all(), query)
+        return [event.title for event in results.order_by('-search_rank', 'pk')]
+
+    def test_inflected_forms_share_a_stem(self):
+        for forms in (
+            ('meet', 'meeting', 'meetings'),
+            ('dance', 'dances', 'danced', 'dancing'),
+            ('class', 'classes'),
+            ('activity', 'activities'),
+            ('organize', 'organized', 'organization'),
+            ('run', 'running'),
+            ('need', 'needed'),
+        ):
+            with self.subTest(forms=forms):
+                self.assertEqual(len({search.stem(word) for word in forms}), 1)
+
+    def test_short_words_and_numbers_are_kept(self):
+        self.assertEqual(search.stem('bus'), 'bus')
+        self.assertEqual(search.stem('2026'), '2026')
+        self.assertEqual(search.stem('business'), 'business')
+
+    def test_tokenize_lowercases_and_drops_stopwords(self):
+        self.assertEqual(
+            search.tokenize('The Dancing of the Meetings!'), ['danc', 'meet']
+        )
+        self.assertEqual(search.tokenize('x' * (search.MAX_TERM_LENGTH + 1)), [])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search_titles('meeting dance'), ['Salsa Dancing'])
+        self.assertEqual(self.search_titles('novels'), ['Book Club'])
+        self.assertEqual(self.search_titles('the of'), [])
+        response = self.client.get(reverse('events:event-list'), {'search': 'the'})
+        self.assertEqual(list(response.context['page_obj']), [])
+
+    def test_title_matches_rank_above_description_matches(self):
+        self.assertEqual(
+            self.search_titles('dances'), ['Salsa Dancing', 'Garden Party']
+        )
+
+    def test_terms_match_as_prefixes(self):
+        # "dancer" is indexed unstemmed; "dan" only matches as a prefix.
+        self.assertEqual(self.search_titles('dan'), ['Salsa Dancing', 'Garden Party'])
+        self.assertEqual(self.search_titles('dancer'), ['Garden Party'])
+        self.assertEqual(self.search_titles('gard'), ['Garden Party'])
+
+    def test_exact_terms_rank_above_prefix_matches(self):
+        # Both events contain "danc" in the title or description; the exact
+        # stem weighs double, but only "Salsa Dancing" has it.
+        results = {
+            event.title: event.search_rank
+            for event in search.get_backend().search(Event.objects.all(), 'danc')
+        }
+        self.assertEqual(results, {
+            'Salsa Dancing': 2 * search.FIELD_WEIGHTS['title'],
+            'Garden Party': search.FIELD_WEIGHTS['description'],
+        })
+
+
+class TagFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create_user('organizer', 'organizer@example.com', 'pw')
+        jazz = EventTag.objects.create(name='Jazz', slug='jazz')
+        rock = EventTag.objects.create(name='Rock', slug='rock')
+        cls.jazz_only = make_event(organizer, title='Jazz Night')
+        cls.rock_only = make_event(organizer, title='Rock Night')
+        cls.both = make_event(organizer, title='Fusion Night')
+        make_event(organizer, title='Quiet Night')
+        cls.jazz_only.tags.add(jazz)
+        cls.rock_only.tags.add(rock)
+        cls.both.tags.add(jazz, rock)
+
+    def setUp(self):
+        cache.clear()
+
+    def list_titles(self, params):
+        response = self.client.get(reverse('events:event-list'), params)
+        return sorted(event.title for event in response.context['page_obj'])
+
+    def test_any_mode_lists_each_match_once(self):
+        self.assertEqual(
+            self.list_titles({'tag': ['jazz', 'rock']}),
+            ['Fusion Night', 'Jazz Night', 'Rock Night'],
+        )
+
+    def test_all_mode_requires_every_tag(self):
+        # Cached after the any-mode request; tag_mode must be part of the key.
+        self.list_titles({'tag': ['jazz', 'rock']})
+        self.assertEqual(
+            self.list_titles({'tag': ['jazz', 'rock'], 'tag_mode': 'all'}),
+            ['Fusion Night'],
+        )
+        self.assertEqual(
+            self.list_titles({'tag': ['jazz', 'jazz'], 'tag_mode': 'all'}),
+            ['Fusion Night', 'Jazz Night'],
+        )
+
+    def test_filters_with_subqueries_not_joins(self):
+        queryset = filters.filter_events(
+            Event.objects.all(), QueryDict('tag=jazz&tag=rock&tag_mode=all')
+        )
+        sql = str(queryset.query)
+        self.assertIn('EXISTS', sql)
+        self.assertNotIn('DISTINCT', sql)
+        # Tag slug lookups inside the subqueries.
+        self.assertEqual(sql.count('JOIN'), 2)
+
+    def test_api_accepts_the_mode(self):
+        url = reverse('events:api-event-list')
+        data = self.client.get(url, {'tag': ['jazz', 'rock'], 'tag_mode': 'all'}).json()
+        self.assertEqual([event['slug'] for event in data['results']], [self.both.slug])
+        data = self.client.get(url, {'tag': ['jazz', 'rock']}).json()
+        self.assertEqual(len(data['results']), 3)
+
+
+class FacetTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create_user('organizer', 'organizer@example.com', 'pw')
+        cls.music = EventCategory.objects.create(name='Music', slug='music')
+        cls.tech = EventCategory.objects.create(name='Tech', slug='tech')
+        cls.jazz = EventTag.objects.create(name='Jazz', slug='jazz')
+        cls.rock = EventTag.objects.create(name='Rock', slug='rock')
+        past = timezone.now() - timedelta(days=7)
+        events = [
+            make_event(organizer, category=cls.music, city='Berlin'),
+            make_event(organizer, category=cls.music, city='Paris'),
+            make_event(organizer, category=cls.tech, city='Berlin',
+                       start_date=past, end_date=past + timedelta(hours=2)),
+            make_event(
+                organizer, category=cls.music, city='Berlin', is_published=False
+            ),
+        ]
+        events[0].tags.add(cls.jazz, cls.rock)
+        events[1].tags.add(cls.jazz)
+        events[2].tags.add(cls.rock)
+        events[3].tags.add(cls.jazz)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_each_facet_ignores_its_own_filter(self):
+        counts = facets.compute_facets(QueryDict('category=music&city=Berlin'))
+        self.assertEqual(counts['category'], {self.music.pk: 1, self.tech.pk: 1})
+        self.assertEqual(counts['city'], [('Berlin', 1), ('Paris', 1)])
+        self.assertEqual(counts['tag'], {self.jazz.pk: 1, self.rock.pk: 1})
+        self.assertEqual(counts['date'], {'upcoming': 1, 'past': 0})
+
+    def test_tag_counts_follow_the_tag_mode(self):
+        any_mode = facets.compute_facets(QueryDict('tag=rock'))
+        self.assertEqual(any_mode['tag'], {self.jazz.pk: 2, self.rock.pk: 2})
+        all_mode = facets.compute_facets(QueryDict('tag=rock&tag_mode=all'))
+        self.assertEqual(all_mode['tag'], {self.jazz.pk: 1, self.rock.pk: 2})
+
+    def test_counts_are_cached_per_filter_signature(self):
+        params = QueryDict('city=Berlin&sort=popular')
+        first = facets.get_facets(params)
+        with self.assertMaxQueries(0):
+            self.assertEqual(facets.get_facets(QueryDict('city=Berlin&page=2')), first)
+        make_event(User.objects.get(), category=self.tech, city='Berlin')
+        self.assertEqual(facets.get_facets(params)['category'][self.tech.pk], 2)
+
+    def test_sidebar_shows_counts_and_disables_empty_options(self):
+        response = self.client.get(reverse('events:event-list'), {'city': 'Paris'})
+        self.assertContains(response, 'Music (1)')
+        self.assertContains(response, 'Berlin (2)')
+        self.assertContains(response, 'Upcoming (1)')
+        self.assertContains(response, '<option value="tech" disabled>', html=False)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are checked on SQLite.')
+class IndexUsageTests(TestCase):
+    """The list query shapes read an index in order instead of sorting."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('planner', 'planner@example.com', 'pw')
+        cls.category = EventCategory.objects.create(name='Music', slug='music')
+        cls.event = make_event(cls.user, category=cls.category)
+
+    def list_plan(self, query):
+        queryset = Event.objects.filter(is_published=True)
+        queryset = filters.filter_events(queryset, QueryDict(query))
+        if filters.uses_default_ordering(QueryDict(query)):
+            queryset = queryset.order_by('-start_date', '-pk')
+        return queryset[:13].explain()
+
+    def assertUsesIndex(self, plan, index):
+        self.assertIn(index, plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_list_shapes(self):
+        for query, index in [
+            ('', 'event_public_start_idx'),
+            ('date=upcoming', 'event_public_start_idx'),
+            ('date=past', 'event_public_start_idx'),
+            ('category=music', 'event_public_category_idx'),
+            ('tag=jazz&tag=rock', 'event_public_start_idx'),
+            ('tag=jazz&tag=rock&tag_mode=all', 'event_public_start_idx'),
+            ('sort=popular', 'event_public_popular_idx'),
+            ('sort=trending', 'event_public_trending_idx'),
+        ]:
+            with self.subTest(query=query):
+                self.assertUsesIndex(self.list_plan(query), index)
+
+    def test_cursor_page_seeks_the_index(self):
+        published = Event.objects.filter(is_published=True)
+        for direction in ('next', 'prev'):
+            with self.subTest(direction=direction):
+                token = encode_cursor(self.event.start_date, self.event.pk, direction)
+                queryset = _cursor_queryset(published, token, 'start_date')[2]
+                plan = queryset[:13].explain()
+                self.assertUsesIndex(plan, 'event_public_start_idx')
+                # A range search, not a scan from the first row.
+                self.assertIn('SEARCH', plan)
+
+    def test_profile_shapes(self):
+        self.assertUsesIndex(
+            self.user.events_created.order_by('start_date').explain(),
+            'event_organizer_start_idx',
+        )
+        attending = Event.objects.filter(
+            eventattendee__user=self.user, eventattendee__status='registered'
+        )
+        self.assertIn('attendee_user_status_idx', attending.explain())
+
+    def test_only_expected_models_rely_on_partial_indexes(self):
+        # models.W037 is silenced project-wide for MySQL; make sure no other
+        # model starts depending on index conditions unnoticed.
+        with mock.patch.object(connection.features, 'supports_partial_indexes', False):
+            flagged = {
+                model._meta.label
+                for model in apps.get_models()
+                for message in model.check(databases=['default'])
+                if message.id == 'models.W037'
+            }
+        self.assertEqual(flagged, {'events.Event', 'social.FeedItem'})
+
+
+class EventApiTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.music = EventCategory.objects.create(name='Music', slug='music')
+        cls.jazz = EventTag.objects.create(name='Jazz', slug='jazz')
+        for i in range(25):
+            event = make_event(cls.organizer, title=f'Concert {i}', category=cls.music,
+                               start_date=timezone.now() + timedelta(days=i + 1),
+                               end_date=timezone.now() + timedelta(days=i + 1, hours=2))
+            event.tags.add(cls.jazz)
+        make_event(cls.organizer, title='Draft', is_published=False)
+
+    def test_sparse_fieldset_and_cursor(self):
+        url = reverse('events:api-event-list')
+        params = {'fields': 'slug,category,tags', 'limit': 10}
+        with self.assertMaxQueries(2):
+            data = self.client.get(url, params).json()
+        self.assertEqual(len(data['results']), 10)
+        self.assertEqual(set(data['results'][0]), {'slug', 'category', 'tags'})
+        self.assertEqual(data['results'][0]['tags'], ['jazz'])
+
+        slugs = [item['slug'] for item in data['results']]
+        while data['next']:
+            data = self.client.get(data['next']).json()
+            slugs.extend(item['slug'] for item in data['results'])
+        self.assertEqual(len(slugs), 25)
+        self.assertEqual(len(set(slugs)), 25)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(
+            reverse('events:api-event-list'), {'fields': 'title,password'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_filters_match_the_html_list(self):
+        url = reverse('events:api-event-list')
+        data = self.client.get(url, {'search': 'concert 7'}).json()
+        self.assertEqual([item['title'] for item in data['results']], ['Concert 7'])
+
+    def test_ndjson_export_streams_published_events(self):
+        response = self.client.get(
+            reverse('events:api-event-export'), {'fields': 'title'}
+        )
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 25)
+        self.assertNotIn({'title': 'Draft'}, [json.loads(line) for line in lines])
+
+
+class ImportEventsTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        make_event(cls.organizer, title='Meetup')
+
+    def write_jsonl(self, rows):
+        handle = tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False)
+        self.addCleanup(handle.close)
+        for row in rows:
+            handle.write(json.dumps(row) + '\n')
+        handle.flush()
+        return handle.name
+
+    def test_batched_import_with_duplicate_titles(self):
+        rows = [
+            {
+                'title': 'Meetup', 'description': 'Monthly meetup',
+                'location_name': 'Hall', 'address': '1 Main St', 'city': 'Kigali',
+                'country': 'Rwanda', 'start_date': '2030-01-01T18:00',
+                'end_date': '2030-01-01T20:00', 'category': 'Tech Talks',
+                'tags': ['python', 'django'], 'is_published': 'yes',
+            }
+            for _ in range(20)
+        ]
+        path = self.write_jsonl(rows)
+        with self.assertMaxQueries(40):
+            call_command(
+                'import_events', path, organizer='organizer', batch_size=10,
+                stdout=StringIO(),
+            )
+
+        slugs = set(Event.objects.values_list('slug', flat=True))
+        self.assertEqual(slugs, {'meetup'} | {f'meetup-{i}' for i in range(1, 21)})
+        self.assertEqual(Event.tags.through.objects.count(), 40)
+        self.assertEqual(EventCategory.objects.get().slug, 'tech-talks')
+
+    def test_dry_run_writes_nothing(self):
+        path = self.write_jsonl([{'title': 'Broken', 'start_date': 'soon'}])
+        call_command('import_events', path, organizer='organizer', dry_run=True,
+                     stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Event.objects.count(), 1)
+        self.assertFalse(EventTag.objects.exists())
+
+    def test_malformed_lines_are_rejected_with_their_line_number(self):
+        row = {
+            'title': 'Workshop', 'description': 'Hands on', 'location_name': 'Lab',
+            'address': '2 High St', 'city': 'Kigali', 'country': 'Rwanda',
+            'start_date': '2030-02-01T10:00', 'end_date': '2030-02-01T12:00',
+        }
+        path = self.write_jsonl([row])
+        with open(path, 'a') as handle:
+            handle.write('\n{"title": "Truncated\n[1, 2]\n' + json.dumps(row) + '\n')
+
+        for dry_run in (True, False):
+            with self.subTest(dry_run=dry_run):
+                stdout, stderr = StringIO(), StringIO()
+                call_command(
+                    'import_events', path, organizer='organizer', dry_run=dry_run,
+                    stdout=stdout, stderr=stderr,
+                )
+                errors = stderr.getvalue().splitlines()
+                self.assertEqual(len(errors), 2)
+                self.assertTrue(errors[0].startswith('Line 3: '), errors[0])
+                self.assertIn('Invalid JSON', errors[0])
+                self.assertTrue(errors[1].startswith('Line 4: '), errors[1])
+                self.assertIn(' 2 events (2 rejected,', stdout.getvalue())
+        self.assertEqual(Event.objects.filter(title='Workshop').count(), 2)
+
+    def test_rejected_rows_create_no_categories_or_tags(self):
+        path = self.write_jsonl([{
+            'title': 'Broken', 'description': 'No dates', 'location_name': 'Hall',
+            'address': '1 Main St', 'city': 'Kigali', 'country': 'Rwanda',
+            'category': 'Orphans', 'tags': ['lonely'],
+        }])
+        call_command('import_events', path, organizer='organizer',
+                     stdout=StringIO(), stderr=StringIO())
+        self.assertFalse(EventCategory.objects.exists())
+        self.assertFalse(EventTag.objects.exists())
+
+
+class SlugAllocationTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+
+    def test_duplicate_titles_cost_one_slug_query(self):
+        with CaptureQueriesContext(connection) as first:
+            make_event(self.organizer, title='Meetup')
+        events = [make_event(self.organizer, title='Meetup') for _ in range(8)]
+        # The tenth duplicate costs no more than the first one did.
+        with self.assertMaxQueries(len(first.captured_queries)):
+            events.append(make_event(self.organizer, title='Meetup'))
+        self.assertEqual(
+            [event.slug for event in events], [f'meetup-{i}' for i in range(1, 10)]
+        )
+
+    def test_long_titles_fit_the_column(self):
+        title = 'A very long event title ' * 5
+        first, second = make_event(self.organizer, title=title), make_event(
+            self.organizer, title=title
+        )
+        self.assertLessEqual(len(second.slug), 50)
+        self.assertNotEqual(first.slug, second.slug)
+
+    def test_backfill_fills_missing_slugs(self):
+        events = [make_event(self.organizer, title='Meetup') for _ in range(3)]
+        Event.objects.filter(pk=events[1].pk).update(slug='')
+        with self.assertMaxQueries(3):
+            self.assertEqual(backfill_slugs(Event.objects.all()), 1)
+        self.assertEqual(
+            sorted(Event.objects.values_list('slug', flat=True)),
+            ['meetup', 'meetup-1', 'meetup-2'],
+        )
+
+
+class TrendingScoreTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.users = [
+            User.objects.create_user(f'user{i}', f'user{i}@example.com', 'pw')
+            for i in range(3)
+        ]
+        cls.quiet = make_event(cls.organizer, title='Quiet')
+        cls.busy = make_event(cls.organizer, title='Busy', capacity=1)
+        for user in cls.users[:2]:
+            services.register(cls.busy, user)
+        Comment.objects.create(event=cls.quiet, user=cls.users[2], content='Hi')
+
+    def scores(self):
+        return dict(Event.objects.values_list('title', 'trending_score'))
+
+    def test_first_run_rebuilds_and_orders_listing(self):
+        trending.update_trending_scores()
+        scores = self.scores()
+        self.assertGreater(scores['Busy'], scores['Quiet'] > 0)
+
+        response = self.client.get(reverse('events:event-list'), {'sort': 'trending'})
+        self.assertEqual(
+            [event.title for event in response.context['events']], ['Busy', 'Quiet']
+        )
+
+    def test_incremental_run_decays_and_adds_new_interactions(self):
+        now = timezone.now()
+        trending.update_trending_scores(now)
+        before = self.scores()
+
+        Review.objects.create(event=self.quiet, user=self.users[0], rating=5)
+        later = now + trending.DEFAULT_HALF_LIFE
+        with self.assertNumQueries(9):
+            trending.update_trending_scores(later)
+        after = self.scores()
+        self.assertAlmostEqual(after['Busy'], before['Busy'] / 2)
+        self.assertAlmostEqual(after['Quiet'], before['Quiet'] / 2 + 2)
+
+    def test_updates_of_existing_rows_count(self):
+        now = timezone.now()
+        trending.update_trending_scores(now)
+        review = Review.objects.create(
+            event=self.quiet, user=self.users[1], rating=4, is_approved=False
+        )
+        comment = Comment.objects.create(
+            event=self.quiet, user=self.users[0], content='Later', is_approved=False
+        )
+        # Cancelling promotes the waitlisted user; the cancelled one comes back.
+        services.cancel(self.busy, self.users[0])
+        services.register(self.busy, self.users[0])
+        set_reviews_approved(Review.objects.filter(pk=review.pk), True)
+        comment.is_approved = True
+        comment.save()
+        before = self.scores()
+
+        trending.update_trending_scores(now)
+        after = self.scores()
+        self.assertAlmostEqual(after['Busy'], before['Busy'] + 2 * 3)
+        self.assertAlmostEqual(after['Quiet'], before['Quiet'] + 2 + 1)
+
+    def test_favorites_are_counted(self):
+        trending.update_trending_scores()
+        self.client.force_login(self.users[0])
+        self.client.post(reverse('events:event-favorite', args=[self.quiet.slug]))
+        before = self.scores()['Quiet']
+        trending.update_trending_scores()
+        self.assertAlmostEqual(self.scores()['Quiet'], before + 2, places=2)
+
+    def test_late_commit_below_the_position_is_counted_once(self):
+        now = timezone.now()
+        trending.update_trending_scores(now)
+        trending.record_interactions(trending.COMMENT, [self.quiet.pk, self.busy.pk])
+        # The Quiet row's transaction has not committed when the next run reads.
+        late = EventInteraction.objects.filter(event=self.quiet).latest('pk')
+        late.delete()
+        trending.update_trending_scores(now)
+        before = self.scores()
+
+        EventInteraction.objects.create(
+            pk=late.pk, event=self.quiet, kind=late.kind, created_at=late.created_at
+        )
+        trending.update_trending_scores(now)
+        trending.update_trending_scores(now)
+        after = self.scores()
+        self.assertAlmostEqual(after['Quiet'], before['Quiet'] + 1)
+        self.assertAlmostEqual(after['Busy'], before['Busy'])
+
+    def test_interactions_past_the_horizon_are_deleted(self):
+        now = timezone.now()
+        horizon = trending.get_horizon(trending.DEFAULT_HALF_LIFE)
+        old = EventInteraction.objects.create(
+            event=self.quiet, kind=trending.COMMENT,
+            created_at=now - horizon - timedelta(hours=1),
+        )
+        kept = EventInteraction.objects.filter(created_at__gte=now - horizon).count()
+        trending.update_trending_scores(now)
+        self.assertFalse(EventInteraction.objects.filter(pk=old.pk).exists())
+        self.assertEqual(EventInteraction.objects.count(), kept)
+
+
+class CommentLoadMoreTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.event = make_event(cls.organizer)
+        Comment.objects.bulk_create([
+            Comment(event=cls.event, user=cls.organizer, content=f'Comment {i}')
+            for i in range(25)
+        ])
+
+    def test_detail_renders_first_page_and_endpoint_loads_the_rest(self):
+        response = self.client.get(
+            reverse('events:event-detail', args=[self.event.slug])
+        )
+        self.assertEqual(len(response.context['comments']), 10)
+        next_url = response.context['comments_next_url']
+
+        seen = [comment.pk for comment in response.context['comments']]
+        while next_url:
+            with self.assertMaxQueries(2):
+                data = self.client.get(next_url).json()
+            seen.extend(item['id'] for item in data['results'])
+            self.assertIn(data['results'][0]['content'], data['html'])
+            next_url = data['next']
+
+        expected = Comment.objects.order_by('-created_at', '-pk').values_list(
+            'pk', flat=True
+        )
+        self.assertEqual(seen, list(expected))
+
+    def test_invalid_cursor(self):
+        url = reverse('events:event-comments', args=[self.event.slug])
+        self.assertEqual(self.client.get(url, {'cursor': 'nope'}).status_code, 400)
+
+
+class CalendarFeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.category = EventCategory.objects.create(
+            name='PyData Talks', slug='tech-talks'
+        )
+        cls.events = [
+            make_event(
+                cls.organizer, title=f'Talk {i}; part {i}', category=cls.category
+            )
+            for i in range(3)
+        ]
+        cls.url = reverse('events:calendar-category', args=['tech-talks'])
+
+    def test_feed_is_streamed_with_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 3)
+        self.assertIn(r'SUMMARY:Talk 0\; part 0', body)
+        self.assertIn('X-WR-CALNAME:PyData Talks events', body)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+    def test_unchanged_poll_is_one_query_and_304(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.events[0].title = 'Renamed'
+        self.events[0].save()
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+    def test_personal_feeds_use_revocable_keys(self):
+        user = User.objects.create_user('visitor', 'visitor@example.com', 'pw')
+        services.register(self.events[1], user)
+        token = ical.feed_token(user)
+        self.assertEqual(ical.feed_token(user), token)
+        old_url = reverse('events:calendar-attending', args=[token])
+        response = self.client.get(old_url)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 1)
+
+        forged = reverse('events:calendar-attending', args=[f'{user.pk}:forged'])
+        self.assertEqual(self.client.get(forged).status_code, 404)
+
+        self.client.force_login(user)
+        attending = reverse('events:user-attending')
+        self.assertContains(self.client.get(attending), old_url)
+        response = self.client.post(
+            reverse('events:calendar-reset'), {'next': attending}
+        )
+        self.assertRedirects(response, attending)
+        self.client.logout()
+        self.assertEqual(self.client.get(old_url).status_code, 404)
+        new_url = reverse('events:calendar-favorites', args=[ical.feed_token(user)])
+        self.assertEqual(self.client.get(new_url).status_code, 200)
+
+    def test_unknown_category_is_404(self):
+        url = reverse('events:calendar-category', args=['nope'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.event = make_event(cls.organizer)
+        cls.detail_url = reverse('events:event-detail', args=[cls.event.slug])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unchanged_detail_page_is_304_after_one_query(self):
+        response = self.client.get(self.detail_url)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(
+            self.client.get(
+                self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            ).status_code,
+            304,
+        )
+
+    def test_new_comment_changes_detail_validators(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        comment = Comment.objects.create(
+            event=self.event, user=self.organizer, content='Hi'
+        )
+        self.assertEqual(
+            self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+        etag = self.client.get(self.detail_url)['ETag']
+        admin.site._registry[Comment].disapprove_comments(
+            None, Comment.objects.filter(pk=comment.pk)
+        )
+        self.assertEqual(
+            self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+    def test_logged_in_pages_have_no_validators(self):
+        self.client.force_login(self.organizer)
+        self.assertNotIn('ETag', self.client.get(self.detail_url))
+
+    def test_list_etag_follows_filters_and_data(self):
+        url = reverse('events:event-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertNotEqual(self.client.get(url, {'sort': 'popular'})['ETag'], etag)
+
+        make_event(self.organizer, title='Another')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_counter_sorted_list_etag_expires(self):
+        url = reverse('events:event-list')
+        now = time.time()
+        with mock.patch('events.conditional.time.time', return_value=now):
+            default = self.client.get(url)['ETag']
+            popular = self.client.get(url, {'sort': 'popular'})['ETag']
+        later = now + caching.get_timeout('list_page')
+        with mock.patch('events.conditional.time.time', return_value=later):
+            self.assertEqual(
+                self.client.get(url, HTTP_IF_NONE_MATCH=default).status_code, 304
+            )
+            response = self.client.get(
+                url, {'sort': 'popular'}, HTTP_IF_NONE_MATCH=popular
+            )
+        self.assertEqual(response.status_code, 200)
+
+
+class ImageVariantTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(self.settings(MEDIA_ROOT=media_root.name))
+
+    def upload(self, name='photo.jpg', size=(1000, 600)):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera Maker'
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, 'JPEG', exif=exif)
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def test_process_images_stores_stripped_variants(self):
+        event = make_event(self.organizer, main_image=self.upload())
+        self.assertIsNone(event.main_image_variants)
+
+        call_command('process_images', stdout=StringIO())
+        event.refresh_from_db()
+        card = event.main_image_variants['card']
+        # 1000px wide: 320 and 640 for cards, only 800 of the detail widths.
+        self.assertEqual([width for width, _ in card['webp']], [320, 640])
+        self.assertEqual(
+            [width for width, _ in event.main_image_variants['detail']['jpeg']], [800]
+        )
+        with event.main_image.storage.open(card['jpeg'][0][1]) as handle:
+            variant = Image.open(handle)
+            self.assertEqual(variant.width, 320)
+            self.assertFalse(variant.getexif())
+
+        template = Template(
+            '{% load event_extras %}'
+            '{% responsive_image e.main_image e.main_image_variants "card" %}'
+        )
+        html = template.render(Context({'e': event}))
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn('320w', html)
+
+    def test_new_upload_resets_variants(self):
+        event = make_event(self.organizer, main_image=self.upload())
+        call_command('process_images', stdout=StringIO())
+        event.refresh_from_db()
+        event.title = 'Renamed'
+        event.save()
+        self.assertIsNotNone(event.main_image_variants)
+
+        event.main_image = self.upload('other.jpg')
+        event.save()
+        event.refresh_from_db()
+        self.assertIsNone(event.main_image_variants)
+
+    def variant_files(self, event):
+        storage = event.main_image.storage
+        return sorted(storage.listdir('event_images/variants')[1])
+
+    def test_replaced_upload_deletes_old_variants(self):
+        event = make_event(self.organizer, main_image=self.upload())
+        call_command('process_images', stdout=StringIO())
+        event.refresh_from_db()
+        self.assertEqual(len(self.variant_files(event)), 6)
+
+        event.main_image = self.upload('other.jpg')
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save()
+        self.assertEqual(self.variant_files(event), [])
+
+    def test_regenerating_replaces_variant_files(self):
+        event = make_event(self.organizer, main_image=self.upload())
+        call_command('process_images', stdout=StringIO())
+        event.refresh_from_db()
+        first = event.main_image_variants
+        files = self.variant_files(event)
+
+        Event.objects.update(main_image_variants=None)
+        call_command('process_images', stdout=StringIO())
+        event.refresh_from_db()
+        self.assertEqual(event.main_image_variants, first)
+        self.assertEqual(self.variant_files(event), files)
+
+    def test_variants_of_an_image_replaced_meanwhile_are_deleted(self):
+        event = make_event(self.organizer, main_image=self.upload())
+
+        def replace_during_processing(field_file, sizes):
+            variants = images.generate_variants(field_file, sizes)
+            Event.objects.filter(pk=event.pk).update(main_image='event_images/other.jpg')
+            return variants
+
+        with mock.patch(
+            'events.management.commands.process_images.generate_variants',
+            side_effect=replace_during_processing,
+        ):
+            call_command('process_images', stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(self.variant_files(event), [])
+
+
+class AsyncViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.user = User.objects.create_user('visitor', 'visitor@example.com', 'pw')
+        cls.event = make_event(cls.organizer, capacity=10)
+        Comment.objects.create(
+            event=cls.event, user=cls.user, content='Looking forward'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def make_request(self, path, user=None, method='get', **extra):
+        request = getattr(AsyncRequestFactory(), method)(path, **extra)
+        user = user or AnonymousUser()
+
+        async def auser():
+            return user
+
+        request.auser = auser
+        request.session = SessionStore()
+        request._messages = FallbackStorage(request)
+        return request
+
+    async def test_list_renders_without_blocking_queries(self):
+        view = async_views.EventListView.as_view()
+        response = await view(self.make_request(reverse('events:event-list')))
+        self.assertEqual(list(response.context_data['events']), [self.event])
+        self.assertContains(response, 'Community Meetup')
+
+        response = await view(
+            self.make_request(
+                reverse('events:event-list'), headers={
+                    'If-None-Match': response['ETag']
+                }
+            )
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_list_keeps_cache_calls_and_facets_off_the_loop(self):
+        def off_loop(method):
+            def wrapper(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    return method(*args, **kwargs)
+                raise AssertionError(
+                    f'cache.{method.__name__}() called on the event loop'
+                )
+            return wrapper
+
+        view = async_views.EventListView.as_view()
+        with contextlib.ExitStack() as stack:
+            for name in ('get', 'get_many', 'set', 'add'):
+                stack.enter_context(
+                    mock.patch.object(cache, name, off_loop(getattr(cache, name)))
+                )
+            for _ in range(2):  # Rendered, then from the page cache.
+                response = await view(self.make_request(reverse('events:event-list')))
+                self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Upcoming (1)')
+
+    async def test_detail_loads_visitor_state(self):
+        view = async_views.EventDetailView.as_view()
+        path = reverse('events:event-detail', args=[self.event.slug])
+        response = await view(self.make_request(path, self.user), slug=self.event.slug)
+        context = response.context_data
+        self.assertEqual(
+            [comment.content for comment in context['comments']], ['Looking forward']
+        )
+        self.assertFalse(context['is_favorite'])
+        self.assertIsNone(context['attendance_status'])
+        self.assertNotIn('ETag', response)
+
+        response = await view(self.make_request(path), slug=self.event.slug)
+        self.assertIn('ETag', response)
+        with self.assertRaises(Http404):
+            await view(self.make_request(path), slug='missing')
+
+    async def test_toggles_update_counters(self):
+        for name, view in (
+            ('event-favorite', async_views.toggle_favorite),
+            ('event-attend', async_views.toggle_attendance),
+        ):
+            path = reverse(f'events:{name}', args=[self.event.slug])
+            response = await view(
+                self.make_request(path, self.user, 'post'), slug=self.event.slug
+            )
+            self.assertEqual(response.status_code, 302)
+        event = await Event.objects.aget(pk=self.event.pk)
+        self.assertEqual((event.registered_count, event.favorites_count), (1, 1))
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class RequestMetricsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.staff = User.objects.create_user(
+            'staff', 'staff@example.com', 'pw', is_staff=True
+        )
+        cls.event = make_event(cls.organizer)
+
+    def setUp(self):
+        cache.clear()
+        instrumentation.store.snapshot(reset=True)
+
+    def test_views_are_recorded_for_staff_dump(self):
+        self.client.get(reverse('events:event-list'))
+        self.client.get(reverse('events:event-detail', args=[self.event.slug]))
+        self.client.get(reverse('events:event-detail', args=[self.event.slug]))
+
+        url = reverse('request-metrics')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.staff)
+        views = self.client.get(url, {'reset': '1'}).json()['views']
+        detail = views['events.views.EventDetailView']
+        self.assertEqual(detail['requests'], 2)
+        self.assertGreater(detail['queries']['max'], 0)
+        self.assertEqual(detail['render_ms']['count'], 2)
+        self.assertIn('events.views.EventListView', views)
+        # Only the dump request itself was recorded after the reset.
+        self.assertEqual(
+            list(instrumentation.store.snapshot()),
+            ['DjangoEventLocator.instrumentation.metrics_view'],
+        )
+
+    def test_repeated_queries_are_flagged(self):
+        sample = instrumentation.RequestSample()
+        with connection.execute_wrapper(sample):
+            for event in Event.objects.all():
+                for _ in range(instrumentation.DUPLICATE_QUERY_THRESHOLD):
+                    Event.objects.filter(pk=event.pk).exists()
+        metrics = instrumentation.ViewMetrics()
+        metrics.add(sample)
+        self.assertEqual(metrics.duplicated_requests, 1)
+        self.assertEqual(
+            metrics.worst_duplicate['repeats'],
+            instrumentation.DUPLICATE_QUERY_THRESHOLD,
+        )
+
+
+class BenchmarkCommandTests(TestCase):
+
+    def test_seeded_counters_match_a_recount_and_benchmarks_run(self):
+        call_command('seed_benchmark_data', events=40, stdout=StringIO())
+        self.assertEqual(Event.objects.count(), 40)
+        fields = ('registered_count', 'favorites_count', 'review_count', 'rating_sum')
+        seeded = list(Event.objects.order_by('pk').values_list(*fields))
+        recount_event_stats(Event.objects.all())
+        self.assertEqual(
+            list(Event.objects.order_by('pk').values_list(*fields)), seeded
+        )
+
+        out = StringIO()
+        call_command(
+            'run_benchmarks', iterations=2, warmup=0, only=[
+                'detail', 'toggle_favorite'
+            ],
+            stdout=out, stderr=StringIO(),
+        )
+        scenarios = json.loads(out.getvalue())['scenarios']
+        self.assertEqual(
+            set(scenarios), {'detail', 'detail_logged_in', 'toggle_favorite'}
+        )
+        self.assertEqual(scenarios['detail']['status_codes'], [200])
+        self.assertEqual(scenarios['toggle_favorite']['requests'], 4)
+        self.assertGreater(scenarios['detail']['peak_memory_kb'], 0)
+
+    def test_deep_page_cursor_matches_the_offset_page(self):
+        call_command('seed_benchmark_data', events=40, stdout=StringIO())
+        user = User.objects.get(username='bench_1')
+        scenarios = {
+            scenario.name: scenario.paths[0]
+            for scenario in benchmarks.build_scenarios(user, deep_page=3)
+        }
+        offset = self.client.get(scenarios['list_deep_page_offset'])
+        cursor = self.client.get(scenarios['list_deep_page_cursor'])
+        self.assertEqual(list(cursor.context['events']), list(offset.context['events']))
+
+
+class ViewBenchmarkTests(TransactionTestCase):
+
+    # The ASGI handler runs views on asgiref's executor thread, which has its
+    # own connection and cannot see a TestCase transaction.
+    @override_settings(DEBUG=False)
+    def test_view_benchmark_allows_its_host(self):
+        make_event(User.objects.create_user('organizer', 'organizer@example.com', 'pw'))
+        out = StringIO()
+        call_command(
+            'benchmark_views', '/events/', requests=4, concurrency=2, host='bench.test',
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        for line in lines[1:]:
+            self.assertTrue(line.endswith(', 0 errors'), line)
+
+        for option in ('requests', 'concurrency'):
+            with self.subTest(option=option), self.assertRaises(CommandError):
+                call_command('benchmark_views', **{option: 0}, stdout=StringIO())
@@ -0,0 +1,202 @@
+"""Trending score: recent interactions with exponential time decay.
+
+Every interaction adds a weight to its event's ``trending_score`` and all
+scores halve every ``half_life``. Because decay is multiplicative, the
+score can be brought up to date incrementally: scale every live score by
+``0.5 ** (elapsed / half_life)`` and add the interactions that arrived
+since the last run.
+
+Interactions are appended to ``EventInteraction`` by the code that makes
+them (``record_interactions``): registrations and re-registrations,
+waitlist promotions, favorites, and reviews or comments when they are
+approved, however late. Because the log is only ever inserted into, new
+interactions are found by primary key, so each run reads only the rows
+added since the previous one instead of aggregating the whole history.
+A primary key is assigned at insert but only becomes visible at commit,
+so a slow transaction can commit a row below the position already
+reached. Ids missing from the last ``LATE_WINDOW`` keys are remembered
+and read again by later runs, so such rows are counted once they appear.
+Rows older than the decay horizon no longer affect any score and are
+deleted after each run.
+
+Interactions picked up by an incremental run are counted at full weight;
+with runs every few minutes and a half-life of a day the difference is
+negligible. ``rebuild_trending_scores`` decays each hour of history
+separately.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from itertools import chain, islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Max, Q, Value, When
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import Event, EventInteraction, ScoreCheckpoint
+
+REGISTRATION = 'registration'
+FAVORITE = 'favorite'
+REVIEW = 'review'
+COMMENT = 'comment'
+WEIGHTS = {REGISTRATION: 3.0, FAVORITE: 2.0, REVIEW: 2.0, COMMENT: 1.0}
+
+CHECKPOINT = 'trending'
+# Ids below the position that were not visible yet when it was reached.
+PENDING = 'trending_pending'
+DEFAULT_HALF_LIFE = timedelta(hours=24)
+# Interactions older than this many half-lives are neither read nor kept.
+HORIZON_HALF_LIVES = 10
+# How far behind the position a late commit is still picked up.
+LATE_WINDOW = 1000
+# Scores below this are reset to zero so decay stops touching the row.
+MIN_SCORE = 0.01
+UPDATE_BATCH_SIZE = 500
+
+
+def record_interactions(kind, event_ids):
+    """Log one ``kind`` interaction per entry of ``event_ids``."""
+    EventInteraction.objects.bulk_create(
+        [EventInteraction(event_id=event_id, kind=kind) for event_id in event_ids]
+    )
+
+
+def get_half_life():
+    hours = getattr(settings, 'EVENTS_TRENDING_HALF_LIFE_HOURS', None)
+    return timedelta(hours=hours) if hours else DEFAULT_HALF_LIFE
+
+
+def decay_factor(elapsed, half_life):
+    return 0.5 ** (elapsed / half_life)
+
+
+def new_interactions(positions):
+    """Weight per event of interactions logged since ``positions``.
+
+    Returns ``(scores, positions)`` with the position moved past the rows
+    that were read and the ids still missing behind it.
+    """
+    scores = defaultdict(float)
+    position = positions.get(CHECKPOINT, 0)
+    pending = positions.get(PENDING, [])
+    seen = set()
+    rows = (
+        EventInteraction.objects.filter(Q(pk__gt=position) | Q(pk__in=pending))
+        .order_by()
+        .values_list('pk', 'event_id', 'kind')
+    )
+    for pk, event_id, kind in rows.iterator():
+        scores[event_id] += WEIGHTS[kind]
+        seen.add(pk)
+    last = max(position, max(seen, default=0))
+    return scores, {
+        CHECKPOINT: last, PENDING: missing_ids(seen, pending, position, last)
+    }
+
+
+def missing_ids(seen, pending, position, last):
+    """Ids up to ``last`` that were not read, within ``LATE_WINDOW`` of it.
+
+    ``pending`` are ids already missing below ``position``; everything
+    above ``position`` is a candidate too.
+    """
+    floor = last - LATE_WINDOW
+    candidates = chain(pending, range(max(position, floor) + 1, last + 1))
+    return sorted(pk for pk in candidates if pk > floor and pk not in seen)
+
+
+def add_scores(scores):
+    """Add ``{event_id: delta}`` to the events' scores in batched updates."""
+    items = iter(scores.items())
+    while True:
+        chunk = dict(islice(items, UPDATE_BATCH_SIZE))
+        if not chunk:
+            return
+        Event.objects.filter(pk__in=chunk).update(
+            trending_score=F('trending_score') + Case(
+                *(When(pk=pk, then=Value(delta)) for pk, delta in chunk.items()),
+                output_field=FloatField(),
+            )
+        )
+
+
+def decay_scores(elapsed, half_life):
+    live = Event.objects.filter(trending_score__gt=0)
+    live.update(trending_score=F('trending_score') * decay_factor(elapsed, half_life))
+    live.filter(trending_score__lt=MIN_SCORE).update(trending_score=0)
+
+
+def get_horizon(half_life):
+    return HORIZON_HALF_LIVES * half_life
+
+
+def prune_interactions(before):
+    """Delete interactions logged before ``before``; return how many."""
+    deleted, _ = EventInteraction.objects.filter(created_at__lt=before).delete()
+    return deleted
+
+
+def update_trending_scores(now=None, half_life=None):
+    """Bring every score up to ``now``; return how many events gained score.
+
+    Interactions older than the decay horizon are deleted afterwards.
+    """
+    now = now or timezone.now()
+    half_life = half_life or get_half_life()
+    with transaction.atomic():
+        checkpoint = (
+            ScoreCheckpoint.objects.select_for_update().filter(name=CHECKPOINT).first()
+        )
+        if checkpoint is None:
+            updated = rebuild_trending_scores(now, half_life)
+        else:
+            decay_scores(now - checkpoint.computed_at, half_life)
+            scores, checkpoint.positions = new_interactions(checkpoint.positions)
+            add_scores(scores)
+            checkpoint.computed_at = now
+            checkpoint.save(update_fields=['computed_at', 'positions'])
+            updated = len(scores)
+    prune_interactions(now - get_horizon(half_life))
+    return updated
+
+
+def rebuild_trending_scores(now=None, half_life=None, horizon=None):
+    """Recompute every score from interactions in the last ``horizon``.
+
+    Each hour of history is decayed by its own age. Older interactions
+    would contribute less than ``MIN_SCORE`` anyway at the default horizon
+    of ten half-lives.
+    """
+    now = now or timezone.now()
+    half_life = half_life or get_half_life()
+    horizon = horizon or get_horizon(half_life)
+    scores = defaultdict(float)
+    with transaction.atomic():
+        last = EventInteraction.objects.aggregate(last=Max('pk'))['last'] or 0
+        # Only ids seen now count inside the window; the rest stay pending.
+        seen = set(
+            EventInteraction.objects.filter(pk__gt=last - LATE_WINDOW, pk__lte=last)
+            .values_list('pk', flat=True)
+        )
+        rows = (
+            EventInteraction.objects.filter(created_at__gte=now - horizon)
+            .filter(Q(pk__lte=last - LATE_WINDOW) | Q(pk__in=seen))
+            .annotate(hour=TruncHour('created_at'))
+            .order_by()
+            .values('event_id', 'kind', 'hour')
+            .annotate(count=Count('pk'))
+        )
+        for row in rows:
+            age = max(now - row['hour'], timedelta(0))
+            weight = WEIGHTS[row['kind']]
+            decay = decay_factor(age, half_life)
+            scores[row['event_id']] += weight * row['count'] * decay
+
+        Event.objects.filter(trending_score__gt=0).update(trending_score=0)
+        add_scores({pk: score for pk, score in scores.items() if score >= MIN_SCORE})
+        positions = {CHECKPOINT: last, PENDING: missing_ids(seen, [], 0, last)}
+        ScoreCheckpoint.objects.update_or_create(
+            name=CHECKPOINT, defaults={'computed_at': now, 'positions': positions}
+        )
+    return len(scores)
@@ -1,26 +1,60 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, async_views, ical, views
 
 app_name = 'events'
 
+# The busiest views have native async versions for ASGI deployments.
+read_views = async_views if getattr(settings, 'EVENTS_ASYNC_VIEWS', False) else views
+
 urlpatterns = [
     # Event CRUD
-    path('', views.EventListView.as_view(), name='event-list'),
+    path('', read_views.EventListView.as_view(), name='event-list'),
     path('new/', views.EventCreateView.as_view(), name='event-create'),
-    path('<slug:slug>/', views.EventDetailView.as_view(), name='event-detail'),
-    path('<slug:slug>/edit/', views.EventUpdateView.as_view(), name='event-update'),
-    path('<slug:slug>/delete/', views.EventDeleteView.as_view(), name='event-delete'),
 
-    # Event actions
-    path('<slug:slug>/favorite/', views.toggle_favorite, name='event-favorite'),
-    path('<slug:slug>/attend/', views.toggle_attendance, name='event-attend'),
+    # JSON API
+    path('api/events/', api.event_list, name='api-event-list'),
+    path('api/events/export/', api.event_export, name='api-event-export'),
+    path('api/events/<slug:slug>/', api.event_detail, name='api-event-detail'),
+    path('api/categories/', api.category_list, name='api-category-list'),
+    path(
+        'api/categories/<slug:slug>/', api.category_detail, name='api-category-detail'
+    ),
+    path('api/tags/', api.tag_list, name='api-tag-list'),
 
-    # Categories and tags
-    path('category/<slug:slug>/', views.EventListView.as_view(), name='category-detail'),
-    path('tag/<slug:slug>/', views.EventListView.as_view(), name='tag-detail'),
+    # Calendar feeds
+    path(
+        'calendar/<str:token>/attending.ics', ical.attending_feed,
+        name='calendar-attending',
+    ),
+    path(
+        'calendar/<str:token>/favorites.ics', ical.favorites_feed,
+        name='calendar-favorites',
+    ),
+    path(
+        'category/<slug:slug>/calendar.ics', ical.category_feed,
+        name='calendar-category',
+    ),
+    path('calendar/reset/', ical.reset_feed, name='calendar-reset'),
 
-    # User-specific views
+    # User-specific views (before the slug routes, which would shadow them)
     path('my-events/', views.UserEventsListView.as_view(), name='user-events'),
     path('my-favorites/', views.UserFavoritesListView.as_view(), name='user-favorites'),
     path('attending/', views.UserAttendingListView.as_view(), name='user-attending'),
+
+    path('<slug:slug>/', read_views.EventDetailView.as_view(), name='event-detail'),
+    path('<slug:slug>/edit/', views.EventUpdateView.as_view(), name='event-update'),
+    path('<slug:slug>/delete/', views.EventDeleteView.as_view(), name='event-delete'),
+    path('<slug:slug>/comments/', views.event_comments, name='event-comments'),
+
+    # Event actions
+    path('<slug:slug>/favorite/', read_views.toggle_favorite, name='event-favorite'),
+    path('<slug:slug>/attend/', read_views.toggle_attendance, name='event-attend'),
+
+    # Categories and tags
+    path(
+        'category/<slug:slug>/', read_views.EventListView.as_view(),
+        name='category-detail',
+    ),
+    path('tag/<slug:slug>/', read_views.EventListView.as_view(), name='tag-detail'),
 ]
@@ -1,9 +1,15 @@
+from functools import partial
+
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Q
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -11,13 +17,62 @@ from django.views.generic import (
     ListView,
     UpdateView,
 )
+from django.views.decorators.http import require_GET
 from django.views.generic.edit import FormMixin
 
+from notifications import services as notifications
+from social import services as social
+
+from . import caching, conditional, facets, filters, ical, services, trending
 from .forms import CommentForm, EventForm
 from .models import Event, EventAttendee, EventCategory, EventTag
+from .pagination import CursorPaginationMixin, paginate_by_cursor
+from .stats import adjust_event_counters
+
+
+COMMENTS_PAGE_SIZE = 10
+
+
+def approved_comments(event):
+    return event.comments.filter(is_approved=True).select_related("user")
+
+
+def approved_reviews(event):
+    return event.reviews.filter(is_approved=True).select_related("user")
+
 
+def attendance_status(event, user):
+    return event.eventattendee_set.filter(user=user).values_list("status", flat=True)
 
-class EventListView(ListView):
+
+def comments_page_url(event, page):
+    """URL of the comments after ``page``, or None on the last page."""
+    if not page.has_next():
+        return None
+    url = reverse("events:event-comments", kwargs={"slug": event.slug})
+    return f"{url}?cursor={page.next_cursor}"
+
+
+class QueryPlanMixin:
+    """Apply the relations a view declares it renders to its queryset.
+
+    Every template access to a foreign key or many-to-many relation must be
+    listed here so a page costs a fixed number of queries.
+    """
+
+    select_related = ()
+    prefetch_related = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+
+class EventListView(CursorPaginationMixin, QueryPlanMixin, ListView):
     """Display list of events with search and filtering."""
 
     model = Event
@@ -25,63 +80,117 @@ class EventListView(ListView):
     context_object_name = "events"
     paginate_by = 12
     ordering = ["-start_date"]
+    select_related = ("organizer", "category")
+    prefetch_related = ("tags",)
+
+    def get(self, request, *args, **kwargs):
+        # Anonymous visitors share fully rendered pages per filter combination.
+        if not caching.is_cacheable_request(request):
+            return super().get(request, *args, **kwargs)
+        etag = conditional.list_etag(request)
+        response = conditional.not_modified(request, etag)
+        if response is not None:
+            return response
+        key = caching.list_page_key(request)
+        response = caching.get_cached_response(key)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            response.render()
+            caching.cache_response(key, response)
+        return conditional.set_validators(response, etag)
+
+    def use_cursor_pagination(self):
+        # Search and explicit sorts order by something other than start_date.
+        return super().use_cursor_pagination() and filters.uses_default_ordering(
+            self.request.GET
+        )
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        queryset = queryset.filter(is_published=True)
-
-        # Search functionality
-        search_query = self.request.GET.get("search")
-        if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query)
-                | Q(description__icontains=search_query)
-                | Q(location_name__icontains=search_query)
-                | Q(city__icontains=search_query)
-            )
-
-        # Category filter
-        category = self.request.GET.get("category")
-        if category:
-            queryset = queryset.filter(category__slug=category)
-
-        # Tag filter
-        tag = self.request.GET.get("tag")
-        if tag:
-            queryset = queryset.filter(tags__slug=tag)
-
-        # Date filter
-        date_filter = self.request.GET.get("date")
-        if date_filter == "upcoming":
-            queryset = queryset.filter(end_date__gte=timezone.now())
-        elif date_filter == "past":
-            queryset = queryset.filter(end_date__lt=timezone.now())
-
-        return queryset
+        queryset = super().get_queryset().filter(is_published=True)
+        return filters.filter_events(queryset, self.request.GET)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["categories"] = EventCategory.objects.all()
-        context["tags"] = EventTag.objects.all()
+        context.update(self.get_sidebar_context())
+        context["selected_tags"] = self.request.GET.getlist("tag")
+        context["sidebar_timeout"] = caching.get_timeout("sidebar")
+        context["card_timeout"] = caching.get_timeout("event_card")
+        context["radius_choices"] = [5, 10, 25, 50, 100]
+        context["sort_choices"] = filters.SORT_CHOICES
+        context["tag_mode_choices"] = filters.TAG_MODE_CHOICES
         return context
 
+    def get_sidebar_context(self):
+        # Evaluated only when the sidebar fragment cache misses; the facet
+        # counts only when the template reads them.
+        return {
+            "categories": EventCategory.objects.all(),
+            "tags": EventTag.objects.all(),
+            "facets": SimpleLazyObject(partial(facets.get_facets, self.request.GET)),
+            "facets_key": caching.facets_key(self.request.GET),
+        }
+
 
-class EventDetailView(FormMixin, DetailView):
+class EventDetailView(QueryPlanMixin, FormMixin, DetailView):
     """Display event details with comments and reviews."""
 
     model = Event
     template_name = "events/event_detail.html"
     form_class = CommentForm
     lookup_field = "slug"
+    select_related = ("organizer", "category")
+    prefetch_related = ("tags",)
+
+    reviews_per_page = 10
+
+    def get(self, request, *args, **kwargs):
+        # Anonymous revalidations of an unchanged event skip rendering.
+        if not caching.is_cacheable_request(request):
+            return super().get(request, *args, **kwargs)
+        validators = conditional.detail_validators(kwargs["slug"], request.GET)
+        if validators is None:
+            raise Http404("No event found.")
+        response = conditional.not_modified(request, *validators)
+        if response is None:
+            response = conditional.set_validators(
+                super().get(request, *args, **kwargs), *validators
+            )
+        return response
+
+    def paginate_related(self, queryset, per_page, page_param, count=None):
+        paginator = Paginator(queryset, per_page)
+        if count is not None:
+            # A denormalized total saves the COUNT(*) query.
+            paginator.count = count
+        return paginator.get_page(self.request.GET.get(page_param))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["comments"] = self.object.comments.filter(is_approved=True)
-        context["reviews"] = self.object.reviews.filter(is_approved=True)
-        if self.request.user.is_authenticated:
-            context["user_review"] = self.object.reviews.filter(
-                user=self.request.user
-            ).first()
+        context.update(self.get_related_context())
+        return context
+
+    def get_related_context(self):
+        """Comments, reviews and the visitor's own state for the event."""
+        event = self.object
+        # Only the newest comments are rendered; the rest load on demand.
+        comments = paginate_by_cursor(
+            approved_comments(event), COMMENTS_PAGE_SIZE, field="created_at"
+        )
+        context = {
+            "comments": comments,
+            "comments_next_url": comments_page_url(event, comments),
+            "reviews": self.paginate_related(
+                approved_reviews(event),
+                self.reviews_per_page,
+                "reviews_page",
+                count=event.review_count,
+            ),
+        }
+        user = self.request.user
+        if user.is_authenticated:
+            context["user_review"] = event.reviews.filter(user=user).first()
+            context["is_favorite"] = user.favorite_events.filter(pk=event.pk).exists()
+            context["attendance_status"] = attendance_status(event, user).first()
         return context
 
     def post(self, request, *args, **kwargs):
@@ -102,6 +211,15 @@ class EventDetailView(FormMixin, DetailView):
         comment.event = self.object
         comment.user = self.request.user
         comment.save()
+        if comment.user_id != self.object.organizer_id:
+            notifications.notify(
+                self.object.organizer,
+                notifications.COMMENT,
+                f'{comment.user} commented on "{self.object.title}"',
+                event=self.object,
+                actor=comment.user,
+                body=comment.content,
+            )
         messages.success(self.request, "Your comment has been posted.")
         return super().form_valid(form)
 
@@ -118,8 +236,10 @@ class EventCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.organizer = self.request.user
+        response = super().form_valid(form)
+        social.publish(self.request.user, social.CREATED, self.object)
         messages.success(self.request, "Event created successfully!")
-        return super().form_valid(form)
+        return response
 
     def get_success_url(self):
         return reverse_lazy("events:event-detail", kwargs={"slug": self.object.slug})
@@ -138,8 +258,22 @@ class EventUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         return self.request.user == event.organizer
 
     def form_valid(self, form):
+        response = super().form_valid(form)
+        if form.has_changed():
+            attendees = (
+                self.object.eventattendee_set.filter(status__in=services.ACTIVE_STATUSES)
+                .exclude(user=self.request.user)
+                .values_list("user_id", flat=True)
+            )
+            notifications.notify_many(
+                attendees.iterator(),
+                notifications.EVENT_UPDATE,
+                f'"{self.object.title}" has been updated',
+                event=self.object,
+                actor=self.request.user,
+            )
         messages.success(self.request, "Event updated successfully!")
-        return super().form_valid(form)
+        return response
 
 
 class EventDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
@@ -159,48 +293,116 @@ class EventDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
+@require_GET
+def event_comments(request, slug):
+    """Next page of an event's comments for the "load more" button.
+
+    Pages are keyed on ``(created_at, id)`` and read through the
+    ``(event, is_approved, -created_at)`` index, so the cost of a page does
+    not grow with how far down the thread it is.
+    """
+    event = get_object_or_404(Event.objects.only("pk", "slug"), slug=slug)
+    try:
+        page = paginate_by_cursor(
+            approved_comments(event),
+            COMMENTS_PAGE_SIZE,
+            request.GET.get("cursor"),
+            field="created_at",
+        )
+    except ValueError:
+        return JsonResponse({"error": "Invalid cursor."}, status=400)
+    return JsonResponse(
+        {
+            "results": [
+                {
+                    "id": comment.pk,
+                    "user": comment.user.username,
+                    "content": comment.content,
+                    "created_at": comment.created_at,
+                }
+                for comment in page
+            ],
+            "html": render_to_string(
+                "events/comment_list.html", {"comments": page}, request=request
+            ),
+            "next": comments_page_url(event, page),
+        }
+    )
+
+
 def toggle_favorite(request, slug):
     """Toggle event favorite status for current user."""
     if not request.user.is_authenticated:
         return redirect("users:login")
 
     event = get_object_or_404(Event, slug=slug)
-    if event in request.user.favorite_events.all():
-        request.user.favorite_events.remove(event)
-        messages.success(request, "Event removed from favorites.")
-    else:
-        request.user.favorite_events.add(event)
+    if set_favorite(event, request.user):
         messages.success(request, "Event added to favorites.")
+    else:
+        messages.success(request, "Event removed from favorites.")
 
     return redirect("events:event-detail", slug=slug)
 
 
+def set_favorite(event, user):
+    """Flip ``event`` in ``user``'s favorites; return True if it was added."""
+    with transaction.atomic():
+        removed, _ = Event.favorites.through.objects.filter(
+            event=event, user=user
+        ).delete()
+        if removed:
+            adjust_event_counters(event.pk, favorites_count=-removed)
+            return False
+        user.favorite_events.add(event)
+        adjust_event_counters(event.pk, favorites_count=1)
+        trending.record_interactions(trending.FAVORITE, [event.pk])
+        social.publish(user, social.FAVORITED, event)
+        return True
+
+
 def toggle_attendance(request, slug):
     """Toggle event attendance status for current user."""
     if not request.user.is_authenticated:
         return redirect("users:login")
 
     event = get_object_or_404(Event, slug=slug)
-    attendance = event.eventattendee_set.filter(user=request.user).first()
-
-    if attendance:
-        if attendance.status == "cancelled":
-            attendance.status = "registered"
-            messages.success(request, "You are now registered for this event.")
-        else:
-            attendance.status = "cancelled"
-            messages.success(request, "Your registration has been cancelled.")
-        attendance.save()
+    if services.cancel(event, request.user):
+        messages.success(request, "Your registration has been cancelled.")
+        return redirect("events:event-detail", slug=slug)
+
+    try:
+        attendance = services.register(event, request.user)
+    except services.RegistrationClosed:
+        messages.error(request, "Registration for this event is closed.")
     else:
-        EventAttendee.objects.create(
-            event=event, user=request.user, status="registered"
-        )
-        messages.success(request, "You are now registered for this event.")
+        announce_registration(request, event, attendance)
 
     return redirect("events:event-detail", slug=slug)
 
 
-class UserEventsListView(LoginRequiredMixin, ListView):
+def announce_registration(request, event, attendance):
+    """Tell the user, their followers and the organizer about a registration."""
+    if attendance.status == services.WAITLISTED:
+        messages.info(
+            request, "This event is full. You have been added to the waitlist."
+        )
+    else:
+        messages.success(request, "You are now registered for this event.")
+        social.publish(request.user, social.ATTENDING, event)
+    if request.user.pk != event.organizer_id:
+        notifications.notify(
+            event.organizer,
+            notifications.REGISTRATION,
+            f'{request.user} {attendance.get_status_display().lower()} '
+            f'for "{event.title}"',
+            event=event,
+            actor=request.user,
+        )
+
+
+class UserEventsListView(
+    LoginRequiredMixin, CursorPaginationMixin, QueryPlanMixin, ListView
+):
     """Display list of events created by the current user."""
 
     model = Event
@@ -209,22 +411,53 @@ class UserEventsListView(LoginRequiredMixin, ListView):
     paginate_by = 12
 
     def get_queryset(self):
-        return Event.objects.filter(organizer=self.request.user).order_by("-start_date")
+        return (
+            super()
+            .get_queryset()
+            .filter(organizer=self.request.user)
+            .order_by("-start_date")
+        )
 
 
-class UserFavoritesListView(LoginRequiredMixin, ListView):
+class UserFavoritesListView(
+    LoginRequiredMixin, CursorPaginationMixin, QueryPlanMixin, ListView
+):
     """Display list of events favorited by the current user."""
 
     model = Event
     template_name = "events/user_favorites_list.html"
     context_object_name = "events"
     paginate_by = 12
+    select_related = ("organizer",)
 
     def get_queryset(self):
-        return self.request.user.favorite_events.all().order_by("-start_date")
+        return (
+            super()
+            .get_queryset()
+            .filter(favorites=self.request.user)
+            .order_by("-start_date")
+        )
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["calendar_url"] = self.request.build_absolute_uri(
+            reverse(
+                "events:calendar-favorites", args=[ical.feed_token(self.request.user)]
+            )
+        )
+        context["attending_ids"] = set(
+            EventAttendee.objects.filter(
+                user=self.request.user,
+                status="registered",
+                event__in=[event.pk for event in context["events"]],
+            ).values_list("event_id", flat=True)
+        )
+        return context
 
-class UserAttendingListView(LoginRequiredMixin, ListView):
+
+class UserAttendingListView(
+    LoginRequiredMixin, CursorPaginationMixin, QueryPlanMixin, ListView
+):
     """Display list of events the user is attending."""
 
     model = Event
@@ -233,12 +466,23 @@ class UserAttendingListView(LoginRequiredMixin, ListView):
     paginate_by = 12
 
     def get_queryset(self):
-        return Event.objects.filter(
-            eventattendee__user=self.request.user, eventattendee__status="registered"
-        ).order_by("-start_date")
+        return (
+            super()
+            .get_queryset()
+            .filter(
+                eventattendee__user=self.request.user,
+                eventattendee__status="registered",
+            )
+            .order_by("-start_date")
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context["calendar_url"] = self.request.build_absolute_uri(
+            reverse(
+                "events:calendar-attending", args=[ical.feed_token(self.request.user)]
+            )
+        )
         context["past_events"] = Event.objects.filter(
             eventattendee__user=self.request.user,
             eventattendee__status="attended",
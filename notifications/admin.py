@@ -1,3 +1,22 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import EmailOutbox, Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('message', 'recipient', 'verb', 'is_read', 'created_at')
+    list_filter = ('verb', 'is_read')
+    raw_id_fields = ('recipient', 'actor', 'event')
+    search_fields = ('message', 'recipient__username')
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = (
+        'subject', 'recipient', 'status', 'attempts', 'next_attempt_at', 'sent_at'
+    )
+    list_filter = ('status',)
+    raw_id_fields = ('recipient',)
+    search_fields = ('subject', 'recipient__username', 'recipient__email')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
@@ -0,0 +1,131 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from notifications.models import EmailOutbox
+from notifications.services import build_message, pending_emails, retry_delay
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued notification emails in batches over one mail connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='Give up on an email after this many failed deliveries.',
+        )
+        parser.add_argument(
+            '--retry-delay', type=int, default=60,
+            help='Seconds before the first retry; doubled after every failure.',
+        )
+        parser.add_argument(
+            '--lease', type=int, default=300,
+            help='Seconds a claimed email is hidden from other workers.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting once it is drained.',
+        )
+        parser.add_argument('--interval', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        self.options = options
+        total_sent = total_failed = 0
+        while True:
+            emails = self.claim(options['batch_size'], options['lease'])
+            if emails:
+                sent, failed = self.deliver(emails)
+                total_sent += sent
+                total_failed += failed
+                self.stdout.write(f'{total_sent} emails sent, {total_failed} failed...')
+            elif options['loop']:
+                time.sleep(options['interval'])
+            else:
+                break
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {total_sent} emails ({total_failed} failed deliveries).'
+        ))
+
+    def claim(self, batch_size, lease):
+        """Lease the next batch of due emails so concurrent workers skip them."""
+        now = timezone.now()
+        with transaction.atomic():
+            due = pending_emails(now).order_by('next_attempt_at', 'pk')
+            if connection.features.has_select_for_update:
+                due = due.select_for_update(
+                    skip_locked=connection.features.has_select_for_update_skip_locked
+                )
+            ids = list(due.values_list('pk', flat=True)[:batch_size])
+            EmailOutbox.objects.filter(pk__in=ids).update(
+                next_attempt_at=now + timedelta(seconds=lease)
+            )
+        return list(EmailOutbox.objects.filter(pk__in=ids).select_related('recipient'))
+
+    def deliver(self, emails):
+        """Send one message per recipient and record the outcome of each email.
+
+        Returns ``(messages sent, messages failed)``.
+        """
+        by_recipient = defaultdict(list)
+        for email in emails:
+            by_recipient[email.recipient].append(email)
+
+        delivered, failed = [], []
+        mail = get_connection()
+        try:
+            mail.open()
+        except Exception as exc:
+            # Nothing can be sent; the whole batch backs off and is retried.
+            connect_error = f'{type(exc).__name__}: {exc}'
+        else:
+            connect_error = None
+        try:
+            for recipient, queued in by_recipient.items():
+                if not recipient.email:
+                    self.fail(queued, 'Recipient has no email address.', final=True)
+                    failed.extend(queued)
+                    continue
+                if connect_error:
+                    self.fail(queued, connect_error)
+                    failed.extend(queued)
+                    continue
+                try:
+                    # One message per call so a rejected address does not
+                    # mark the rest of the batch as failed.
+                    mail.send_messages([build_message(recipient, queued)])
+                except Exception as exc:
+                    self.fail(queued, f'{type(exc).__name__}: {exc}')
+                    failed.extend(queued)
+                else:
+                    delivered.extend(queued)
+        finally:
+            if connect_error is None:
+                mail.close()
+
+        if delivered:
+            EmailOutbox.objects.filter(pk__in=[email.pk for email in delivered]).update(
+                status='sent', sent_at=timezone.now()
+            )
+        if failed:
+            EmailOutbox.objects.bulk_update(
+                failed, ['status', 'attempts', 'next_attempt_at', 'last_error']
+            )
+        recipients_failed = len({email.recipient_id for email in failed})
+        return len(by_recipient) - recipients_failed, recipients_failed
+
+    def fail(self, emails, error, final=False):
+        now = timezone.now()
+        for email in emails:
+            email.attempts += 1
+            email.last_error = error
+            if final or email.attempts >= self.options['max_attempts']:
+                email.status = 'failed'
+            else:
+                delay = retry_delay(email.attempts, self.options['retry_delay'])
+                email.next_attempt_at = now + timedelta(seconds=delay)
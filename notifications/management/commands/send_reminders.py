@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from notifications.reminders import DEFAULT_CHUNK_SIZE, run_tick
+
+
+class Command(BaseCommand):
+    help = 'Queue 24 hour and 1 hour reminders for events starting soon.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tick', type=int, default=60,
+            help='Seconds between scans when running with --loop.',
+        )
+        parser.add_argument(
+            '--window', type=int,
+            help=(
+                'Seconds of start times covered by each scan (default: twice '
+                'the tick, so a late tick does not skip events).'
+            ),
+        )
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep scanning every --tick seconds instead of running once.',
+        )
+
+    def handle(self, *args, **options):
+        window = timedelta(seconds=options['window'] or 2 * options['tick'])
+        while True:
+            started = time.monotonic()
+            counts = run_tick(window, chunk_size=options['chunk_size'])
+            summary = ', '.join(f'{count} {kind}' for kind, count in counts.items())
+            self.stdout.write(f'Queued reminders: {summary}.')
+            if not options['loop']:
+                break
+            time.sleep(max(0, options['tick'] - (time.monotonic() - started)))
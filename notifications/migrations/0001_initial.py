@@ -0,0 +1,125 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('events', '0008_eventattendee_waitlisted'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('pending', 'Pending'), ('sent', 'Sent'),
+                            ('failed', 'Failed'),
+                        ],
+                        default='pending', max_length=10,
+                    ),
+                ),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                (
+                    'next_attempt_at',
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                (
+                    'recipient',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='queued_emails', to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'queued email',
+                'verbose_name_plural': 'email outbox',
+                'indexes': [
+                    models.Index(
+                        fields=['status', 'next_attempt_at'],
+                        name='notificatio_status_1fc719_idx',
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'verb',
+                    models.CharField(
+                        choices=[
+                            ('registration', 'Registration'), ('comment', 'Comment'),
+                            ('event_update', 'Event update'),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ('message', models.CharField(max_length=255)),
+                ('is_read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                (
+                    'actor',
+                    models.ForeignKey(
+                        blank=True, null=True,
+                        on_delete=django.db.models.deletion.SET_NULL, related_name='+',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    'event',
+                    models.ForeignKey(
+                        blank=True, null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='notifications', to='events.event',
+                    ),
+                ),
+                (
+                    'recipient',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='notifications', to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [
+                    models.Index(
+                        fields=['recipient', 'is_read', '-created_at'],
+                        name='notificatio_recipie_684eac_idx',
+                    ),
+                ],
+            },
+        ),
+    ]
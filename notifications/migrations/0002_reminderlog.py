@@ -0,0 +1,56 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_reminder_indexes'),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='verb',
+            field=models.CharField(
+                choices=[
+                    ('registration', 'Registration'), ('comment', 'Comment'),
+                    ('event_update', 'Event update'), ('reminder', 'Reminder'),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.CreateModel(
+            name='ReminderLog',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'kind',
+                    models.CharField(
+                        choices=[('24h', '24 hours before'), ('1h', '1 hour before')],
+                        max_length=5,
+                    ),
+                ),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                (
+                    'attendee',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='reminders', to='events.eventattendee',
+                    ),
+                ),
+            ],
+            options={
+                'unique_together': {('attendee', 'kind')},
+            },
+        ),
+    ]
@@ -1,3 +1,102 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class Notification(models.Model):
+    """In-app notification for a user."""
+    VERB_CHOICES = [
+        ('registration', _('Registration')),
+        ('comment', _('Comment')),
+        ('event_update', _('Event update')),
+        ('reminder', _('Reminder')),
+    ]
+
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    event = models.ForeignKey(
+        'events.Event',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notifications'
+    )
+    verb = models.CharField(max_length=20, choices=VERB_CHOICES)
+    message = models.CharField(max_length=255)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', 'is_read', '-created_at']),
+        ]
+
+    def __str__(self):
+        return self.message
+
+
+class EmailOutbox(models.Model):
+    """Email queued for delivery by the send_notifications worker."""
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('sent', _('Sent')),
+        ('failed', _('Failed')),
+    ]
+
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='queued_emails'
+    )
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('queued email')
+        verbose_name_plural = _('email outbox')
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} to {self.recipient_id} ({self.status})'
+
+
+class ReminderLog(models.Model):
+    """Records that an attendee was reminded, so no reminder goes out twice."""
+    KIND_CHOICES = [
+        ('24h', _('24 hours before')),
+        ('1h', _('1 hour before')),
+    ]
+
+    attendee = models.ForeignKey(
+        'events.EventAttendee',
+        on_delete=models.CASCADE,
+        related_name='reminders'
+    )
+    kind = models.CharField(max_length=5, choices=KIND_CHOICES)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['attendee', 'kind']
+
+    def __str__(self):
+        return f'{self.kind} reminder for attendee {self.attendee_id}'
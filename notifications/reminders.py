@@ -0,0 +1,133 @@
+"""Reminders ahead of an event's start for its registered attendees.
+
+Each tick looks only at events starting inside a narrow window ending
+``lead`` from now, found through the ``(is_published, start_date)`` index.
+Their attendees are read in keyset chunks over the
+``(event, status, user)`` index, so memory stays flat no matter how large
+an event is. A ``ReminderLog`` row per attendee and kind makes overlapping
+or repeated ticks harmless: each chunk's attendee rows are locked before
+the log is checked, so a reminder is queued only by the tick that wrote
+its log row. Where the lock is a no-op (SQLite), the log's unique
+constraint catches the overlap instead and the chunk is claimed again.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from events.models import Event, EventAttendee
+
+from . import services
+from .models import ReminderLog
+
+# Reminder kind -> how long before the start it is sent.
+REMINDER_LEADS = {
+    '24h': timedelta(hours=24),
+    '1h': timedelta(hours=1),
+}
+REMINDER_MESSAGES = {
+    '24h': '"{title}" starts in 24 hours',
+    '1h': '"{title}" starts in 1 hour',
+}
+DEFAULT_CHUNK_SIZE = 1000
+CLAIM_ATTEMPTS = 3
+
+
+def due_events(kind, window, now=None):
+    """Return ``(pk, title)`` of published events ``kind`` is due for."""
+    now = now or timezone.now()
+    end = now + REMINDER_LEADS[kind]
+    return Event.objects.filter(
+        is_published=True, start_date__gt=end - window, start_date__lte=end
+    ).values_list('pk', 'title')
+
+
+def attendee_chunks(event_id, kind, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield lists of ``(attendee pk, user pk)`` still owed a ``kind`` reminder."""
+    already_sent = ReminderLog.objects.filter(attendee=OuterRef('pk'), kind=kind)
+    attendees = (
+        EventAttendee.objects.filter(event_id=event_id, status='registered')
+        .exclude(Exists(already_sent))
+        .order_by('user_id')
+        .values_list('pk', 'user_id')
+    )
+    last_user_id = None
+    while True:
+        chunk = attendees
+        if last_user_id is not None:
+            chunk = attendees.filter(user_id__gt=last_user_id)
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_user_id = chunk[-1][1]
+
+
+def logged_attendee_ids(attendee_ids, kind):
+    """Return which of ``attendee_ids`` already have a ``kind`` log row."""
+    return set(
+        ReminderLog.objects.filter(attendee_id__in=attendee_ids, kind=kind)
+        .values_list('attendee_id', flat=True)
+    )
+
+
+def queue_chunk(chunk, kind, message, event):
+    """Claim and queue ``kind`` reminders for a chunk of attendees.
+
+    ``chunk`` may be stale: another tick can have reminded some of them
+    since it was read. Locking the attendee rows makes a concurrent tick
+    wait for this transaction, and the log is read only once the locks are
+    held. Without row locks the other tick's log rows make the insert fail;
+    the transaction is rolled back and the chunk claimed again from a fresh
+    read of the log. A chunk that keeps failing is left for the next tick.
+    Returns how many reminders were queued.
+    """
+    attendee_ids = [attendee_id for attendee_id, _ in chunk]
+    for _ in range(CLAIM_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                list(
+                    EventAttendee.objects.select_for_update()
+                    .filter(pk__in=attendee_ids)
+                    .values_list('pk', flat=True)
+                )
+                sent = logged_attendee_ids(attendee_ids, kind)
+                claimed = [
+                    (attendee_id, user_id)
+                    for attendee_id, user_id in chunk
+                    if attendee_id not in sent
+                ]
+                ReminderLog.objects.bulk_create([
+                    ReminderLog(attendee_id=attendee_id, kind=kind)
+                    for attendee_id, _ in claimed
+                ])
+                return services.notify_many(
+                    [user_id for _, user_id in claimed], services.REMINDER, message,
+                    event=event, batch_size=max(len(claimed), 1),
+                )
+        except IntegrityError:
+            continue
+    return 0
+
+
+def send_event_reminders(event_id, title, kind, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Queue ``kind`` reminders for one event; return how many were queued."""
+    message = REMINDER_MESSAGES[kind].format(title=title)
+    event = Event(pk=event_id, title=title)
+    return sum(
+        queue_chunk(chunk, kind, message, event)
+        for chunk in attendee_chunks(event_id, kind, chunk_size)
+    )
+
+
+def run_tick(window, now=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Queue every reminder due in the window; return ``{kind: count}``."""
+    now = now or timezone.now()
+    counts = {}
+    for kind in REMINDER_LEADS:
+        counts[kind] = sum(
+            send_event_reminders(event_id, title, kind, chunk_size)
+            for event_id, title in due_events(kind, window, now)
+        )
+    return counts
@@ -0,0 +1,92 @@
+"""Recording notifications and queueing their emails.
+
+Nothing here talks to the mail server: ``notify`` writes an in-app
+``Notification`` and an ``EmailOutbox`` row in the caller's transaction,
+and the ``send_notifications`` command delivers the outbox later. A request
+that triggers a notification therefore costs two inserts, never an SMTP
+round trip, and a rolled-back request leaves no email behind.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage
+from django.utils import timezone
+
+from .models import EmailOutbox, Notification
+
+REGISTRATION = 'registration'
+COMMENT = 'comment'
+EVENT_UPDATE = 'event_update'
+REMINDER = 'reminder'
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def notify(recipient, verb, message, event=None, actor=None, body=''):
+    """Record a notification for ``recipient`` and queue it by email."""
+    notification = Notification.objects.create(
+        recipient=recipient, actor=actor, event=event, verb=verb, message=message
+    )
+    if recipient.email:
+        EmailOutbox.objects.create(
+            recipient=recipient, subject=message, body=body or message
+        )
+    return notification
+
+
+def notify_many(recipient_ids, verb, message, event=None, actor=None, body='',
+                batch_size=DEFAULT_BATCH_SIZE):
+    """Fan ``message`` out to many users with batched inserts.
+
+    ``recipient_ids`` may be any iterable, including a ``values_list``
+    queryset; it is consumed in chunks of ``batch_size``. Returns the number
+    of notifications created.
+    """
+    User = get_user_model()
+    actor_id = actor.pk if actor is not None else None
+    event_id = event.pk if event is not None else None
+    ids = iter(recipient_ids)
+    created = 0
+    while True:
+        chunk = list(islice(ids, batch_size))
+        if not chunk:
+            return created
+        Notification.objects.bulk_create([
+            Notification(
+                recipient_id=user_id, actor_id=actor_id, event_id=event_id,
+                verb=verb, message=message,
+            )
+            for user_id in chunk
+        ])
+        with_email = User.objects.filter(pk__in=chunk).exclude(email='')
+        EmailOutbox.objects.bulk_create([
+            EmailOutbox(recipient_id=user_id, subject=message, body=body or message)
+            for user_id in with_email.values_list('pk', flat=True)
+        ])
+        created += len(chunk)
+
+
+def build_message(recipient, emails):
+    """Return one ``EmailMessage`` for all of ``recipient``'s queued emails.
+
+    A single queued email is sent as is; several are coalesced into a
+    digest so a busy event does not flood anyone's inbox.
+    """
+    from_email = settings.DEFAULT_FROM_EMAIL
+    if len(emails) == 1:
+        email = emails[0]
+        return EmailMessage(email.subject, email.body, from_email, [recipient.email])
+    subject = f'You have {len(emails)} new notifications'
+    body = '\n\n'.join(f'* {email.subject}\n{email.body}' for email in emails)
+    return EmailMessage(subject, body, from_email, [recipient.email])
+
+
+def retry_delay(attempts, base_delay):
+    """Seconds to wait before retry number ``attempts`` (1-based)."""
+    return base_delay * 2 ** (attempts - 1)
+
+
+def pending_emails(now=None):
+    now = now or timezone.now()
+    return EmailOutbox.objects.filter(status='pending', next_attempt_at__lte=now)
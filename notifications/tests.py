@@ -1,3 +1,206 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db.models import F
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, EventAttendee, EventCategory
+from events.tests import make_event
+
+from . import reminders, services
+from .models import EmailOutbox, Notification, ReminderLog
+
+User = get_user_model()
+
+
+def send_notifications(**options):
+    call_command('send_notifications', stdout=StringIO(), **options)
+
+
+class NotificationPipelineTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.attendee = User.objects.create_user(
+            'attendee', 'attendee@example.com', 'pw'
+        )
+        cls.event = make_event(cls.organizer)
+
+    def test_registration_is_queued_not_sent(self):
+        self.client.force_login(self.attendee)
+        self.client.post(reverse('events:event-attend', args=[self.event.slug]))
+
+        self.assertEqual(len(mail.outbox), 0)
+        notification = Notification.objects.get(recipient=self.organizer)
+        self.assertEqual(notification.verb, services.REGISTRATION)
+        self.assertEqual(EmailOutbox.objects.filter(status='pending').count(), 1)
+
+        send_notifications()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['organizer@example.com'])
+        self.assertFalse(EmailOutbox.objects.filter(status='pending').exists())
+
+    def test_emails_to_one_user_are_coalesced(self):
+        for i in range(3):
+            services.notify(
+                self.organizer, services.COMMENT, f'Comment {i}', event=self.event
+            )
+        services.notify(self.attendee, services.COMMENT, 'Hello', event=self.event)
+
+        send_notifications()
+        self.assertEqual(len(mail.outbox), 2)
+        digest = next(m for m in mail.outbox if m.to == ['organizer@example.com'])
+        self.assertEqual(digest.subject, 'You have 3 new notifications')
+        self.assertEqual(EmailOutbox.objects.filter(status='sent').count(), 4)
+
+    def test_failed_delivery_backs_off_then_gives_up(self):
+        services.notify(self.organizer, services.COMMENT, 'Hi', event=self.event)
+        target = 'django.core.mail.backends.locmem.EmailBackend.send_messages'
+        with mock.patch(target, side_effect=SMTPException('unavailable')):
+            send_notifications(max_attempts=2, retry_delay=60)
+            email = EmailOutbox.objects.get()
+            self.assertEqual((email.status, email.attempts), ('pending', 1))
+            self.assertGreater(
+                email.next_attempt_at, timezone.now() + timedelta(seconds=50)
+            )
+
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+            send_notifications(max_attempts=2, retry_delay=60)
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ('failed', 2))
+            self.assertIn('unavailable', email.last_error)
+
+    def test_connection_failure_backs_off_the_batch(self):
+        services.notify(self.organizer, services.COMMENT, 'Hi', event=self.event)
+        target = 'django.core.mail.backends.locmem.EmailBackend.open'
+        with mock.patch(target, side_effect=ConnectionRefusedError('refused')):
+            send_notifications(retry_delay=60)
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertGreater(
+            email.next_attempt_at, timezone.now() + timedelta(seconds=50)
+        )
+        self.assertIn('refused', email.last_error)
+
+    def test_event_update_notifies_attendees(self):
+        others = [
+            User.objects.create_user(f'user{i}', f'user{i}@example.com', 'pw')
+            for i in range(3)
+        ]
+        EventAttendee.objects.bulk_create([
+            EventAttendee(event=self.event, user=user)
+            for user in [self.attendee, *others]
+        ])
+
+        self.client.force_login(self.organizer)
+        url = reverse('events:event-update', args=[self.event.slug])
+        category = EventCategory.objects.create(name='Meetups', slug='meetups')
+        data = {
+            'title': 'Community Meetup (moved)',
+            'description': self.event.description,
+            'start_date': self.event.start_date.strftime('%Y-%m-%dT%H:%M'),
+            'end_date': self.event.end_date.strftime('%Y-%m-%dT%H:%M'),
+            'location_name': self.event.location_name,
+            'address': self.event.address,
+            'city': self.event.city,
+            'country': self.event.country,
+            'is_free': 'on',
+            'is_published': 'on',
+            'category': category.pk,
+        }
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+
+        self.assertEqual(
+            Notification.objects.filter(verb=services.EVENT_UPDATE).count(), 4
+        )
+        self.assertEqual(EmailOutbox.objects.count(), 4)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class ReminderTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            'organizer', 'organizer@example.com', 'pw'
+        )
+        cls.users = [
+            User.objects.create_user(f'user{i}', f'user{i}@example.com', 'pw')
+            for i in range(5)
+        ]
+        now = timezone.now()
+        cls.tomorrow = make_event(
+            cls.organizer, start_date=now + timedelta(hours=24, seconds=-30)
+        )
+        cls.soon = make_event(cls.organizer, start_date=now + timedelta(minutes=59))
+        cls.later = make_event(cls.organizer, start_date=now + timedelta(hours=5))
+        for event in (cls.tomorrow, cls.soon, cls.later):
+            Event.objects.filter(pk=event.pk).update(
+                end_date=F('start_date') + timedelta(hours=2)
+            )
+        EventAttendee.objects.bulk_create(
+            [EventAttendee(event=cls.tomorrow, user=user) for user in cls.users[:3]]
+            + [EventAttendee(event=cls.soon, user=user) for user in cls.users[2:]]
+            + [EventAttendee(event=cls.later, user=user) for user in cls.users]
+        )
+        EventAttendee.objects.filter(event=cls.soon, user=cls.users[4]).update(
+            status='cancelled'
+        )
+
+    def test_only_due_registered_attendees_are_reminded_once(self):
+        for _ in range(2):
+            call_command('send_reminders', chunk_size=2, stdout=StringIO())
+
+        reminders = Notification.objects.filter(verb=services.REMINDER)
+        self.assertEqual(
+            sorted(reminders.values_list('event_id', 'recipient__username')),
+            sorted(
+                [(self.tomorrow.pk, f'user{i}') for i in range(3)]
+                + [(self.soon.pk, f'user{i}') for i in range(2, 4)]
+            ),
+        )
+        self.assertEqual(ReminderLog.objects.count(), 5)
+        self.assertEqual(EmailOutbox.objects.count(), 5)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_overlapping_ticks_queue_each_reminder_once(self):
+        # A second tick read its chunk before the first one finished.
+        stale = next(reminders.attendee_chunks(self.tomorrow.pk, '24h'))
+        first = reminders.run_tick(timedelta(minutes=5))
+        message = reminders.REMINDER_MESSAGES['24h'].format(title=self.tomorrow.title)
+        self.assertEqual(reminders.queue_chunk(stale, '24h', message, self.tomorrow), 0)
+        self.assertEqual(reminders.run_tick(timedelta(minutes=5)), {'24h': 0, '1h': 0})
+
+        self.assertEqual(first, {'24h': 3, '1h': 2})
+        self.assertEqual(Notification.objects.filter(verb=services.REMINDER).count(), 5)
+        self.assertEqual(EmailOutbox.objects.count(), 5)
+
+    def test_unlocked_overlap_reclaims_the_chunk(self):
+        # Without row locks (SQLite) the stale tick reads the log before the
+        # other tick's rows are visible, and its insert hits the constraint.
+        stale = next(reminders.attendee_chunks(self.tomorrow.pk, '24h'))
+        first = reminders.run_tick(timedelta(minutes=5))
+        reads = [set()]
+
+        def read_log(attendee_ids, kind):
+            return reads.pop() if reads else logged(attendee_ids, kind)
 
-# Create your tests here.
+        logged = reminders.logged_attendee_ids
+        message = reminders.REMINDER_MESSAGES['24h'].format(title=self.tomorrow.title)
+        with mock.patch.object(reminders, 'logged_attendee_ids', side_effect=read_log):
+            self.assertEqual(
+                reminders.queue_chunk(stale, '24h', message, self.tomorrow), 0
+            )
+        self.assertEqual(first['24h'], 3)
+        self.assertEqual(Notification.objects.filter(verb=services.REMINDER).count(), 5)
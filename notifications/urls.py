@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'notifications'
+
+urlpatterns = [
+    path('', views.NotificationListView.as_view(), name='notification-list'),
+    path('mark-read/', views.mark_all_read, name='mark-all-read'),
+]
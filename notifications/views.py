@@ -1,3 +1,29 @@
-from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import redirect
+from django.views.decorators.http import require_POST
+from django.views.generic import ListView
 
-# Create your views here.
+from .models import Notification
+
+
+class NotificationListView(LoginRequiredMixin, ListView):
+    """The current user's notifications, newest first."""
+    template_name = 'notifications/notification_list.html'
+    context_object_name = 'notifications'
+    paginate_by = 20
+
+    def get_queryset(self):
+        return (
+            Notification.objects.filter(recipient=self.request.user)
+            .select_related('actor', 'event')
+        )
+
+
+@login_required
+@require_POST
+def mark_all_read(request):
+    Notification.objects.filter(recipient=request.user, is_read=False).update(
+        is_read=True
+    )
+    return redirect('notifications:notification-list')
@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Activity, Follow
+
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('follower', 'followee', 'created_at')
+    raw_id_fields = ('follower', 'followee')
+    search_fields = ('follower__username', 'followee__username')
+
+
+@admin.register(Activity)
+class ActivityAdmin(admin.ModelAdmin):
+    list_display = ('actor', 'verb', 'event', 'fanned_out', 'created_at')
+    list_filter = ('verb', 'fanned_out')
+    raw_id_fields = ('actor', 'event')
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from social.models import FeedItem
+from social.services import feed_cap, trim_feed
+
+
+class Command(BaseCommand):
+    help = 'Delete feed items beyond the newest SOCIAL_FEED_CAP of every feed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cap', type=int, help='Items to keep per feed.')
+
+    def handle(self, *args, **options):
+        cap = options['cap'] or feed_cap()
+        oversized = (
+            FeedItem.objects.values('owner_id')
+            .annotate(items=Count('pk'))
+            .filter(items__gt=cap)
+            .values_list('owner_id', flat=True)
+        )
+        deleted = feeds = 0
+        for owner_id in oversized:
+            deleted += trim_feed(owner_id, cap)
+            feeds += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Trimmed {deleted} items from {feeds} feeds.')
+        )
@@ -0,0 +1,134 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('events', '0009_reminder_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Activity',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'verb',
+                    models.CharField(
+                        choices=[
+                            ('created', 'Created'), ('favorited', 'Favorited'),
+                            ('attending', 'Attending'),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('fanned_out', models.BooleanField(default=True)),
+                (
+                    'actor',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='activities', to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    'event',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='activities', to='events.event',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name_plural': 'activities',
+                'ordering': ['-pk'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeedItem',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'activity',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='feed_items', to='social.activity',
+                    ),
+                ),
+                (
+                    'owner',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='feed_items', to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Follow',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                (
+                    'followee',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='followers', to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    'follower',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='following', to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(
+                fields=['actor', 'fanned_out'], name='activity_actor_fanout_idx'
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name='feeditem',
+            unique_together={('owner', 'activity')},
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.CheckConstraint(
+                condition=models.Q(('follower', models.F('followee')), _negated=True),
+                name='follow_not_self',
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name='follow',
+            unique_together={('follower', 'followee')},
+        ),
+    ]
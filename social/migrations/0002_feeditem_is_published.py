@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-17 05:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_event_visibility(apps, schema_editor):
+    FeedItem = apps.get_model('social', 'FeedItem')
+    FeedItem.objects.filter(activity__event__is_published=False).update(is_published=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0016_rebuild_search_terms'),
+        ('social', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feeditem',
+            name='is_published',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(copy_event_visibility, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='feeditem',
+            index=models.Index(
+                fields=['owner', 'is_published', 'activity'],
+                name='feeditem_owner_published_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='feeditem',
+            index=models.Index(
+                condition=models.Q(('is_published', True)),
+                fields=['owner', 'activity'],
+                name='feeditem_owner_public_idx',
+            ),
+        ),
+    ]
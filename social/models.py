@@ -1,3 +1,104 @@
+from django.conf import settings
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class Follow(models.Model):
+    """One user following another."""
+    follower = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='following'
+    )
+    followee = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='followers'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['follower', 'followee']
+        constraints = [
+            models.CheckConstraint(
+                condition=~models.Q(follower=models.F('followee')),
+                name='follow_not_self',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.follower_id} follows {self.followee_id}'
+
+
+class Activity(models.Model):
+    """Something a user did with an event, shown in their followers' feeds."""
+    VERB_CHOICES = [
+        ('created', _('Created')),
+        ('favorited', _('Favorited')),
+        ('attending', _('Attending')),
+    ]
+
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='activities'
+    )
+    verb = models.CharField(max_length=20, choices=VERB_CHOICES)
+    event = models.ForeignKey(
+        'events.Event',
+        on_delete=models.CASCADE,
+        related_name='activities'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    # False for actors with too many followers to copy into every feed;
+    # their activities are merged in when a feed is read.
+    fanned_out = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ['-pk']
+        verbose_name_plural = _('activities')
+        indexes = [
+            models.Index(
+                fields=['actor', 'fanned_out'], name='activity_actor_fanout_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.actor_id} {self.verb} {self.event_id}'
+
+
+class FeedItem(models.Model):
+    """An activity copied into one follower's feed."""
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='feed_items'
+    )
+    activity = models.ForeignKey(
+        Activity,
+        on_delete=models.CASCADE,
+        related_name='feed_items'
+    )
+    # Copy of the event's is_published, kept in step by social.signals, so
+    # feeds are read from the index below without joining the event.
+    is_published = models.BooleanField(default=True)
+
+    class Meta:
+        # Also the index feeds are trimmed through, newest first.
+        unique_together = ['owner', 'activity']
+        # Feeds are read through these; the partial one for SQLite, as on
+        # Event (see events.models.Event.Meta, including models.W037).
+        indexes = [
+            models.Index(
+                fields=['owner', 'is_published', 'activity'],
+                name='feeditem_owner_published_idx',
+            ),
+            models.Index(
+                fields=['owner', 'activity'],
+                condition=models.Q(is_published=True),
+                name='feeditem_owner_public_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Activity {self.activity_id} for {self.owner_id}'
@@ -0,0 +1,136 @@
+"""Follow graph and activity feed.
+
+Feeds are precomputed: when a user does something, the activity is copied
+into the ``FeedItem`` table of each of their followers (fan-out on write),
+so reading a feed never has to look at who the reader follows. Copying is
+skipped for actors with more than ``SOCIAL_FANOUT_LIMIT`` followers; their
+activities stay ``fanned_out=False`` and ``feed_for`` merges them in at
+read time instead (fan-out on read). Feed items carry their event's
+``is_published`` so drafts can be left out without a join.
+
+Feeds are capped at ``SOCIAL_FEED_CAP`` items; ``trim_feeds`` deletes
+anything older.
+"""
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import Activity, FeedItem, Follow
+
+CREATED = 'created'
+FAVORITED = 'favorited'
+ATTENDING = 'attending'
+
+DEFAULT_FANOUT_LIMIT = 1000
+DEFAULT_FEED_CAP = 500
+FANOUT_BATCH_SIZE = 1000
+# Recent activities copied into a feed when its owner starts following someone.
+BACKFILL_SIZE = 20
+FEED_PAGE_SIZE = 20
+
+
+def fanout_limit():
+    return getattr(settings, 'SOCIAL_FANOUT_LIMIT', DEFAULT_FANOUT_LIMIT)
+
+
+def feed_cap():
+    return getattr(settings, 'SOCIAL_FEED_CAP', DEFAULT_FEED_CAP)
+
+
+def follow(follower, followee):
+    """Start following ``followee``; return whether a new follow was made."""
+    if follower.pk == followee.pk:
+        return False
+    try:
+        with transaction.atomic():
+            Follow.objects.create(follower=follower, followee=followee)
+    except IntegrityError:
+        return False
+    recent = Activity.objects.filter(actor=followee, fanned_out=True).order_by('-pk')
+    FeedItem.objects.bulk_create(
+        [
+            FeedItem(owner=follower, activity_id=activity_id, is_published=is_published)
+            for activity_id, is_published in recent.values_list(
+                'pk', 'event__is_published'
+            )[:BACKFILL_SIZE]
+        ],
+        ignore_conflicts=True,
+    )
+    return True
+
+
+def unfollow(follower, followee):
+    """Stop following ``followee`` and drop their activities from the feed."""
+    deleted, _ = Follow.objects.filter(follower=follower, followee=followee).delete()
+    if deleted:
+        FeedItem.objects.filter(owner=follower, activity__actor=followee).delete()
+    return bool(deleted)
+
+
+def publish(actor, verb, event):
+    """Record an activity and push it into the feeds of ``actor``'s followers."""
+    followers = Follow.objects.filter(followee=actor).values_list(
+        'follower_id', flat=True
+    )
+    fan_out = followers.count() <= fanout_limit()
+    activity = Activity.objects.create(
+        actor=actor, verb=verb, event=event, fanned_out=fan_out
+    )
+    if fan_out:
+        follower_ids = followers.order_by().iterator(chunk_size=FANOUT_BATCH_SIZE)
+        while True:
+            chunk = list(islice(follower_ids, FANOUT_BATCH_SIZE))
+            if not chunk:
+                break
+            FeedItem.objects.bulk_create([
+                FeedItem(
+                    owner_id=owner_id, activity=activity,
+                    is_published=event.is_published,
+                )
+                for owner_id in chunk
+            ])
+    return activity
+
+
+def feed_for(user, before=None, limit=FEED_PAGE_SIZE):
+    """Return up to ``limit`` activities of ``user``'s feed, newest first.
+
+    ``before`` is an activity id; only older activities are returned. A page
+    is two queries whatever the follow count. Pushed items are read newest
+    first from the feed index and stop after ``limit`` rows. The activities
+    of followed accounts that were not fanned out come from one
+    ``actor_id IN`` query, sorted before the limit; only the few accounts
+    over ``SOCIAL_FANOUT_LIMIT`` have such activities. The two are disjoint
+    (backfills copy fanned-out activities only) and merged here.
+    """
+    pushed = FeedItem.objects.filter(owner=user, is_published=True)
+    pulled = Activity.objects.filter(
+        fanned_out=False,
+        event__is_published=True,
+        actor_id__in=Follow.objects.filter(follower=user).values('followee_id'),
+    )
+    if before is not None:
+        pushed = pushed.filter(activity_id__lt=before)
+        pulled = pulled.filter(pk__lt=before)
+    pushed = [
+        item.activity
+        for item in pushed.select_related('activity__actor', 'activity__event')
+        .order_by('-activity_id')[:limit]
+    ]
+    pulled = pulled.select_related('actor', 'event').order_by('-pk')[:limit]
+    merged = heapq.merge(pushed, pulled, key=lambda activity: -activity.pk)
+    return list(islice(merged, limit))
+
+
+def trim_feed(owner_id, cap=None):
+    """Delete all but the newest ``cap`` items of one feed."""
+    cap = feed_cap() if cap is None else cap
+    items = FeedItem.objects.filter(owner_id=owner_id).order_by('-activity_id')
+    boundary = list(items.values_list('activity_id', flat=True)[cap:cap + 1])
+    if not boundary:
+        return 0
+    stale = FeedItem.objects.filter(owner_id=owner_id, activity_id__lte=boundary[0])
+    deleted, _ = stale.delete()
+    return deleted
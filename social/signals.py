@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from events.models import Event
+
+from .models import FeedItem
+
+
+@receiver(post_save, sender=Event)
+def sync_feed_item_visibility(sender, instance, raw=False, **kwargs):
+    """Copy a changed ``is_published`` onto the feed items of the event."""
+    update_fields = kwargs.get('update_fields')
+    if raw or (update_fields is not None and 'is_published' not in update_fields):
+        return
+    FeedItem.objects.filter(activity__event=instance).exclude(
+        is_published=instance.is_published
+    ).update(is_published=instance.is_published)
@@ -1,3 +1,147 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from events.tests import make_event
+
+from . import services
+from .models import Activity, FeedItem
+from .views import FeedView
+
+User = get_user_model()
+
+
+class ActivityFeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user('reader', 'reader@example.com', 'pw')
+        cls.friends = [
+            User.objects.create_user(f'friend{i}', f'friend{i}@example.com', 'pw')
+            for i in range(3)
+        ]
+        cls.stranger = User.objects.create_user(
+            'stranger', 'stranger@example.com', 'pw'
+        )
+        cls.event = make_event(cls.stranger)
+        for friend in cls.friends:
+            services.follow(cls.reader, friend)
+
+    def feed(self):
+        return list(services.feed_for(self.reader))
+
+    def test_activity_is_fanned_out_to_followers(self):
+        activity = services.publish(self.friends[0], services.FAVORITED, self.event)
+        services.publish(self.stranger, services.CREATED, self.event)
+
+        self.assertTrue(activity.fanned_out)
+        self.assertEqual(FeedItem.objects.filter(owner=self.reader).count(), 1)
+        self.assertEqual(self.feed(), [activity])
+
+    @override_settings(SOCIAL_FANOUT_LIMIT=0)
+    def test_popular_actors_are_merged_in_at_read_time(self):
+        pushed = Activity.objects.create(
+            actor=self.friends[1], verb=services.CREATED, event=self.event
+        )
+        FeedItem.objects.create(owner=self.reader, activity=pushed)
+        pulled = services.publish(self.friends[0], services.ATTENDING, self.event)
+
+        self.assertFalse(pulled.fanned_out)
+        self.assertFalse(FeedItem.objects.filter(activity=pulled).exists())
+        self.assertEqual(self.feed(), [pulled, pushed])
+
+    def test_feed_page_is_two_queries_whatever_the_follow_count(self):
+        for friend in self.friends:
+            services.publish(friend, services.FAVORITED, self.event)
+        with self.assertNumQueries(2):  # Pushed items, then pulled activities.
+            activities = self.feed()
+            [(activity.actor.username, activity.event.title) for activity in activities]
+        self.assertEqual(len(activities), 3)
+
+    @override_settings(SOCIAL_FANOUT_LIMIT=1)
+    def test_pulled_accounts_cost_no_extra_queries(self):
+        # friend0 has two followers, so is past the limit and pulled at read time.
+        services.follow(self.stranger, self.friends[0])
+        pulled = [
+            services.publish(self.friends[0], services.FAVORITED, self.event)
+            for _ in range(2)
+        ]
+        pushed = services.publish(self.friends[1], services.FAVORITED, self.event)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.feed(), [pushed, *pulled[::-1]])
+
+    def test_unpublished_events_are_hidden_until_published(self):
+        draft = make_event(self.stranger, title='Draft', is_published=False)
+        activity = services.publish(self.friends[0], services.CREATED, draft)
+        self.assertFalse(FeedItem.objects.get(activity=activity).is_published)
+        self.assertEqual(self.feed(), [])
+
+        draft.is_published = True
+        draft.save()
+        self.assertEqual(self.feed(), [activity])
+        draft.is_published = False
+        draft.save(update_fields=['is_published'])
+        self.assertEqual(self.feed(), [])
+
+    def test_unfollow_removes_activities(self):
+        services.publish(self.friends[0], services.FAVORITED, self.event)
+        self.client.force_login(self.reader)
+        self.client.post(
+            reverse('social:toggle-follow', args=[self.friends[0].username])
+        )
+        self.assertEqual(self.feed(), [])
+
+    def test_follow_backfills_recent_activity(self):
+        activity = services.publish(self.stranger, services.CREATED, self.event)
+        services.follow(self.reader, self.stranger)
+        self.assertEqual(self.feed(), [activity])
+
+    def test_trim_keeps_newest_items(self):
+        activities = [
+            services.publish(self.friends[0], services.FAVORITED, self.event)
+            for _ in range(5)
+        ]
+        call_command('trim_feeds', cap=2, stdout=StringIO())
+        self.assertEqual(self.feed(), activities[:2:-1])
+
+    def test_feed_view_paginates_by_activity_id(self):
+        activities = [
+            services.publish(self.friends[0], services.FAVORITED, self.event)
+            for _ in range(3)
+        ]
+        self.client.force_login(self.reader)
+        with mock.patch.object(FeedView, 'page_size', 2):
+            first = self.client.get(reverse('social:feed'))
+            second = self.client.get(
+                reverse('social:feed'), {'before': first.context['next_before']}
+            )
+        self.assertEqual(first.context['activities'], activities[:0:-1])
+        self.assertEqual(second.context['activities'], activities[:1])
+        self.assertIsNone(second.context['next_before'])
+
+    @override_settings(SOCIAL_FANOUT_LIMIT=0)
+    def test_pushed_and_pulled_pages_interleave(self):
+        activities = []
+        for i in range(6):
+            if i % 2:
+                activities.append(
+                    services.publish(self.friends[0], services.FAVORITED, self.event)
+                )
+            else:
+                activity = Activity.objects.create(
+                    actor=self.friends[1], verb=services.CREATED, event=self.event
+                )
+                FeedItem.objects.create(owner=self.reader, activity=activity)
+                activities.append(activity)
+        newest_first = activities[::-1]
+
+        first = services.feed_for(self.reader, limit=4)
+        self.assertEqual(first, newest_first[:4])
+        self.assertEqual(
+            services.feed_for(self.reader, before=first[-1].pk, limit=4),
+            newest_first[4:],
+        )
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'social'
+
+urlpatterns = [
+    path('feed/', views.FeedView.as_view(), name='feed'),
+    path('follow/<str:username>/', views.toggle_follow, name='toggle-follow'),
+]
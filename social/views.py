@@ -1,3 +1,48 @@
-from django.shortcuts import render
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect
+from django.views.decorators.http import require_POST
+from django.views.generic import ListView
 
-# Create your views here.
+from . import services
+
+
+class FeedView(LoginRequiredMixin, ListView):
+    """Activity of the people the current user follows.
+
+    Paginated with ``?before=<activity id>`` so every page is two bounded
+    range queries, however deep.
+    """
+    template_name = 'social/feed.html'
+    context_object_name = 'activities'
+    page_size = 20
+
+    def get_queryset(self):
+        before = self.request.GET.get('before')
+        try:
+            before = int(before) if before else None
+        except ValueError:
+            raise Http404('Invalid cursor.')
+        # One extra row tells whether there is another page.
+        return services.feed_for(self.request.user, before, self.page_size + 1)
+
+    def get_context_data(self, **kwargs):
+        rows = self.object_list
+        activities = rows[:self.page_size]
+        has_more = len(rows) > self.page_size
+        kwargs['next_before'] = activities[-1].pk if has_more else None
+        return super().get_context_data(object_list=activities, **kwargs)
+
+
+@login_required
+@require_POST
+def toggle_follow(request, username):
+    followee = get_object_or_404(get_user_model(), username=username)
+    if services.unfollow(request.user, followee):
+        messages.success(request, f'You are no longer following {followee.username}.')
+    elif services.follow(request.user, followee):
+        messages.success(request, f'You are now following {followee.username}.')
+    return redirect('users:profile', username=followee.username)
@@ -9,6 +9,8 @@ class User(AbstractUser):
     location = models.CharField(max_length=100, blank=True)
     birth_date = models.DateField(null=True, blank=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+    # Resized copies made by events.images; None while pending.
+    profile_picture_variants = models.JSONField(null=True, blank=True, editable=False)
     is_organizer = models.BooleanField(default=False)
 
     # Additional required fields
@@ -0,0 +1,14 @@
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from events import images
+
+from .models import User
+
+
+@receiver(pre_save, sender=User)
+def reset_picture_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        images.reset_variants_if_changed(
+            instance, 'profile_picture', 'profile_picture_variants'
+        )
@@ -42,6 +42,9 @@ def profile(request, username=None):
         'events_created': user.get_events_created(),
         'events_attending': user.get_events_attending(),
         'favorite_events': user.get_favorite_events(),
-        'is_own_profile': user == request.user
+        'is_own_profile': user == request.user,
+        'followers_count': user.followers.count(),
+        'following_count': user.following.count(),
+        'is_following': user.followers.filter(follower=request.user).exists(),
     }
     return render(request, 'users/profile.html', context)